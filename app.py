@@ -3,14 +3,302 @@ import os
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import zipfile
-import tempfile
 import io
-import shutil
-from code_counter import count_lines_in_directory, estimate_effort_and_cost
+import json
+import time
+import heapq
+import uuid
+import hashlib
+import numpy as np
+from code_counter import (count_lines_in_directory, count_lines_in_archive, count_lines_in_git_history,
+                          directory_fingerprint, estimate_effort_and_cost, OversizePolicy, OVERSIZE_FILE_SIZE,
+                          DEFAULT_EXCLUDE_DIRS, PROFILE_PHASES, iter_directory_nodes)
+from estimation import (estimate_effort_and_cost_array, estimate_effort_and_cost_grid,
+                        estimate_effort_and_cost_monte_carlo)
+from scan_cache import ScanCache
+from git_source import GitRepository
+from scan_jobs import ScanScheduler, JobRejected, DEFAULT_MAX_RUNNING
+from snapshots import snapshot_bytes, load_snapshot, diff_snapshots
+
+# Anzahl der Scan-Ergebnisse, deren Diagramme über Reruns hinweg im Speicher gehalten werden
+SCAN_RESULT_CACHE_ENTRIES = 8
+
+# Abstand in Sekunden, in dem die Seite während eines laufenden Scans neu gezeichnet wird
+SCAN_POLL_INTERVAL = 0.5
+
+# Anzahl gleichzeitig laufender Scans aller Sitzungen (Umgebungsvariable CODE_COUNTER_MAX_SCANS)
+MAX_RUNNING_SCANS = int(os.environ.get('CODE_COUNTER_MAX_SCANS', DEFAULT_MAX_RUNNING))
+
+# Auswahl der Behandlung übergroßer Dateien (Anzeigetext -> Aktion der OversizePolicy)
+OVERSIZE_OPTIONS = {
+    "Vollständig zählen": 'stream',
+    "Nur physische Zeilen zählen": 'physical',
+    "Minifizierten/generierten Code überspringen": 'minified',
+    "Überspringen": 'skip',
+}
+
+# Anzeigetexte der Phasen und Gründe für übersprungene Dateien im Scan-Profil
+PROFILE_PHASE_LABELS = {
+    'walk': "Verzeichnisdurchlauf",
+    'cache': "Scan-Cache",
+    'binary_check': "Binärprüfung",
+    'read': "Lesen",
+    'count': "Zählen/Kommentare",
+    'aggregate': "Statistik",
+    'dataframe': "DataFrame",
+}
+PROFILE_SKIP_LABELS = {
+    'binary': "Binärdateien",
+    'unknown_language': "Ohne erkannte Sprache",
+    'not_code': "Keine Code-Dateien",
+    'excluded': "In ausgeschlossenen Verzeichnissen",
+    'excluded_directories': "Ausgeschlossene Verzeichnisse",
+    'gitignored': "Per .gitignore ignoriert",
+    'oversize': "Übergroß, übersprungen",
+    'minified': "Minifiziert, übersprungen",
+    'error': "Lesefehler",
+}
+
+# Anzeigetexte der angewendeten Behandlung übergroßer Dateien
+OVERSIZE_HANDLING_LABELS = {
+    'streamed': "vollständig gezählt",
+    'physical': "nur physische Zeilen",
+    'minified': "übersprungen (minifiziert/generiert)",
+    'skipped': "übersprungen",
+}
+
+# Scans laufen in einem Worker-Thread des Schedulers (siehe run_scan) und melden ihren
+# Fortschritt über progress; cancel bricht sie ab
+def scan_archive(archive_bytes, exclude_dirs, oversize_action, profile_scan, progress=None, cancel=None):
+    return count_lines_in_archive(io.BytesIO(archive_bytes), list(exclude_dirs),
+                                  oversize_policy=OversizePolicy(oversize_action), profile=profile_scan,
+                                  progress=progress, cancel=cancel)
+
+def scan_directory(directory_path, exclude_dirs, use_scan_cache, dedupe_files, oversize_action, use_gitignore,
+                   profile_scan, progress=None, cancel=None):
+    oversize_policy = OversizePolicy(oversize_action)
+    if use_scan_cache:
+        with ScanCache() as scan_cache:
+            return count_lines_in_directory(directory_path, list(exclude_dirs), cache=scan_cache, dedupe=dedupe_files,
+                                            oversize_policy=oversize_policy, use_gitignore=use_gitignore,
+                                            profile=profile_scan, progress=progress, cancel=cancel)
+    return count_lines_in_directory(directory_path, list(exclude_dirs), dedupe=dedupe_files,
+                                    oversize_policy=oversize_policy, use_gitignore=use_gitignore, profile=profile_scan,
+                                    progress=progress, cancel=cancel)
+
+# Gemeinsamer Scheduler aller Sitzungen dieses Servers: begrenzt die gleichzeitig laufenden Scans,
+# verteilt wartende Aufträge reihum auf die Benutzer und fasst gleiche Aufträge zusammen
+@st.cache_resource
+def get_scan_scheduler():
+    return ScanScheduler(max_running=MAX_RUNNING_SCANS)
+
+# Kennung der Sitzung für die faire Verteilung der Scans
+def session_user_id():
+    return st.session_state.setdefault('scan_user_id', uuid.uuid4().hex)
+
+# Ergebnis des Scans scan_key. Der Auftrag geht an den gemeinsamen Scheduler; ein gleicher Auftrag
+# einer anderen Sitzung oder ein dort gespeichertes Ergebnis wird wiederverwendet, sodass auch
+# Änderungen an den Kostenparametern keinen neuen Scan auslösen. Solange der Auftrag wartet oder
+# läuft, werden Warteposition bzw. Fortschritt angezeigt und die Seite nach SCAN_POLL_INTERVAL neu gezeichnet.
+def run_scan(scan_key, scan, *args):
+    scheduler = get_scan_scheduler()
+    user_id = session_user_id()
+    try:
+        job_id = scheduler.submit(scan_key, user_id, scan, *args)
+    except JobRejected as e:
+        st.session_state['analysis_requested'] = False
+        st.warning(f"Analyse nicht gestartet: {str(e)}")
+        st.stop()
+    
+    previous_job_id = st.session_state.get('scan_job_id')
+    if previous_job_id is not None and previous_job_id != job_id:
+        # Parameter geändert: den alten Auftrag nicht weiterlaufen lassen, sofern niemand sonst darauf wartet
+        scheduler.cancel(previous_job_id, user_id)
+    st.session_state['scan_job_id'] = job_id
+    
+    job = scheduler.get(job_id)
+    if job is None:
+        # Ergebnis zwischen Einreichen und Abfragen verdrängt: neu einreichen
+        st.rerun()
+    
+    if not job.finished:
+        if display_scan_progress(job, scheduler.queue_position(job_id)):
+            scheduler.cancel(job_id, user_id)
+            job = None
+        else:
+            time.sleep(SCAN_POLL_INTERVAL)
+            st.rerun()
+    
+    if job is None or job.state == 'cancelled':
+        del st.session_state['scan_job_id']
+        st.session_state['analysis_requested'] = False
+        st.info("Analyse abgebrochen.")
+        st.stop()
+    if job.state == 'failed':
+        raise job.error
+    return job.result
+
+# Fingerabdruck des Verzeichnisses; während eines laufenden Scans derselbe wie beim Start,
+# damit nicht bei jedem Neuzeichnen das ganze Verzeichnis durchlaufen wird
+def current_tree_fingerprint(scan_settings, directory_path, exclude_dirs, use_gitignore):
+    job = get_scan_scheduler().get(st.session_state.get('scan_job_id'))
+    if job is not None and job.key[:-1] == scan_settings and not job.finished:
+        return job.key[-1]
+    return directory_fingerprint(directory_path, exclude_dirs, use_gitignore)
+
+# Warteposition oder Fortschritt eines Scans: gezählte Dateien, Durchsatz und vorläufige Summen.
+# Gibt True zurück, wenn der Benutzer den Scan abbricht.
+def display_scan_progress(job, queue_position=None):
+    progress = job.progress
+    if job.state == 'queued':
+        ahead = f", {queue_position} vor dieser" if queue_position else ""
+        st.progress(0.0, text=f"Analyse wartet auf einen freien Platz{ahead}...")
+    elif progress is None or progress['phase'] == 'walk':
+        found = progress['files_total'] if progress is not None and progress['files_total'] else 0
+        st.progress(0.0, text=f"Durchsuche Verzeichnis... {found:,} Dateien gefunden")
+    else:
+        eta = f", noch etwa {progress['eta_seconds']:.0f} s" if progress['eta_seconds'] is not None else ""
+        if progress['bytes_total']:
+            st.progress(min(progress['bytes_done'] / progress['bytes_total'], 1.0),
+                        text=f"{progress['files_done']:,} von {progress['files_total']:,} Dateien gezählt{eta}")
+        else:
+            st.write(f"{progress['files_done']:,} Dateien gezählt")
+        
+        col_speed, col_bytes, col_lines = st.columns(3)
+        col_speed.metric("Dateien/s", f"{progress['files_per_second']:,.0f}")
+        col_bytes.metric("Verarbeitet", f"{progress['bytes_done'] / (1024 * 1024):,.1f} MB",
+                         f"{progress['bytes_per_second'] / (1024 * 1024):,.1f} MB/s", delta_color='off')
+        col_lines.metric("Code-Zeilen bisher", f"{progress['total_code_lines']:,}",
+                         f"{progress['total_files']:,} Dateien", delta_color='off')
+    
+    return st.button("Abbrechen", key='cancel_scan')
+
+# Anzahl der Balken im Histogramm der Monte-Carlo-Schätzung
+MONTE_CARLO_BINS = 60
+
+# Maximale Anzahl einzelner Dateitypen im Kuchendiagramm; kleinere werden zu "Sonstige" zusammengefasst
+PIE_MAX_SLICES = 12
+
+# Anzahl der Dateien im Balkendiagramm der größten Dateien
+TOP_FILES_COUNT = 10
+
+# Wählbare Zeilen pro Seite der Dateiliste; nur die aktuelle Seite wird an den Browser gesendet
+FILE_TABLE_PAGE_SIZES = [50, 100, 250, 1000]
+
+# Sortierung der Dateiliste (Anzeigetext -> Spalte)
+FILE_TABLE_SORT_COLUMNS = {
+    "Code-Zeilen": 'code_lines',
+    "Gesamtzeilen": 'total_lines',
+    "Leerzeilen": 'empty_lines',
+    "Dateipfad": 'file_path',
+    "Sprache": 'language',
+}
+
+# Anzahl der gespeicherten Filter-/Sortierkombinationen der Dateiliste
+FILE_TABLE_ORDER_ENTRIES = 32
+
+# Tiefste Verzeichnisebene im Treemap und in der Kostentabelle pro Verzeichnis;
+# tiefere Verzeichnisse sind in den Summen ihrer Elternverzeichnisse enthalten
+DIRECTORY_MAX_DEPTH = 4
+
+# Diagramme und Sortierungen pro Scan-Ergebnis nur einmal berechnen: result_key
+# identifiziert das Ergebnis (Quelle und Fingerabdruck), die Daten selbst werden
+# mit führendem Unterstrich übergeben und nicht gehasht.
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def language_pie_figure(result_key, _lines_by_extension):
+    # Nur die größten Dateitypen einzeln, ohne die ganze Liste zu sortieren
+    slices = heapq.nlargest(PIE_MAX_SLICES, _lines_by_extension.items(), key=lambda item: item[1])
+    other_lines = sum(_lines_by_extension.values()) - sum(code_lines for _, code_lines in slices)
+    if other_lines > 0:
+        slices.append(("Sonstige", other_lines))
+    ext_df = pd.DataFrame(slices, columns=['Dateityp', 'Anzahl Zeilen'])
+    
+    colors = px.colors.qualitative.Bold
+    
+    fig = px.pie(ext_df, names='Dateityp', values='Anzahl Zeilen',
+                 title='<b>Verteilung der Code-Zeilen nach Dateityp</b>',
+                 color_discrete_sequence=colors)
+    
+    fig.update_layout(
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        legend_title_font=dict(size=14),
+        legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
+        margin=dict(t=50, b=100, l=10, r=10)
+    )
+    return fig
+
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def top_files_figure(result_key, _result_df):
+    # Partielle Auswahl statt vollständiger Sortierung
+    top_files = _result_df.nlargest(TOP_FILES_COUNT, 'code_lines')
+    
+    fig = px.bar(top_files, x='code_lines', y='file_path', 
+                 title=f'<b>Top {TOP_FILES_COUNT} Dateien nach Code-Zeilen</b>',
+                 labels={'code_lines': 'Anzahl Code-Zeilen', 'file_path': 'Dateipfad'},
+                 color='code_lines',
+                 color_continuous_scale='blues',
+                 text='code_lines')
+    
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        hoverlabel=dict(bgcolor="white", font_size=12),
+        height=450,
+        margin=dict(t=50, b=50, l=10, r=10)
+    )
+    
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return fig
+
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def directory_treemap_figure(result_key, _directory_tree):
+    # Knoten des Präfixbaums aus stats['directory_tree'] bis DIRECTORY_MAX_DEPTH
+    ids, labels, parents, values, customdata = [], [], [], [], []
+    for node, depth in iter_directory_nodes(_directory_tree, DIRECTORY_MAX_DEPTH):
+        ids.append(node['path'] or '.')
+        labels.append(node['name'] or 'Projekt')
+        parents.append((node['path'].rpartition('/')[0] or '.') if depth else '')
+        values.append(node['code_lines'])
+        main_language = max(node['languages'], key=node['languages'].get) if node['languages'] else '–'
+        customdata.append((node['comment_lines'], node['empty_lines'], node['files'], main_language))
+    
+    fig = go.Figure(go.Treemap(ids=ids, labels=labels, parents=parents, values=values, branchvalues='total',
+                               customdata=customdata,
+                               marker=dict(colors=values, colorscale='blues'),
+                               hovertemplate='<b>%{id}</b><br>Code-Zeilen: %{value:,}<br>'
+                                             'Kommentarzeilen: %{customdata[0]:,}<br>Leerzeilen: %{customdata[1]:,}<br>'
+                                             'Dateien: %{customdata[2]:,}<br>Hauptsprache: %{customdata[3]}'
+                                             '<extra></extra>'))
+    
+    fig.update_layout(
+        title='<b>Code-Zeilen nach Verzeichnis</b>',
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        height=550,
+        margin=dict(t=50, b=10, l=10, r=10)
+    )
+    return fig
+
+@st.cache_resource(max_entries=FILE_TABLE_ORDER_ENTRIES, show_spinner=False)
+def file_table_order(result_key, path_filter, languages, sort_column, ascending, _result_df):
+    # Zeilenpositionen der gefilterten Dateiliste in Sortierreihenfolge; Blättern
+    # schneidet danach nur noch eine Seite heraus
+    mask = np.ones(len(_result_df), dtype=bool)
+    if path_filter:
+        mask &= _result_df['file_path'].str.contains(path_filter, case=False, regex=False).to_numpy()
+    if languages:
+        mask &= _result_df['language'].isin(languages).to_numpy()
+    positions = np.flatnonzero(mask)
+    
+    order = np.argsort(_result_df[sort_column].to_numpy()[positions], kind='stable')
+    if not ascending:
+        order = order[::-1]
+    return positions[order]
 
 # Gemeinsame Funktion zur Anzeige der Analyseergebnisse
-def display_analysis_results(result_df, stats, effort_months, cost):
+def display_analysis_results(result_df, stats, effort_months, cost, result_key, estimate_distribution=None):
     # Zeige Gesamtstatistik
     st.markdown("""
     <div style="background-color: #F0F9FF; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #0EA5E9;">
@@ -68,6 +356,10 @@ def display_analysis_results(result_df, stats, effort_months, cost):
         </div>
         """, unsafe_allow_html=True)
     
+    # Bandbreite der Schätzung (Monte-Carlo)
+    if estimate_distribution is not None:
+        display_estimate_distribution(estimate_distribution)
+    
     # Visualisierungen
     st.markdown("""
     <div style="background-color: #ECFDF5; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #10B981;">
@@ -79,23 +371,7 @@ def display_analysis_results(result_df, stats, effort_months, cost):
     
     with col_viz1:
         # Kuchendiagramm für Dateitypen
-        ext_df = pd.DataFrame(list(stats['lines_by_extension'].items()), 
-                            columns=['Dateityp', 'Anzahl Zeilen'])
-        ext_df = ext_df.sort_values('Anzahl Zeilen', ascending=False)
-        
-        colors = px.colors.qualitative.Bold
-        
-        fig1 = px.pie(ext_df, names='Dateityp', values='Anzahl Zeilen',
-                    title='<b>Verteilung der Code-Zeilen nach Dateityp</b>',
-                    color_discrete_sequence=colors)
-        
-        fig1.update_layout(
-            font=dict(family="Arial, sans-serif"),
-            title_font=dict(size=18, color="#1E3A8A"),
-            legend_title_font=dict(size=14),
-            legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
-            margin=dict(t=50, b=100, l=10, r=10)
-        )
+        fig1 = language_pie_figure(result_key, stats['lines_by_extension'])
         
         st.markdown('<div class="plot-container">', unsafe_allow_html=True)
         st.plotly_chart(fig1, use_container_width=True)
@@ -103,30 +379,38 @@ def display_analysis_results(result_df, stats, effort_months, cost):
     
     with col_viz2:
         # Balkendiagramm für die größten Dateien
-        top_files = result_df.sort_values('code_lines', ascending=False).head(10)
-        
-        fig2 = px.bar(top_files, x='code_lines', y='file_path', 
-                    title='<b>Top 10 Dateien nach Code-Zeilen</b>',
-                    labels={'code_lines': 'Anzahl Code-Zeilen', 'file_path': 'Dateipfad'},
-                    color='code_lines',
-                    color_continuous_scale='blues',
-                    text='code_lines')
-        
-        fig2.update_layout(
-            yaxis={'categoryorder': 'total ascending'},
-            font=dict(family="Arial, sans-serif"),
-            title_font=dict(size=18, color="#1E3A8A"),
-            hoverlabel=dict(bgcolor="white", font_size=12),
-            height=450,
-            margin=dict(t=50, b=50, l=10, r=10)
-        )
-        
-        fig2.update_traces(texttemplate='%{text}', textposition='outside')
+        fig2 = top_files_figure(result_key, result_df)
         
         st.markdown('<div class="plot-container">', unsafe_allow_html=True)
         st.plotly_chart(fig2, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
+    # Duplikate (nur bei aktivierter Deduplizierung)
+    if stats.get('duplicate_groups'):
+        with st.expander(f"🔁 {stats['duplicate_files']} doppelte Dateien in {len(stats['duplicate_groups'])} Gruppen "
+                         f"({stats['total_code_lines'] - stats['unique_code_lines']:,} Code-Zeilen)"):
+            st.caption(f"Die Aufwandsschätzung basiert auf {stats['unique_code_lines']:,} Code-Zeilen ohne Duplikate.")
+            duplicates_df = pd.DataFrame([
+                {'Kopien': group['copies'], 'Code-Zeilen pro Kopie': group['code_lines'], 'Dateien': ', '.join(group['files'])}
+                for group in stats['duplicate_groups']
+            ])
+            st.dataframe(duplicates_df, use_container_width=True)
+    
+    # Übergroße Dateien
+    if stats.get('oversized_files'):
+        with st.expander(f"📦 {len(stats['oversized_files'])} übergroße Dateien (> {OVERSIZE_FILE_SIZE // (1024 * 1024)} MB)"):
+            oversized_df = pd.DataFrame([
+                {'Datei': entry['file_path'],
+                 'Behandlung': OVERSIZE_HANDLING_LABELS.get(entry['handling'], entry['handling']),
+                 'Gesamtzeilen': entry['total_lines']}
+                for entry in stats['oversized_files']
+            ])
+            st.dataframe(oversized_df, use_container_width=True)
+    
+    # Scan-Profil (nur bei aktivierter Messung)
+    if stats.get('profile'):
+        display_scan_profile(stats['profile'])
+    
     # Detaillierte Dateiliste
     st.markdown("""
     <div style="background-color: #EFF6FF; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #3B82F6;">
@@ -136,8 +420,34 @@ def display_analysis_results(result_df, stats, effort_months, cost):
     
     # Verbesserte Datentabelle
     st.markdown('<div style="background-color: white; padding: 1rem; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">', unsafe_allow_html=True)
+    display_file_table(result_df, result_key)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Dateiliste mit Filter, Sortierung und Seiten; gefiltert und sortiert wird auf dem Server
+def display_file_table(result_df, result_key):
+    col_filter, col_languages = st.columns([2, 1])
+    with col_filter:
+        path_filter = st.text_input("Dateipfad enthält", value="")
+    with col_languages:
+        languages = st.multiselect("Sprachen", sorted(result_df['language'].unique()))
+    
+    col_sort, col_direction, col_page_size, col_page = st.columns(4)
+    with col_sort:
+        sort_label = st.selectbox("Sortieren nach", list(FILE_TABLE_SORT_COLUMNS))
+    with col_direction:
+        ascending = st.selectbox("Reihenfolge", ["Absteigend", "Aufsteigend"]) == "Aufsteigend"
+    with col_page_size:
+        page_size = st.selectbox("Zeilen pro Seite", FILE_TABLE_PAGE_SIZES, index=1)
+    
+    order = file_table_order(result_key, path_filter, tuple(languages), FILE_TABLE_SORT_COLUMNS[sort_label], ascending,
+                             result_df)
+    page_count = max(1, -(-len(order) // page_size))
+    with col_page:
+        page = st.number_input("Seite", min_value=1, max_value=page_count, value=1, step=1)
+    
+    st.caption(f"{len(order):,} von {len(result_df):,} Dateien · Seite {page} von {page_count}")
     st.dataframe(
-        result_df.sort_values('code_lines', ascending=False), 
+        result_df.iloc[order[(page - 1) * page_size:page * page_size]], 
         use_container_width=True,
         column_config={
             "file_path": st.column_config.TextColumn("Dateipfad"),
@@ -146,10 +456,378 @@ def display_analysis_results(result_df, stats, effort_months, cost):
             "total_lines": st.column_config.NumberColumn("Gesamtzeilen"),
             "empty_lines": st.column_config.NumberColumn("Leerzeilen"),
             "code_lines": st.column_config.NumberColumn("Code-Zeilen"),
+            "content_hash": None,
         }
     )
+
+# Zeiten pro Phase, übersprungene und langsamste Dateien sowie Durchsatz pro Sprache eines gemessenen Scans
+def display_scan_profile(profile):
+    megabytes = profile['bytes_read'] / (1024 * 1024)
+    elapsed = profile['elapsed_seconds']
+    with st.expander(f"⏱️ Scan-Profil: {profile['files']:,} Dateien, {megabytes:,.1f} MB in {elapsed:.2f} s"):
+        if elapsed:
+            st.caption(f"{profile['files'] / elapsed:,.0f} Dateien/s, {megabytes / elapsed:,.1f} MB/s"
+                       + (f", {profile['cached_files']:,} Dateien aus dem Scan-Cache" if profile['cached_files'] else ""))
+        
+        phases_df = pd.DataFrame([
+            {'Phase': PROFILE_PHASE_LABELS.get(phase, phase),
+             'Wandzeit (s)': profile['phases'][phase]['wall_seconds'],
+             'CPU-Zeit (s)': profile['phases'][phase]['cpu_seconds']}
+            for phase in PROFILE_PHASES
+        ])
+        fig = px.bar(phases_df, x='Wandzeit (s)', y='Phase', orientation='h',
+                     title='<b>Zeit pro Phase</b>', color_discrete_sequence=['#3B82F6'])
+        fig.update_layout(yaxis={'categoryorder': 'array', 'categoryarray': phases_df['Phase'].tolist()[::-1]},
+                          font=dict(family="Arial, sans-serif"), title_font=dict(size=16, color="#1E3A8A"),
+                          margin=dict(t=50, b=30, l=10, r=10), height=300)
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(phases_df, use_container_width=True)
+        
+        col_skipped, col_languages = st.columns(2)
+        with col_skipped:
+            st.markdown("**Übersprungen**")
+            st.dataframe(pd.DataFrame([
+                {'Grund': PROFILE_SKIP_LABELS.get(reason, reason), 'Anzahl': count}
+                for reason, count in sorted(profile['skipped'].items(), key=lambda item: item[1], reverse=True)
+            ], columns=['Grund', 'Anzahl']), use_container_width=True)
+        with col_languages:
+            st.markdown("**Durchsatz pro Sprache**")
+            st.dataframe(pd.DataFrame([
+                {'Sprache': entry['language'], 'Dateien': entry['files'], 'Zeit (s)': entry['seconds'],
+                 'MB/s': entry['mb_per_second']}
+                for entry in profile['languages']
+            ], columns=['Sprache', 'Dateien', 'Zeit (s)', 'MB/s']), use_container_width=True)
+        
+        st.markdown("**Langsamste Dateien**")
+        st.dataframe(pd.DataFrame([
+            {'Datei': entry['file_path'], 'Sprache': entry['language'], 'Zeit (ms)': entry['seconds'] * 1000,
+             'KB': entry['bytes'] / 1024}
+            for entry in profile['slowest_files']
+        ], columns=['Datei', 'Sprache', 'Zeit (ms)', 'KB']), use_container_width=True)
+        
+        if profile['errors']:
+            st.markdown("**Lesefehler**")
+            st.dataframe(pd.DataFrame(profile['errors']).rename(columns={'file_path': 'Datei', 'error': 'Fehler'}),
+                         use_container_width=True)
+        
+        st.download_button("Profil als JSON herunterladen", json.dumps(profile, ensure_ascii=False, indent=2),
+                           file_name='scan_profile.json', mime='application/json')
+
+# Histogramm der Monte-Carlo-Kostenschätzung mit P10/P50/P90
+def display_estimate_distribution(estimate_distribution):
+    effort = estimate_distribution['effort_percentiles']
+    cost = estimate_distribution['cost_percentiles']
+    
+    col_p10, col_p50, col_p90 = st.columns(3)
+    for column, percentile, label in ((col_p10, 10, "OPTIMISTISCH (P10)"),
+                                      (col_p50, 50, "WAHRSCHEINLICH (P50)"),
+                                      (col_p90, 90, "PESSIMISTISCH (P90)")):
+        with column:
+            st.markdown(f"""
+            <div style="background-color: white; padding: 1.2rem; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin-top: 1rem;">
+                <h4 style="color: #4B5563; font-size: 0.9rem; margin-bottom: 0.5rem;">{label}</h4>
+                <p style="color: #1E40AF; font-size: 1.5rem; font-weight: 700; margin: 0;">{cost[percentile]:,.0f} €</p>
+                <p style="color: #6B7280; font-size: 0.8rem; margin: 0;">{effort[percentile]:.1f} Personenmonate</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Vorab in Klassen einteilen, statt alle Stichproben an den Browser zu senden
+    counts, edges = np.histogram(estimate_distribution['total_cost'], bins=MONTE_CARLO_BINS)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+                           marker_color='#3B82F6', hovertemplate='%{x:,.0f} €: %{y} Stichproben<extra></extra>'))
+    for percentile, color in ((10, '#10B981'), (50, '#1E40AF'), (90, '#EF4444')):
+        fig.add_vline(x=cost[percentile], line_dash='dash', line_color=color,
+                      annotation_text=f"P{percentile}", annotation_position='top')
+    
+    fig.update_layout(
+        title='<b>Verteilung der geschätzten Kosten (Monte-Carlo)</b>',
+        xaxis_title='Kosten (€)',
+        yaxis_title='Anzahl Stichproben',
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        bargap=0,
+        margin=dict(t=50, b=50, l=10, r=10)
+    )
+    
+    st.markdown('<div class="plot-container">', unsafe_allow_html=True)
+    st.plotly_chart(fig, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
+# Monte-Carlo-Schätzung mit der eingestellten Unsicherheit der Produktivität
+def estimate_distribution_for(code_lines, team_size, dev_salary, productivity_uncertainty):
+    spread = productivity_uncertainty / 100
+    # Fester Startwert: gleiche Eingaben ergeben bei jedem Rerun dieselbe Verteilung
+    return estimate_effort_and_cost_monte_carlo(code_lines, team_size, dev_salary,
+                                                uncertainty={'productivity_factor': (1 - spread, 1.0, 1 + spread)},
+                                                seed=0)
+
+# Szenario-Analyse: Kosten für viele Kombinationen aus Teamgröße und Gehalt
+def display_scenario_heatmap(code_lines, team_size, dev_salary):
+    st.markdown("""
+    <div style="background-color: #F5F3FF; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #8B5CF6;">
+        <h3 style="color: #5B21B6; margin-top: 0; font-size: 1.3rem;">🧮 Szenario-Analyse</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    team_sizes = np.arange(1, max(15, team_size * 2) + 1)
+    salaries = np.linspace(dev_salary * 0.5, dev_salary * 1.5, 11).round(-2)
+    productivity_factor = st.slider("Produktivitätsannahme (Faktor auf Zeilen pro Tag)", 
+                                    min_value=0.5, 
+                                    max_value=1.5, 
+                                    value=1.0, 
+                                    step=0.1)
+    
+    # Ganzes Gitter in einem Aufruf berechnen
+    grid = estimate_effort_and_cost_grid(code_lines, team_sizes, salaries, [productivity_factor])
+    
+    fig = px.imshow(grid['total_cost'][0, :, :, 0],
+                    x=[f"{salary:,.0f} €" for salary in salaries],
+                    y=team_sizes,
+                    labels={'x': 'Monatsgehalt', 'y': 'Teamgröße', 'color': 'Kosten (€)'},
+                    title='<b>Geschätzte Kosten nach Teamgröße und Gehalt</b>',
+                    color_continuous_scale='blues',
+                    aspect='auto')
+    
+    fig.update_layout(
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        yaxis=dict(autorange=True, dtick=1),
+        margin=dict(t=50, b=50, l=10, r=10)
+    )
+    
+    st.markdown('<div class="plot-container">', unsafe_allow_html=True)
+    st.plotly_chart(fig, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# Verzeichnisse: Treemap und geschätzte Kosten pro Verzeichnis (z.B. pro Team)
+def display_directory_breakdown(directory_tree, result_key, team_size, dev_salary):
+    st.markdown("""
+    <div style="background-color: #FFF7ED; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #F97316;">
+        <h3 style="color: #9A3412; margin-top: 0; font-size: 1.3rem;">🗂️ Verzeichnisse</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown('<div class="plot-container">', unsafe_allow_html=True)
+    st.plotly_chart(directory_treemap_figure(result_key, directory_tree), use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    depth = st.slider("Verzeichnisebene der Kostentabelle", 
+                      min_value=1, 
+                      max_value=DIRECTORY_MAX_DEPTH, 
+                      value=1,
+                      help="Jedes Verzeichnis wird so geschätzt, als würde es für sich allein entwickelt")
+    nodes = [node for node, node_depth in iter_directory_nodes(directory_tree, depth) if node_depth == depth]
+    if not nodes:
+        st.info("Auf dieser Ebene gibt es keine Verzeichnisse mit Code-Dateien.")
+        return
+    
+    # Alle Verzeichnisse in einem vektorisierten Aufruf schätzen
+    code_lines = np.array([node['code_lines'] for node in nodes])
+    effort_months, total_cost = estimate_effort_and_cost_array(code_lines, team_size, dev_salary)
+    directories_df = pd.DataFrame({
+        'Verzeichnis': [node['path'] for node in nodes],
+        'Dateien': [node['files'] for node in nodes],
+        'Code-Zeilen': code_lines,
+        'Kommentarzeilen': [node['comment_lines'] for node in nodes],
+        'Leerzeilen': [node['empty_lines'] for node in nodes],
+        'Hauptsprache': [max(node['languages'], key=node['languages'].get) if node['languages'] else '–'
+                         for node in nodes],
+        'Aufwand (Monate)': effort_months,
+        'Kosten (€)': total_cost,
+    }).sort_values('Code-Zeilen', ascending=False)
+    
+    st.dataframe(
+        directories_df,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Aufwand (Monate)": st.column_config.NumberColumn(format="%.1f"),
+            "Kosten (€)": st.column_config.NumberColumn(format="%.0f €"),
+        }
+    )
+
+# Zeilenzahlen über die Git-Historie, einmal pro Stand des Repositorys gezählt; Aufwand und
+# Kosten hängen von Teamgröße und Gehalt ab und werden erst in git_history_with_estimate berechnet
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def git_history_counts(directory_path, head_commit, every, tags, exclude_dirs):
+    return count_lines_in_git_history(directory_path, every=every, tags=tags, exclude_dirs=list(exclude_dirs))
+
+# Git-Historie mit Aufwand und Kosten für die aktuellen Parameter; gezählt wird nur bei neuem HEAD
+def git_history_with_estimate(directory_path, every, tags, exclude_dirs, team_size, dev_salary):
+    with GitRepository(directory_path) as repository:
+        head_commit = repository.resolve('HEAD')
+    history_df = git_history_counts(directory_path, head_commit, every, tags, tuple(exclude_dirs))
+    effort_months, cost = estimate_effort_and_cost_array(history_df['total_code_lines'].to_numpy(), team_size,
+                                                         dev_salary)
+    return history_df.assign(effort_months=effort_months, cost=cost)
+
+# Anzeige des Code-Wachstums über die Git-Historie
+def display_history_results(history_df):
+    st.markdown("""
+    <div style="background-color: #FEF3C7; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #F59E0B;">
+        <h3 style="color: #92400E; margin-top: 0; font-size: 1.3rem;">📅 Wachstum über die Git-Historie</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if history_df.empty:
+        st.info("Keine Revisionen gefunden.")
+        return
+    
+    chart_df = history_df.reset_index()
+    fig = px.line(chart_df, x='date', y='total_code_lines',
+                  title='<b>Code-Zeilen pro Revision</b>',
+                  labels={'date': 'Datum', 'total_code_lines': 'Code-Zeilen', 'label': 'Revision'},
+                  hover_data=['label', 'total_files', 'effort_months', 'cost'],
+                  markers=True)
+    
+    fig.update_layout(
+        font=dict(family="Arial, sans-serif"),
+        title_font=dict(size=18, color="#1E3A8A"),
+        hoverlabel=dict(bgcolor="white", font_size=12),
+        margin=dict(t=50, b=50, l=10, r=10)
+    )
+    
+    st.markdown('<div class="plot-container">', unsafe_allow_html=True)
+    st.plotly_chart(fig, use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    st.dataframe(
+        chart_df.drop(columns=['commit']),
+        use_container_width=True,
+        column_config={
+            "date": st.column_config.DatetimeColumn("Datum"),
+            "label": st.column_config.TextColumn("Revision"),
+            "total_files": st.column_config.NumberColumn("Dateien"),
+            "total_lines": st.column_config.NumberColumn("Gesamtzeilen"),
+            "total_empty_lines": st.column_config.NumberColumn("Leerzeilen"),
+            "total_code_lines": st.column_config.NumberColumn("Code-Zeilen"),
+            "effort_months": st.column_config.NumberColumn("Aufwand (Monate)", format="%.1f"),
+            "cost": st.column_config.NumberColumn("Kosten (€)", format="%.0f"),
+        }
+    )
+
+# Anzahl der Zeilen, die die Vergleichstabelle zweier Snapshots höchstens anzeigt
+DIFF_TABLE_ROWS = 1000
+
+# Anzeigetexte des Status einer Datei im Snapshot-Vergleich
+DIFF_STATUS_LABELS = {
+    'added': "Hinzugekommen",
+    'removed': "Entfernt",
+    'changed': "Geändert",
+}
+
+# Snapshot-Datei eines Scan-Ergebnisses, einmal pro Ergebnis erzeugt
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def snapshot_file(result_key, source, _result_df, _stats):
+    return snapshot_bytes(_result_df, _stats, source=source)
+
+# Geladener Snapshot eines Uploads; der Fingerabdruck erkennt dieselbe Datei wieder
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def loaded_snapshot(fingerprint, _data):
+    return load_snapshot(_data)
+
+# Vergleich zweier Snapshots, zwischengespeichert pro Paar und Kostenparametern
+@st.cache_resource(max_entries=SCAN_RESULT_CACHE_ENTRIES, show_spinner=False)
+def snapshot_diff(old_fingerprint, new_fingerprint, team_size, dev_salary, _old, _new):
+    return diff_snapshots(_old, _new, team_size, dev_salary)
+
+# Download des Scan-Ergebnisses als Snapshot zum späteren Vergleich
+def display_snapshot_download(result_df, stats, result_key, source):
+    st.download_button("Snapshot herunterladen (Arrow)", snapshot_file(result_key, source, result_df, stats),
+                       file_name='code_counter_snapshot.arrow', mime='application/vnd.apache.arrow.file',
+                       help="Im Reiter 'Snapshots vergleichen' mit einem anderen Stand vergleichen")
+
+# Hochgeladene Snapshot-Datei laden (None, wenn nichts hochgeladen wurde)
+def uploaded_snapshot(uploaded_file):
+    if uploaded_file is None:
+        return None, None
+    data = uploaded_file.getvalue()
+    fingerprint = hashlib.blake2b(data, digest_size=16).hexdigest()
+    return fingerprint, loaded_snapshot(fingerprint, data)
+
+# Vergleich zweier gespeicherter Analysen: Differenz pro Datei, Sprache und bei den Kosten
+def display_snapshot_comparison(team_size, dev_salary):
+    st.markdown("""
+    <div style="background-color: #ECFDF5; padding: 1.5rem; border-radius: 8px; margin: 1.5rem 0; border-left: 5px solid #10B981;">
+        <h3 style="color: #065F46; margin-top: 0; font-size: 1.3rem;">🔀 Snapshots vergleichen</h3>
+        <p style="color: #047857; margin-bottom: 0;">Snapshots entstehen über den Download nach einer Analyse oder mit <code>python -m code_counter PFAD --snapshot DATEI</code>.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col_old, col_new = st.columns(2)
+    with col_old:
+        old_file = st.file_uploader("Älterer Snapshot", type=["arrow", "feather", "parquet", "pq"], key='snapshot_old')
+    with col_new:
+        new_file = st.file_uploader("Neuerer Snapshot", type=["arrow", "feather", "parquet", "pq"], key='snapshot_new')
+    
+    try:
+        old_fingerprint, old = uploaded_snapshot(old_file)
+        new_fingerprint, new = uploaded_snapshot(new_file)
+    except ValueError as e:
+        st.error(f"Snapshot kann nicht geladen werden: {str(e)}")
+        return
+    if old is None or new is None:
+        st.info("Laden Sie zwei Snapshots hoch, um sie zu vergleichen.")
+        return
+    if old.rules_version != new.rules_version:
+        st.warning("Die Snapshots wurden mit unterschiedlichen Zählregeln erstellt; Differenzen können auch daher stammen.")
+    
+    diff_df, summary = snapshot_diff(old_fingerprint, new_fingerprint, team_size, dev_salary, old, new)
+    
+    col_lines, col_cost, col_effort, col_files = st.columns(4)
+    col_lines.metric("Code-Zeilen", f"{summary['code_lines_new']:,}", f"{summary['code_lines_delta']:+,}")
+    col_cost.metric("Kosten", f"{summary['cost_new']:,.0f} €", f"{summary['cost_delta']:+,.0f} €", delta_color='inverse')
+    col_effort.metric("Aufwand (Monate)", f"{summary['effort_months_new']:.1f}",
+                      f"{summary['effort_months_new'] - summary['effort_months_old']:+.1f}", delta_color='inverse')
+    col_files.metric("Dateien", f"{summary['files_added']} neu / {summary['files_removed']} entfernt",
+                     f"{summary['files_changed']} geändert, {summary['files_unchanged']} unverändert",
+                     delta_color='off')
+    
+    if summary['code_lines_delta_by_language']:
+        language_df = pd.DataFrame(list(summary['code_lines_delta_by_language'].items()),
+                                   columns=['Sprache', 'Differenz Code-Zeilen'])
+        fig = px.bar(language_df, x='Differenz Code-Zeilen', y='Sprache', orientation='h',
+                     color='Differenz Code-Zeilen', color_continuous_scale='RdBu',
+                     color_continuous_midpoint=0,
+                     title='<b>Veränderung der Code-Zeilen nach Sprache</b>')
+        fig.update_layout(
+            font=dict(family="Arial, sans-serif"),
+            title_font=dict(size=18, color="#1E3A8A"),
+            coloraxis_showscale=False,
+            margin=dict(t=50, b=50, l=10, r=10)
+        )
+        st.markdown('<div class="plot-container">', unsafe_allow_html=True)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    if diff_df.empty:
+        st.info("Keine Datei wurde hinzugefügt, entfernt oder geändert.")
+        return
+    
+    statuses = st.multiselect("Status", list(DIFF_STATUS_LABELS), default=list(DIFF_STATUS_LABELS),
+                              format_func=DIFF_STATUS_LABELS.get)
+    shown_df = diff_df[diff_df['status'].isin(statuses)]
+    if len(shown_df) > DIFF_TABLE_ROWS:
+        st.caption(f"Die {DIFF_TABLE_ROWS} größten von {len(shown_df):,} Änderungen")
+    shown_df = shown_df.head(DIFF_TABLE_ROWS)
+    
+    st.dataframe(
+        shown_df.assign(status=shown_df['status'].map(DIFF_STATUS_LABELS)),
+        use_container_width=True,
+        hide_index=True,
+        column_order=['file_path', 'language', 'status', 'code_lines_old', 'code_lines_new', 'code_lines_delta',
+                      'cost_delta'],
+        column_config={
+            "file_path": st.column_config.TextColumn("Datei"),
+            "language": st.column_config.TextColumn("Sprache"),
+            "status": st.column_config.TextColumn("Status"),
+            "code_lines_old": st.column_config.NumberColumn("Code-Zeilen alt"),
+            "code_lines_new": st.column_config.NumberColumn("Code-Zeilen neu"),
+            "code_lines_delta": st.column_config.NumberColumn("Differenz"),
+            "cost_delta": st.column_config.NumberColumn("Kosten-Differenz (€)", format="%.0f €"),
+        }
+    )
+
 # App-Konfiguration mit angepasstem Design
 st.set_page_config(
     page_title="App Coding & Entwicklungs-Kostenkalkulator",
@@ -229,7 +907,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Tabs mit verbesserten UI-Elementen
-tab1, tab2 = st.tabs(["🔍 Analyse", "ℹ️ Über das Tool"])
+tab1, tab_compare, tab2 = st.tabs(["🔍 Analyse", "🔀 Snapshots vergleichen", "ℹ️ Über das Tool"])
 
 with tab1:
     col1, col2 = st.columns([1, 2])
@@ -241,7 +919,7 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
         
-        uploaded_files = st.file_uploader("Verzeichnis hochladen (ZIP-Datei)", type=["zip"], accept_multiple_files=False)
+        uploaded_files = st.file_uploader("Verzeichnis hochladen (ZIP- oder tar-Archiv)", type=["zip", "tar", "gz", "tgz"], accept_multiple_files=False)
         
         directory_path = st.text_input("ODER Verzeichnispfad eingeben (lokal)", 
                                      placeholder="z.B. C:/MeinProjekt",
@@ -265,80 +943,94 @@ with tab1:
                                   step=1,
                                   help="Anzahl der Entwickler, die an diesem Projekt arbeiten würden")
         
+        productivity_uncertainty = st.slider("Unsicherheit der Produktivität (± %)", 
+                                             min_value=0, 
+                                             max_value=60, 
+                                             value=30, 
+                                             step=5,
+                                             help="Bandbreite der Monte-Carlo-Schätzung; Arbeitstage, produktive Zeit und Teameffizienz streuen zusätzlich")
+        
         exclude_dirs = st.text_input("Verzeichnisse ausschließen (kommagetrennt)", 
-                                   value="node_modules,venv,.git,__pycache__",
-                                   help="Diese Verzeichnisse werden bei der Analyse übersprungen")
+                                   value=",".join(DEFAULT_EXCLUDE_DIRS),
+                                   help="Diese Verzeichnisse werden bei der Analyse übersprungen; Platzhalter wie '.venv*' sind erlaubt")
         
         exclude_dirs = [d.strip() for d in exclude_dirs.split(",") if d.strip()]
         
+        use_gitignore = st.checkbox("'.gitignore' beachten", 
+                                    value=True,
+                                    help="Dateien und Verzeichnisse, die in .gitignore-Dateien des Verzeichnisses ausgeschlossen sind, werden übersprungen")
+        
+        use_scan_cache = st.checkbox("Scan-Cache verwenden", 
+                                     value=True,
+                                     help="Unveränderte Dateien werden bei erneuter Analyse eines Verzeichnisses aus dem Cache übernommen")
+        
+        dedupe_files = st.checkbox("Identische Dateien nur einmal zählen", 
+                                   value=False,
+                                   help="Byte-identische Kopien (z.B. Vendoring, generierter Code) werden erkannt und für die Aufwandsschätzung nur einmal gezählt")
+        
+        oversize_label = st.selectbox(f"Übergroße Dateien (> {OVERSIZE_FILE_SIZE // (1024 * 1024)} MB)", 
+                                      list(OVERSIZE_OPTIONS),
+                                      help="Große Dateien werden immer blockweise mit festem Speicherbedarf gelesen; z.B. SQL-Dumps oder minifizierte Bundles können stattdessen grob oder gar nicht gezählt werden")
+        oversize_action = OVERSIZE_OPTIONS[oversize_label]
+        
+        profile_scan = st.checkbox("Scan messen", 
+                                   value=False,
+                                   help="Zeit pro Phase, übersprungene und langsamste Dateien sowie Durchsatz pro Sprache erfassen")
+        
+        show_history = st.checkbox("Wachstum über die Git-Historie anzeigen", 
+                                   value=False,
+                                   help="Nur für lokale Git-Repositorys: zählt ausgewählte Revisionen direkt aus der Git-Datenbank")
+        
+        if show_history:
+            history_tags_only = st.checkbox("Nur Tags auswerten", value=False)
+            history_every = st.number_input("Jeden N-ten Commit auswerten", 
+                                            min_value=1, 
+                                            value=10, 
+                                            step=1,
+                                            disabled=history_tags_only)
+        
         analyze_button = st.button("Analysieren", type="primary")
+        
+        # Nach der ersten Analyse bleiben die Ergebnisse bei Parameteränderungen sichtbar
+        if analyze_button:
+            st.session_state['analysis_requested'] = True
     
     with col2:
-        if analyze_button and (uploaded_files or directory_path):
-            # Verarbeitung der hochgeladenen ZIP-Datei
+        if st.session_state.get('analysis_requested') and (uploaded_files or directory_path):
+            # Verarbeitung des hochgeladenen Archivs
             if uploaded_files:
-                with st.spinner('Entpacke ZIP-Datei und analysiere Codebasis... Bitte warten.'):
+                with st.spinner('Analysiere Archiv... Bitte warten.'):
                     try:
                         # Debugging-Ausgabe
                         st.write(f"Verarbeite hochgeladene Datei: {uploaded_files.name}, Größe: {uploaded_files.size} bytes")
                         
-                        # Temporäres Verzeichnis erstellen
-                        temp_dir = tempfile.mkdtemp()
-                        st.write(f"Temporäres Verzeichnis erstellt: {temp_dir}")
+                        # Analyse direkt aus dem Archiv, ohne Entpacken auf die Festplatte;
+                        # dasselbe Archiv wird über den Hash seines Inhalts wiedererkannt
+                        archive_bytes = uploaded_files.getvalue()
+                        archive_fingerprint = hashlib.blake2b(archive_bytes, digest_size=16).hexdigest()
+                        result_df, stats = run_scan(('archive', archive_fingerprint, tuple(exclude_dirs), oversize_action,
+                                                     profile_scan),
+                                                    scan_archive, archive_bytes, tuple(exclude_dirs), oversize_action,
+                                                    profile_scan)
+                        st.write(f"Analysierte Code-Dateien im Archiv: {stats['total_files']}")
                         
-                        try:
-                            # ZIP-Datei in das temporäre Verzeichnis extrahieren
-                            with zipfile.ZipFile(uploaded_files, 'r') as zip_ref:
-                                # Liste aller Dateien in der ZIP anzeigen
-                                file_list = zip_ref.namelist()
-                                st.write(f"Anzahl der Dateien in ZIP: {len(file_list)}")
-                                if len(file_list) > 0:
-                                    st.write(f"Beispieldateien: {file_list[:5]}")
-                                
-                                # Extrahieren
-                                zip_ref.extractall(temp_dir)
-                                st.write(f"Dateien wurden nach {temp_dir} extrahiert")
-                            
-                            # Überprüfen, ob Dateien extrahiert wurden
-                            extracted_files = os.listdir(temp_dir)
-                            st.write(f"Extrahierte Dateien: {len(extracted_files)} Dateien/Verzeichnisse gefunden")
-                            if len(extracted_files) > 0:
-                                st.write(f"Beispiel extrahierte Dateien/Verzeichnisse: {extracted_files[:5]}")
-                            
-                            # Analyse durchführen
-                            result_df, stats = count_lines_in_directory(temp_dir, exclude_dirs)
-                            
-                            # Aufwandsschätzung
-                            effort_months, cost = estimate_effort_and_cost(stats['total_code_lines'], team_size, dev_salary)
-                            
-                            # Gemeinsame Funktion zur Anzeige der Analyseergebnisse
-                            display_analysis_results(result_df, stats, effort_months, cost)
-                            
-                            # Temporäres Verzeichnis bereinigen
-                            try:
-                                if os.path.exists(temp_dir):
-                                    shutil.rmtree(temp_dir)
-                                    st.write("Temporäres Verzeichnis wurde bereinigt.")
-                            except Exception as cleanup_error:
-                                st.warning(f"Hinweis: Konnte temporäres Verzeichnis nicht bereinigen: {str(cleanup_error)}")
-                            
-                        except Exception as e:
-                            st.markdown(f"""
-                            <div style="background-color: #FEE2E2; color: #B91C1C; padding: 1rem; border-radius: 5px; margin-bottom: 1rem;">
-                                <h4 style="margin-top: 0;">⚠️ Fehler bei der Analyse</h4>
-                                <p>Fehler bei der Verarbeitung der ZIP-Datei: {str(e)}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            # Temporäres Verzeichnis bereinigen
-                            if os.path.exists(temp_dir):
-                                shutil.rmtree(temp_dir)
-                            st.stop()
+                        # Aufwandsschätzung
+                        effort_months, cost = estimate_effort_and_cost(stats['total_code_lines'], team_size, dev_salary)
+                        estimate_distribution = estimate_distribution_for(stats['total_code_lines'], team_size, dev_salary,
+                                                                          productivity_uncertainty)
+                        
+                        # Gemeinsame Funktion zur Anzeige der Analyseergebnisse
+                        result_key = ('archive', archive_fingerprint, tuple(exclude_dirs), oversize_action)
+                        display_analysis_results(result_df, stats, effort_months, cost, result_key, estimate_distribution)
+                        display_directory_breakdown(stats['directory_tree'], result_key, team_size, dev_salary)
+                        display_scenario_heatmap(stats['total_code_lines'], team_size, dev_salary)
+                        display_snapshot_download(result_df, stats, result_key, uploaded_files.name)
                     
                     except Exception as e:
                         st.markdown(f"""
                         <div style="background-color: #FEE2E2; color: #B91C1C; padding: 1rem; border-radius: 5px; margin-bottom: 1rem;">
                             <h4 style="margin-top: 0;">⚠️ Fehler bei der Analyse</h4>
-                            <p>{str(e)}</p>
+                            <p>Fehler bei der Verarbeitung des Archivs: {str(e)}</p>
                         </div>
                         """, unsafe_allow_html=True)
                         st.stop()
@@ -347,13 +1039,36 @@ with tab1:
             elif directory_path:
                 with st.spinner('Analysiere Codebasis... Bitte warten.'):
                     try:
-                        result_df, stats = count_lines_in_directory(directory_path, exclude_dirs)
+                        # Erneuter Scan nur, wenn sich Dateien geändert haben
+                        scan_settings = ('directory', directory_path, tuple(exclude_dirs), use_scan_cache, dedupe_files,
+                                         oversize_action, use_gitignore, profile_scan)
+                        tree_fingerprint = current_tree_fingerprint(scan_settings, directory_path, exclude_dirs,
+                                                                    use_gitignore)
+                        result_df, stats = run_scan(scan_settings + (tree_fingerprint,), scan_directory,
+                                                    directory_path, tuple(exclude_dirs), use_scan_cache, dedupe_files,
+                                                    oversize_action, use_gitignore, profile_scan)
                         
-                        # Aufwandsschätzung
-                        effort_months, cost = estimate_effort_and_cost(stats['total_code_lines'], team_size, dev_salary)
+                        # Aufwandsschätzung (auf Wunsch ohne doppelte Dateien)
+                        estimate_lines = stats['unique_code_lines'] if dedupe_files else stats['total_code_lines']
+                        effort_months, cost = estimate_effort_and_cost(estimate_lines, team_size, dev_salary)
+                        estimate_distribution = estimate_distribution_for(estimate_lines, team_size, dev_salary,
+                                                                          productivity_uncertainty)
                         
                         # Gemeinsame Funktion zur Anzeige der Analyseergebnisse
-                        display_analysis_results(result_df, stats, effort_months, cost)
+                        result_key = ('directory', directory_path, tuple(exclude_dirs), tree_fingerprint, dedupe_files,
+                                      oversize_action, use_gitignore)
+                        display_analysis_results(result_df, stats, effort_months, cost, result_key, estimate_distribution)
+                        display_directory_breakdown(stats['directory_tree'], result_key, team_size, dev_salary)
+                        display_scenario_heatmap(estimate_lines, team_size, dev_salary)
+                        display_snapshot_download(result_df, stats, result_key, directory_path)
+                        
+                        if show_history:
+                            try:
+                                history_df = git_history_with_estimate(directory_path, history_every, history_tags_only,
+                                                                       exclude_dirs, team_size, dev_salary)
+                                display_history_results(history_df)
+                            except ValueError as history_error:
+                                st.warning(f"Git-Historie nicht verfügbar: {str(history_error)}")
                     
                     except Exception as e:
                         st.markdown(f"""
@@ -382,6 +1097,9 @@ with tab1:
             </div>
             """, unsafe_allow_html=True)
 
+with tab_compare:
+    display_snapshot_comparison(team_size, dev_salary)
+
 with tab2:
     st.markdown("""
     <div style="background-color: #F8FAFC; padding: 2rem; border-radius: 8px; margin-bottom: 2rem; box-shadow: 0 4px 6px rgba(0,0,0,0.05);">
@@ -0,0 +1,236 @@
+"""
+Erzeugt reproduzierbare synthetische Verzeichnisbäume für die Benchmarks.
+
+Derselbe CorpusSpec ergibt bei gleichem seed immer dieselben Dateien; ein
+bereits erzeugter Baum wird anhand seines Manifests (neben dem Baum, damit
+es nicht mitgezählt wird) wiederverwendet.
+"""
+import os
+import json
+import math
+import random
+import shutil
+import hashlib
+
+# Endung der Manifest-Datei neben dem Wurzelverzeichnis eines erzeugten Baums
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Vorlagen pro Dateiendung: Code-Zeilen, Zeilenkommentar und Blockkommentar (Anfang, Ende)
+LANGUAGE_TEMPLATES = {
+    '.py': {
+        'code': ['def handle_{n}(value):', '    result = value * {n} + offset', '    return {{"id": {n}, "name": "item_{n}"}}',
+                 'for index in range({n}):', '    items.append(index)', 'class Model{n}(Base):'],
+        'line': '#',
+        'block': ('"""', '"""'),
+    },
+    '.js': {
+        'code': ['const value{n} = compute({n});', 'function handle{n}(event) {{', '  return fetch(`/api/{n}`);',
+                 '}}', "export default {{ id: {n}, url: 'http://example.com/{n}' }};"],
+        'line': '//',
+        'block': ('/*', '*/'),
+    },
+    '.java': {
+        'code': ['public int compute{n}(int value) {{', '    return value * {n};', '}}',
+                 'private final String name{n} = "item_{n}";', 'List<Integer> items{n} = new ArrayList<>();'],
+        'line': '//',
+        'block': ('/**', ' */'),
+    },
+    '.c': {
+        'code': ['static int compute_{n}(int value) {{', '    return value * {n};', '}}',
+                 'char *name_{n} = "item_{n}";', '#include "module_{n}.h"'],
+        'line': '//',
+        'block': ('/*', '*/'),
+    },
+    '.html': {
+        'code': ['<div class="item-{n}">', '  <a href="/items/{n}">Item {n}</a>', '</div>', '<p>Text {n}</p>'],
+        'line': None,
+        'block': ('<!--', '-->'),
+    },
+    '.css': {
+        'code': ['.item-{n} {{', '  margin: {n}px;', '  color: #{n:06d};', '}}'],
+        'line': None,
+        'block': ('/*', '*/'),
+    },
+    '.sql': {
+        'code': ['SELECT id, name FROM items WHERE id = {n};', "INSERT INTO items VALUES ({n}, 'item_{n}');",
+                 'UPDATE items SET value = {n} WHERE id = {n};'],
+        'line': '--',
+        'block': ('/*', '*/'),
+    },
+    '.sh': {
+        'code': ['echo "step {n}"', 'export VALUE_{n}={n}', 'if [ -f "file_{n}" ]; then', 'fi'],
+        'line': '#',
+        'block': None,
+    },
+}
+
+# Endungen von Binärdateien; '.js' mit binärem Inhalt prüft die Inhaltserkennung
+BINARY_EXTENSIONS = ['.png', '.so', '.js']
+
+class CorpusSpec:
+    """
+    Beschreibung eines synthetischen Verzeichnisbaums.
+    
+    Die Dateigrößen folgen einer Log-Normalverteilung um median_size; dazu
+    kommen huge_file_count Dateien mit huge_file_size Bytes, die den
+    blockweisen Zählpfad erreichen.
+    """
+    
+    def __init__(self, file_count=2000, median_size=4096, size_sigma=1.0, language_mix=None,
+                 comment_density=0.25, blank_density=0.12, binary_fraction=0.03, max_depth=6,
+                 files_per_directory=20, huge_file_count=0, huge_file_size=16 * 1024 * 1024, seed=0):
+        """
+        Args:
+            file_count: Anzahl der normalen Dateien (inklusive Binärdateien)
+            median_size: Median der Dateigröße in Bytes
+            size_sigma: Streuung der Log-Normalverteilung (0 = alle Dateien gleich groß)
+            language_mix: Dict Dateiendung -> Gewicht (Standard: alle LANGUAGE_TEMPLATES gleich)
+            comment_density: Anteil der Kommentarzeilen
+            blank_density: Anteil der Leerzeilen
+            binary_fraction: Anteil der Binärdateien
+            max_depth: Maximale Verschachtelungstiefe der Verzeichnisse
+            files_per_directory: Durchschnittliche Anzahl der Dateien pro Verzeichnis
+            huge_file_count: Anzahl zusätzlicher sehr großer Dateien
+            huge_file_size: Größe der sehr großen Dateien in Bytes
+            seed: Startwert des Zufallsgenerators
+        """
+        self.file_count = file_count
+        self.median_size = median_size
+        self.size_sigma = size_sigma
+        self.language_mix = dict(language_mix or {ext: 1 for ext in LANGUAGE_TEMPLATES})
+        self.comment_density = comment_density
+        self.blank_density = blank_density
+        self.binary_fraction = binary_fraction
+        self.max_depth = max_depth
+        self.files_per_directory = files_per_directory
+        self.huge_file_count = huge_file_count
+        self.huge_file_size = huge_file_size
+        self.seed = seed
+    
+    def as_dict(self):
+        return dict(vars(self))
+    
+    def fingerprint(self):
+        """Hash der Beschreibung; ändert sich mit jedem Parameter."""
+        return hashlib.sha1(json.dumps(self.as_dict(), sort_keys=True).encode('utf-8')).hexdigest()
+
+# Vordefinierte Bäume für python -m benchmarks.scan --profile
+PROFILES = {
+    # Schnell genug für jeden CI-Lauf
+    'quick': CorpusSpec(file_count=600, huge_file_count=0),
+    'default': CorpusSpec(file_count=3000, huge_file_count=1, huge_file_size=12 * 1024 * 1024),
+    # Tiefe Verschachtelung mit wenigen Dateien pro Verzeichnis
+    'deep': CorpusSpec(file_count=2000, max_depth=40, files_per_directory=3),
+    # Viele kleine Dateien
+    'many-files': CorpusSpec(file_count=30000, median_size=1024),
+    # Wenige Dateien über der Blockgröße und eine übergroße Datei
+    'huge': CorpusSpec(file_count=50, huge_file_count=3, huge_file_size=40 * 1024 * 1024),
+}
+
+def _text_content(rng, ext, size, comment_density, blank_density):
+    """Erzeugt ungefähr size Bytes Quelltext mit den angegebenen Anteilen an Kommentar- und Leerzeilen."""
+    template = LANGUAGE_TEMPLATES[ext]
+    lines = []
+    length = 0
+    while length < size:
+        roll = rng.random()
+        if roll < blank_density:
+            line = ''
+        elif roll < blank_density + comment_density and (template['line'] or template['block']):
+            if template['block'] and (not template['line'] or rng.random() < 0.3):
+                opener, closer = template['block']
+                body = [f' * Beschreibung {rng.randrange(10000)}' for _ in range(rng.randint(1, 4))]
+                line = '\n'.join([opener] + body + [closer])
+            else:
+                line = f"{template['line']} Kommentar {rng.randrange(10000)}"
+        else:
+            line = rng.choice(template['code']).format(n=rng.randrange(10000))
+        lines.append(line)
+        length += len(line) + 1
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def _binary_content(rng, size):
+    """Zufällige Bytes mit Nullbytes, wie sie die Binärerkennung erwartet."""
+    return rng.randbytes(min(size, 4096)) + b'\x00' * max(0, size - 4096)
+
+def _directories(rng, spec):
+    """Erzeugt die relativen Verzeichnispfade des Baums."""
+    directory_count = max(1, spec.file_count // spec.files_per_directory)
+    directories = ['']
+    for index in range(directory_count - 1):
+        # Zufälliger Elternknoten; tiefe Bäume hängen bevorzugt an das zuletzt erzeugte Verzeichnis
+        parent = directories[-1] if spec.max_depth > 10 and rng.random() < 0.8 else rng.choice(directories)
+        if parent.count('/') + 1 >= spec.max_depth:
+            parent = ''
+        directories.append(f'{parent}/pkg{index}' if parent else f'pkg{index}')
+    return directories
+
+def generate_corpus(root, spec):
+    """
+    Erzeugt den Baum unter root, sofern dort nicht schon derselbe Baum liegt.
+    
+    Args:
+        root: Zielverzeichnis; ein früher erzeugter Baum mit abweichendem Manifest wird ersetzt
+        spec: CorpusSpec
+    
+    Returns:
+        Manifest als Dict mit 'spec', 'fingerprint', 'files' (Anzahl aller Dateien) und 'bytes'
+    
+    Raises:
+        ValueError: Wenn root ein nicht leeres Verzeichnis ohne Manifest ist (nichts wird gelöscht)
+    """
+    manifest_path = os.path.normpath(root) + MANIFEST_SUFFIX
+    manifest = None
+    try:
+        with open(manifest_path, encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        pass
+    if manifest is not None and manifest.get('fingerprint') == spec.fingerprint():
+        return manifest
+    
+    if os.path.isdir(root) and os.listdir(root):
+        if manifest is None:
+            raise ValueError(f"{root} ist nicht leer und kein erzeugter Benchmark-Baum")
+        shutil.rmtree(root)
+    os.makedirs(root, exist_ok=True)
+    
+    rng = random.Random(spec.seed)
+    directories = _directories(rng, spec)
+    extensions = list(spec.language_mix)
+    weights = [spec.language_mix[ext] for ext in extensions]
+    total_bytes = 0
+    
+    def write(relative_path, data):
+        nonlocal total_bytes
+        path = os.path.join(root, *relative_path.split('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(data)
+        total_bytes += len(data)
+    
+    for index in range(spec.file_count):
+        directory = rng.choice(directories)
+        size = max(1, int(spec.median_size * math.exp(rng.gauss(0, spec.size_sigma))))
+        if rng.random() < spec.binary_fraction:
+            ext = rng.choice(BINARY_EXTENSIONS)
+            data = _binary_content(rng, size)
+        else:
+            ext = rng.choices(extensions, weights)[0]
+            data = _text_content(rng, ext, size, spec.comment_density, spec.blank_density)
+        write(f'{directory}/file{index}{ext}' if directory else f'file{index}{ext}', data)
+    
+    for index in range(spec.huge_file_count):
+        # Großer Dump aus wiederholten Blöcken, damit die Erzeugung schnell bleibt
+        block = _text_content(rng, '.sql', 64 * 1024, spec.comment_density, spec.blank_density)
+        write(f'data/dump{index}.sql', block * max(1, spec.huge_file_size // len(block)))
+    
+    manifest = {
+        'spec': spec.as_dict(),
+        'fingerprint': spec.fingerprint(),
+        'files': spec.file_count + spec.huge_file_count,
+        'bytes': total_bytes,
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    return manifest
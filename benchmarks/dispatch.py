@@ -0,0 +1,51 @@
+"""
+Misst die Kosten der Sprachzuordnung pro Datei in Abhängigkeit von der Anzahl registrierter Sprachen.
+
+Aufruf aus dem Projektverzeichnis:
+    python -m benchmarks.dispatch
+"""
+import timeit
+from code_counter import LanguageRegistry, COMMENT_SYNTAX
+
+# Anzahl zusätzlich registrierter Sprachen pro Messung
+LANGUAGE_COUNTS = [10, 100, 1000, 10000]
+
+# Typische Dateinamen eines Projekts (bekannt, per Dateiname, ohne Endung, unbekannt)
+FILE_NAMES = ['main.py', 'App.tsx', 'util.h', 'Makefile', 'Dockerfile', 'README', 'logo.png', 'style.css']
+
+# Dateianfang für die Shebang-Erkennung
+SCRIPT_HEADER = b'#!/usr/bin/env python3\nprint("hallo")\n'
+
+# Anzahl der Durchläufe über FILE_NAMES pro Messung
+REPEAT = 20000
+
+def build_registry(language_count):
+    """Registriert die angegebene Anzahl synthetischer Sprachen plus einige echte."""
+    registry = LanguageRegistry()
+    syntax = COMMENT_SYNTAX['py']
+    for i in range(language_count):
+        registry.register(f'Sprache {i}', [f'.x{i}'], [f'Buildfile{i}'], [f'interp{i}'], syntax)
+    registry.register('Python', ['.py'], interpreters=['python3'], syntax=syntax)
+    registry.register('TypeScript', ['.tsx', '.h', '.css'], syntax=COMMENT_SYNTAX['js|jsx|ts|tsx'])
+    registry.register('Makefile', filenames=['Makefile', 'Dockerfile'], syntax=COMMENT_SYNTAX['sh|r'])
+    return registry
+
+def measure(language_count):
+    """Gibt die durchschnittliche Zeit pro Datei in Nanosekunden zurück."""
+    registry = build_registry(language_count)
+    detect = registry.detect
+    
+    def run():
+        for file_name in FILE_NAMES:
+            detect(file_name, SCRIPT_HEADER)
+    
+    seconds = min(timeit.repeat(run, number=REPEAT, repeat=5))
+    return seconds / (REPEAT * len(FILE_NAMES)) * 1e9
+
+def main():
+    print(f"{'Sprachen':>10} {'ns pro Datei':>14}")
+    for language_count in LANGUAGE_COUNTS:
+        print(f"{language_count:>10} {measure(language_count):>14.0f}")
+
+if __name__ == '__main__':
+    main()
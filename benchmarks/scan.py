@@ -0,0 +1,255 @@
+"""
+Misst die Zählpfade auf synthetischen Verzeichnisbäumen (siehe benchmarks.corpus).
+
+Jeder Pfad läuft in einem eigenen Prozess, damit der Spitzenspeicher nur
+ihn erfasst. Die Ergebnisse werden mit dem gespeicherten Stand in
+benchmarks/baseline.json verglichen; ist ein Pfad langsamer oder braucht er
+mehr Speicher als erlaubt, oder zählt er anders, endet der Aufruf mit
+Exit-Code 1.
+
+Aufruf aus dem Projektverzeichnis:
+    python -m benchmarks.scan                                  # Profil 'quick'
+    python -m benchmarks.scan --profile default
+    python -m benchmarks.scan --profile default --update-baseline
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import zipfile
+
+try:
+    import resource
+except ImportError:
+    # Nicht unter Windows; der Spitzenspeicher wird dann nicht gemessen
+    resource = None
+
+from benchmarks.corpus import PROFILES, generate_corpus
+
+# Projektverzeichnis (Arbeitsverzeichnis der Mess-Prozesse)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Gespeicherter Stand, mit dem verglichen wird
+BASELINE_PATH = os.path.join(PROJECT_DIR, 'benchmarks', 'baseline.json')
+
+# Erlaubte Verschlechterung von Durchsatz und Spitzenspeicher gegenüber dem Stand (Anteil)
+DEFAULT_TOLERANCE = 0.25
+
+# Zusätzlich erlaubter Spitzenspeicher in MB, damit kleine Werte nicht am Messrauschen scheitern
+MEMORY_SLACK_MB = 8
+
+# Durchläufe pro Pfad; gewertet wird der schnellste
+DEFAULT_REPEAT = 3
+
+# Aufrufe von estimate_effort_and_cost pro Durchlauf
+ESTIMATE_CALLS = 100000
+
+def _peak_memory_mb():
+    """Bisheriger Spitzenwert des Arbeitsspeichers dieses Prozesses in MB (None ohne resource)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux meldet KB, macOS Bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _list_files(root):
+    return [os.path.join(directory, file_name) for directory, _, files in os.walk(root) for file_name in files]
+
+def _setup_count_lines_in_file(root):
+    from code_counter import count_lines_in_file
+    paths = _list_files(root)
+    
+    def run():
+        return sum(count_lines_in_file(path)[2] for path in paths)
+    return run, len(paths), sum(os.path.getsize(path) for path in paths)
+
+def _setup_count_lines_in_directory(root):
+    from code_counter import count_lines_in_directory
+    # pandas vorab laden, damit der Import nicht als Spitzenspeicher des Pfads zählt
+    import pandas
+    paths = _list_files(root)
+    
+    def run():
+        return count_lines_in_directory(root)[1]['total_code_lines']
+    return run, len(paths), sum(os.path.getsize(path) for path in paths)
+
+def _setup_count_lines_in_archive(root):
+    # Upload-Pfad der App: ZIP im Speicher, gelesen ohne Entpacken
+    from code_counter import count_lines_in_archive
+    import pandas
+    paths = _list_files(root)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for path in paths:
+            zip_file.write(path, os.path.relpath(path, root))
+    archive_bytes = buffer.getvalue()
+    
+    def run():
+        return count_lines_in_archive(io.BytesIO(archive_bytes))[1]['total_code_lines']
+    return run, len(paths), sum(os.path.getsize(path) for path in paths)
+
+def _setup_estimate_effort_and_cost(root):
+    from code_counter import estimate_effort_and_cost
+    
+    def run():
+        return round(sum(estimate_effort_and_cost(lines * 37, 1 + lines % 12, 8000)[1]
+                         for lines in range(ESTIMATE_CALLS)), 2)
+    return run, ESTIMATE_CALLS, None
+
+# Gemessene Pfade: Name -> Funktion corpus_root -> (run, Anzahl Dateien bzw. Aufrufe, Bytes oder None)
+BENCHMARKS = {
+    'count_lines_in_file': _setup_count_lines_in_file,
+    'count_lines_in_directory': _setup_count_lines_in_directory,
+    'count_lines_in_archive': _setup_count_lines_in_archive,
+    'estimate_effort_and_cost': _setup_estimate_effort_and_cost,
+}
+
+def measure(name, root, repeat=DEFAULT_REPEAT):
+    """
+    Misst einen Pfad im aktuellen Prozess.
+    
+    Returns:
+        Dict mit 'items_per_s' (Dateien bzw. Aufrufe pro Sekunde), 'mb_per_s' (None ohne Bytes),
+        'peak_mb' (zusätzlicher Spitzenspeicher während der Messung, None ohne resource),
+        'seconds' (schnellster Durchlauf) und 'result' (Prüfwert, z.B. die Code-Zeilen)
+    """
+    run, items, total_bytes = BENCHMARKS[name](root)
+    memory_before = _peak_memory_mb()
+    
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    
+    memory_after = _peak_memory_mb()
+    return {
+        'items_per_s': items / best,
+        'mb_per_s': total_bytes / (1024 * 1024) / best if total_bytes is not None else None,
+        'peak_mb': max(0.0, memory_after - memory_before) if memory_before is not None else None,
+        'seconds': best,
+        'result': result,
+    }
+
+def _measure_in_subprocess(name, root, repeat):
+    """Misst einen Pfad in einem frischen Interpreter und gibt das Ergebnis-Dict zurück."""
+    completed = subprocess.run([sys.executable, '-m', 'benchmarks.scan', '--child', name, root,
+                                '--repeat', str(repeat)],
+                               cwd=PROJECT_DIR, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} fehlgeschlagen:\n{completed.stderr}")
+    # Letzte Zeile; Meldungen des Zählers davor werden ignoriert
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Vergleicht Messergebnisse mit dem gespeicherten Stand eines Profils.
+    
+    Args:
+        results: Dict Pfad -> Ergebnis von measure
+        baseline: Dict Pfad -> gespeichertes Ergebnis
+        tolerance: Erlaubte Verschlechterung (Anteil)
+    
+    Returns:
+        Liste von Meldungen, leer wenn nichts schlechter geworden ist
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result['items_per_s'] < reference['items_per_s'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['items_per_s']:,.0f}/s statt {reference['items_per_s']:,.0f}/s")
+        if (result['peak_mb'] is not None and reference.get('peak_mb') is not None
+                and result['peak_mb'] > reference['peak_mb'] * (1 + tolerance) + MEMORY_SLACK_MB):
+            regressions.append(f"{name}: {result['peak_mb']:.1f} MB Spitzenspeicher statt {reference['peak_mb']:.1f} MB")
+        if result['result'] != reference['result']:
+            regressions.append(f"{name}: Ergebnis {result['result']} statt {reference['result']} "
+                               f"(geänderte Zählregeln? Dann --update-baseline)")
+    return regressions
+
+def _load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {'profiles': {}}
+
+def _format_optional(value, format_spec):
+    return format(value, format_spec) if value is not None else '–'
+
+def _build_argument_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.scan', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick', help="Synthetischer Baum (Standard: quick)")
+    parser.add_argument('--corpus-dir', help='Verzeichnis des erzeugten Baums (Standard: im Temp-Verzeichnis)')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='Nur diesen Pfad messen')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help='Durchläufe pro Pfad')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Erlaubte Verschlechterung gegenüber dem Stand (Standard: 0.25)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Datei des gespeicherten Stands')
+    parser.add_argument('--update-baseline', action='store_true', help='Stand mit dieser Messung überschreiben')
+    parser.add_argument('--json', metavar='PFAD', help='Messergebnisse zusätzlich als JSON speichern')
+    parser.add_argument('--child', nargs=2, metavar=('PFAD', 'BAUM'), help=argparse.SUPPRESS)
+    return parser
+
+def main(argv=None):
+    args = _build_argument_parser().parse_args(argv)
+    
+    if args.child:
+        name, root = args.child
+        print(json.dumps(measure(name, root, args.repeat)))
+        return 0
+    
+    corpus_dir = args.corpus_dir or os.path.join(tempfile.gettempdir(), 'code_counter_benchmarks', args.profile)
+    manifest = generate_corpus(corpus_dir, PROFILES[args.profile])
+    print(f"Profil {args.profile}: {manifest['files']:,} Dateien, {manifest['bytes'] / (1024 * 1024):,.1f} MB in {corpus_dir}")
+    
+    baseline_data = _load_baseline(args.baseline)
+    baseline = baseline_data['profiles'].get(args.profile, {}).get('paths', {})
+    
+    results = {}
+    print(f"\n{'Pfad':<26} {'Dateien/s':>12} {'MB/s':>8} {'Speicher MB':>12} {'Stand/s':>12} {'Änderung':>9}")
+    for name in args.only or BENCHMARKS:
+        result = results[name] = _measure_in_subprocess(name, corpus_dir, args.repeat)
+        reference = baseline.get(name)
+        change = (f"{result['items_per_s'] / reference['items_per_s'] - 1:+.0%}" if reference else '–')
+        print(f"{name:<26} {result['items_per_s']:>12,.0f} {_format_optional(result['mb_per_s'], '>8.1f')} "
+              f"{_format_optional(result['peak_mb'], '>12.1f')} "
+              f"{_format_optional(reference and reference['items_per_s'], '>12,.0f')} {change:>9}")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump({'profile': args.profile, 'paths': results}, file, indent=2)
+    
+    if args.update_baseline:
+        profile_baseline = baseline_data['profiles'].setdefault(args.profile, {'paths': {}})
+        profile_baseline['machine'] = {'python': platform.python_version(), 'platform': platform.platform(),
+                                       'cpus': os.cpu_count()}
+        profile_baseline['paths'].update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(baseline_data, file, indent=2, sort_keys=True)
+            file.write('\n')
+        print(f"\nStand gespeichert in {args.baseline}")
+        return 0
+    
+    if not baseline:
+        print(f"\nKein gespeicherter Stand für {args.profile}; mit --update-baseline anlegen")
+        return 0
+    
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("\nVerschlechterungen gegenüber dem gespeicherten Stand:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nKeine Verschlechterung gegenüber dem gespeicherten Stand")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+import os
+import sys
+import json
+import time
+from scan_cache import ScanCache
+from code_counter import (DEFAULT_EXCLUDE_DIRS, OVERSIZE_ACTIONS, OversizePolicy, ScanProfile, write_file_counts,
+                          _make_estimate, _scan_archive_results, _scan_directory_results)
+from portfolio import PortfolioTotals, iter_portfolio_counts, read_portfolio_manifest
+
+# Ausgabeformate der Kommandozeile
+CLI_FORMATS = ('table', 'json', 'csv')
+
+# Standardwerte der Schätzung auf der Kommandozeile (wie in der App)
+CLI_DEFAULT_TEAM_SIZE = 3
+CLI_DEFAULT_SALARY = 8000
+
+def _build_argument_parser():
+    """Erstellt den Parser für `python -m code_counter`."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog='python -m code_counter',
+        description='Zählt die Code-Zeilen eines Verzeichnisses oder Archivs und schätzt Aufwand und Kosten.')
+    parser.add_argument('source', nargs='*',
+                        help='Verzeichnis oder Archiv (ZIP, tar, tar.gz); mehrere Verzeichnisse werden als Portfolio '
+                             'gescannt')
+    parser.add_argument('--manifest', metavar='DATEI',
+                        help='Portfolio-Scan der Verzeichnisse in DATEI (eines pro Zeile, # für Kommentare)')
+    parser.add_argument('--format', choices=CLI_FORMATS, default='table',
+                        help='Ausgabeformat; csv enthält die Zeilenzahlen pro Datei (Standard: table)')
+    parser.add_argument('--files', action='store_true',
+                        help='Zeilenzahlen pro Datei zusätzlich ausgeben (table und json)')
+    parser.add_argument('-o', '--output', help='Ausgabedatei (Standard: Standardausgabe)')
+    parser.add_argument('--exclude', default=','.join(DEFAULT_EXCLUDE_DIRS),
+                        help='Auszuschließende Verzeichnisse, kommagetrennt; Platzhalter wie .venv* sind erlaubt')
+    parser.add_argument('--no-gitignore', dest='use_gitignore', action='store_false',
+                        help='.gitignore-Dateien nicht beachten')
+    parser.add_argument('--workers', type=int,
+                        help='Anzahl der Worker-Prozesse (0 = alle CPU-Kerne, Standard: 1, im Portfolio-Scan alle '
+                             'CPU-Kerne)')
+    parser.add_argument('--cache', action='store_true', help='Scan-Cache verwenden')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Identische Dateien nur einmal zählen (nur für Verzeichnisse)')
+    parser.add_argument('--oversize', choices=OVERSIZE_ACTIONS, default='stream',
+                        help='Behandlung übergroßer Dateien (Standard: stream)')
+    parser.add_argument('--team-size', type=int, default=CLI_DEFAULT_TEAM_SIZE, help='Teamgröße für die Schätzung')
+    parser.add_argument('--salary', type=float, default=CLI_DEFAULT_SALARY,
+                        help='Monatsgehalt eines Entwicklers in Euro für die Schätzung')
+    parser.add_argument('--chart', metavar='HTML',
+                        help='Verteilung nach Dateityp als Plotly-Diagramm in eine HTML-Datei schreiben')
+    parser.add_argument('--profile', metavar='JSON',
+                        help='Scan messen (Phasen, übersprungene und langsamste Dateien) und als JSON speichern')
+    parser.add_argument('--snapshot', metavar='PFAD',
+                        help='Ergebnisse und Statistik als Snapshot speichern (Arrow IPC, bei .parquet Parquet)')
+    parser.add_argument('--snapshot-label', metavar='NAME', help='Bezeichnung des Snapshots, z.B. das Release')
+    return parser
+
+def _scan_source(args, profile=None):
+    """Scannt Verzeichnis oder Archiv der Kommandozeile; gibt (Ergebnisse, Statistik) zurück."""
+    exclude_dirs = [d.strip() for d in args.exclude.split(',') if d.strip()]
+    oversize_policy = OversizePolicy(args.oversize)
+    
+    if not os.path.isdir(args.source):
+        return _scan_archive_results(args.source, exclude_dirs, oversize_policy=oversize_policy, profile=profile)
+    
+    if args.cache:
+        with ScanCache() as cache:
+            return _scan_directory_results(args.source, exclude_dirs, args.workers, cache, args.dedupe,
+                                           oversize_policy, args.use_gitignore, profile)
+    return _scan_directory_results(args.source, exclude_dirs, args.workers, None, args.dedupe,
+                                   oversize_policy, args.use_gitignore, profile)
+
+def _write_table(output, results, stats, estimate, show_files):
+    """Schreibt Statistik, Verteilung nach Dateityp und Schätzung als Text-Tabellen."""
+    output.write(f"Dateien:      {stats['total_files']:>12,}\n")
+    output.write(f"Zeilen:       {stats['total_lines']:>12,}\n")
+    output.write(f"Leerzeilen:   {stats['total_empty_lines']:>12,}\n")
+    output.write(f"Code-Zeilen:  {stats['total_code_lines']:>12,}\n")
+    if 'unique_code_lines' in stats:
+        output.write(f"Ohne Kopien:  {stats['unique_code_lines']:>12,} ({stats['duplicate_files']} Duplikate)\n")
+    
+    by_extension = sorted(stats['lines_by_extension'].items(), key=lambda item: item[1], reverse=True)
+    if by_extension:
+        width = max(len('Dateityp'), max(len(ext_key) for ext_key, _ in by_extension))
+        output.write(f"\n{'Dateityp':<{width}}  {'Code-Zeilen':>12}\n")
+        for ext_key, code_lines in by_extension:
+            output.write(f"{ext_key:<{width}}  {code_lines:>12,}\n")
+    
+    if stats['oversized_files']:
+        output.write("\nÜbergroße Dateien:\n")
+        for entry in stats['oversized_files']:
+            output.write(f"  {entry['file_path']} ({entry['handling']})\n")
+    
+    if show_files and results:
+        width = max(len(result['file_path']) for result in results)
+        output.write(f"\n{'Datei':<{width}}  {'Zeilen':>10}  {'Leer':>10}  {'Code':>10}\n")
+        for result in results:
+            output.write(f"{result['file_path']:<{width}}  {result['total_lines']:>10,}  "
+                         f"{result['empty_lines']:>10,}  {result['code_lines']:>10,}\n")
+    
+    output.write(f"\nSchätzung ({estimate['team_size']} Entwickler, {estimate['dev_monthly_salary']:,.0f} € pro Monat):\n")
+    output.write(f"Aufwand:      {estimate['effort_months']:>12,.1f} Monate\n")
+    output.write(f"Kosten:       {estimate['total_cost']:>12,.2f} €\n")
+
+def _write_portfolio_summary(output, summary):
+    """Schreibt die Zusammenfassung eines Portfolio-Scans als Text-Tabelle."""
+    output.write(f"\nRepositorys:  {summary['repositories']:>12,}")
+    if summary['failed_repositories']:
+        output.write(f" ({len(summary['failed_repositories'])} fehlgeschlagen)")
+    output.write("\n")
+    output.write(f"Dateien:      {summary['total_files']:>12,}\n")
+    output.write(f"Zeilen:       {summary['total_lines']:>12,}\n")
+    output.write(f"Code-Zeilen:  {summary['total_code_lines']:>12,}\n")
+    if summary['estimate_lines'] != summary['total_code_lines']:
+        output.write(f"Ohne Kopien:  {summary['estimate_lines']:>12,}\n")
+    
+    output.write(f"\nSchätzung ({summary['team_size']} Entwickler, {summary['dev_monthly_salary']:,.0f} € pro Monat):\n")
+    output.write(f"Aufwand:      {summary['effort_months']:>12,.1f} Monate (Summe pro Repository)\n")
+    output.write(f"Kosten:       {summary['total_cost']:>12,.2f} € (Summe pro Repository)\n")
+    output.write(f"Aufwand:      {summary['combined_effort_months']:>12,.1f} Monate (als eine Codebasis)\n")
+    output.write(f"Kosten:       {summary['combined_total_cost']:>12,.2f} € (als eine Codebasis)\n")
+    
+    if summary['failed_repositories']:
+        output.write("\nFehlgeschlagen:\n")
+        for entry in summary['failed_repositories']:
+            output.write(f"  {entry['source']}: {entry['error']}\n")
+
+def _run_portfolio(parser, args):
+    """
+    Portfolio-Scan der Kommandozeile (mehrere Verzeichnisse oder --manifest).
+    
+    Jedes Repository wird ausgegeben, sobald es fertig ist: als Tabellenzeile
+    bzw. bei --format json als eine JSON-Zeile pro Repository; am Ende folgt
+    die Zusammenfassung (bei json als Zeile mit dem Schlüssel 'portfolio').
+    
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 wenn ein Repository nicht gescannt werden konnte)
+    """
+    unsupported = [option for option, value in (('--format csv', args.format == 'csv'), ('--files', args.files),
+                                                ('--chart', args.chart), ('--profile', args.profile),
+                                                ('--snapshot', args.snapshot)) if value]
+    if unsupported:
+        parser.error(f"Im Portfolio-Scan nicht möglich: {', '.join(unsupported)}")
+    
+    roots = list(args.source)
+    if args.manifest:
+        try:
+            roots.extend(read_portfolio_manifest(args.manifest))
+        except OSError as e:
+            print(f"Manifest kann nicht gelesen werden: {e}", file=sys.stderr)
+            return 1
+    exclude_dirs = [d.strip() for d in args.exclude.split(',') if d.strip()]
+    totals = PortfolioTotals(args.team_size, args.salary)
+    
+    cache = ScanCache() if args.cache else None
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format != 'json':
+            output.write(f"{'Code-Zeilen':>12}  {'Aufwand (Monate)':>16}  {'Kosten (€)':>16}  Repository\n")
+        for report in iter_portfolio_counts(roots, exclude_dirs, args.workers, cache, args.dedupe,
+                                            OversizePolicy(args.oversize), args.use_gitignore, args.team_size,
+                                            args.salary):
+            totals.add(report)
+            if args.format == 'json':
+                json.dump(report, output, ensure_ascii=False)
+            elif 'error' in report:
+                output.write(f"{'Fehler':>12}  {'':>16}  {'':>16}  {report['source']}: {report['error']}")
+            else:
+                estimate = report['estimate']
+                output.write(f"{report['stats']['total_code_lines']:>12,}  {estimate['effort_months']:>16,.1f}  "
+                             f"{estimate['total_cost']:>16,.2f}  {report['source']}")
+            output.write('\n')
+            output.flush()
+        
+        summary = totals.as_summary()
+        if args.format == 'json':
+            json.dump({'portfolio': summary}, output, ensure_ascii=False)
+            output.write('\n')
+        else:
+            _write_portfolio_summary(output, summary)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if cache is not None:
+            cache.close()
+    
+    return 1 if summary['failed_repositories'] else 0
+
+def _write_language_chart(lines_by_extension, path):
+    """Speichert die Verteilung der Code-Zeilen nach Dateityp als Kuchendiagramm (lädt pandas und plotly)."""
+    import pandas as pd
+    import plotly.express as px
+    
+    ext_df = pd.DataFrame(list(lines_by_extension.items()), columns=['Dateityp', 'Anzahl Zeilen'])
+    ext_df = ext_df.sort_values('Anzahl Zeilen', ascending=False)
+    fig = px.pie(ext_df, names='Dateityp', values='Anzahl Zeilen',
+                 title='Verteilung der Code-Zeilen nach Dateityp',
+                 color_discrete_sequence=px.colors.qualitative.Bold)
+    fig.write_html(path, include_plotlyjs='cdn')
+
+def main(argv=None):
+    """
+    Kommandozeile: `python -m code_counter PFAD [--format table|json|csv]`.
+    
+    Scan und Schätzung laufen ohne pandas, NumPy und plotly; diese werden
+    nur für --chart geladen, damit der Aufruf z.B. in CI-Pipelines schnell startet.
+    Mit mehreren Verzeichnissen oder --manifest wird ein Portfolio gescannt
+    (siehe _run_portfolio).
+    
+    Args:
+        argv: Argumente ohne Programmnamen (Standard: sys.argv[1:])
+    
+    Returns:
+        Exit-Code (0 bei Erfolg, 1 bei einem Fehler beim Scannen)
+    """
+    parser = _build_argument_parser()
+    args = parser.parse_args(argv)
+    if args.manifest or len(args.source) > 1:
+        return _run_portfolio(parser, args)
+    if not args.source:
+        parser.error("Verzeichnis, Archiv oder --manifest angeben")
+    args.source = args.source[0]
+    if args.workers is None:
+        args.workers = 1
+    if not os.path.exists(args.source):
+        parser.error(f"Pfad nicht gefunden: {args.source}")
+    
+    profile = ScanProfile() if args.profile else None
+    started = time.perf_counter()
+    try:
+        results, stats = _scan_source(args, profile)
+    except (OSError, ValueError) as e:
+        print(f"Fehler bei der Analyse: {e}", file=sys.stderr)
+        return 1
+    
+    if profile is not None:
+        profile.elapsed_seconds = time.perf_counter() - started
+        stats['profile'] = profile.as_dict()
+        with open(args.profile, 'w', encoding='utf-8') as profile_file:
+            json.dump(stats['profile'], profile_file, ensure_ascii=False, indent=2)
+    
+    estimate = _make_estimate(stats, args.team_size, args.salary)
+    
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        if args.format == 'json':
+            report = {'source': args.source, 'stats': stats, 'estimate': estimate}
+            if args.files:
+                report['files'] = list(results)
+            json.dump(report, output, ensure_ascii=False, indent=2)
+            output.write('\n')
+        elif args.format == 'csv':
+            write_file_counts(results, output, 'csv')
+        else:
+            _write_table(output, results, stats, estimate, args.files)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    
+    if args.chart:
+        try:
+            _write_language_chart(stats['lines_by_extension'], args.chart)
+        except ImportError as e:
+            print(f"Diagramm nicht möglich, pandas und plotly werden benötigt: {e}", file=sys.stderr)
+            return 1
+    
+    if args.snapshot:
+        try:
+            from snapshots import write_snapshot
+        except ImportError as e:
+            print(f"Snapshot nicht möglich, pandas und pyarrow werden benötigt: {e}", file=sys.stderr)
+            return 1
+        write_snapshot(args.snapshot, results.to_dataframe(), stats, source=args.source, label=args.snapshot_label)
+    
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,23 @@
 import os
 import re
-import pandas as pd
-from pathlib import Path
+import sys
+import csv
+import json
+import codecs
+import hashlib
+import posixpath
+import heapq
+import time
+from result_store import ScanResultStore
+from git_source import GitRepository
+from directory_walker import walk_files, compile_name_globs
+from estimation_rules import estimate_effort_and_cost_scalar
+
+try:
+    import xxhash
+except ImportError:
+    # Optional; ohne xxhash wird BLAKE2b aus hashlib verwendet
+    xxhash = None
 
 # Dateitypen, die als Code betrachtet werden
 CODE_EXTENSIONS = {
@@ -41,218 +57,2493 @@ CODE_EXTENSIONS = {
     '.r': 'R',
 }
 
-# Kommentarmuster für verschiedene Sprachen
-COMMENT_PATTERNS = {
-    # Single-line comment patterns
-    'single': {
-        'py': r'#.*?$',
-        'js|jsx|ts|tsx|java|c|cpp|cs|go|rs|swift|kt|dart|scala': r'//.*?$',
-        'html|xml': r'<!--.*?-->',
-        'sql': r'--.*?$',
-        'rb': r'#.*?$',
+# Dateien, die an ihrem exakten Namen erkannt werden:
+# Dateiname -> (Sprache, Dateiendung, deren Kommentarsyntax gilt)
+CODE_FILENAMES = {
+    'Makefile': ('Makefile', '.sh'),
+    'makefile': ('Makefile', '.sh'),
+    'GNUmakefile': ('Makefile', '.sh'),
+    'Dockerfile': ('Dockerfile', '.sh'),
+    'Containerfile': ('Dockerfile', '.sh'),
+    'CMakeLists.txt': ('CMake', '.sh'),
+    'Rakefile': ('Ruby', '.rb'),
+    'Gemfile': ('Ruby', '.rb'),
+    'Vagrantfile': ('Ruby', '.rb'),
+    'Jenkinsfile': ('Groovy', '.java'),
+}
+
+# Skripte ohne Dateiendung werden an ihrer Shebang-Zeile erkannt:
+# Interpreter -> Dateiendung, deren Sprache gilt
+SHEBANG_INTERPRETERS = {
+    'python': '.py',
+    'python2': '.py',
+    'python3': '.py',
+    'sh': '.sh',
+    'bash': '.sh',
+    'dash': '.sh',
+    'ksh': '.sh',
+    'zsh': '.sh',
+    'node': '.js',
+    'ruby': '.rb',
+    'php': '.php',
+    'Rscript': '.r',
+    'pwsh': '.ps1',
+}
+
+# Verzeichnisse, die standardmäßig nicht analysiert werden (Glob-Muster für Verzeichnisnamen)
+DEFAULT_EXCLUDE_DIRS = ['node_modules', 'venv', '.venv*', '.git', '__pycache__', 'dist', 'build']
+
+# Spalten eines Ergebnisses pro Datei
+RESULT_FIELDS = ['file_path', 'language', 'extension', 'total_lines', 'empty_lines', 'code_lines']
+
+# Anzahl der Stapel pro Worker-Prozess im parallelen Modus; mehrere kleine
+# Stapel gleichen unterschiedlich schnelle Dateien besser aus
+BATCHES_PER_WORKER = 4
+
+# Stapel pro Worker, wenn Fortschritt gemeldet wird (häufigere Meldungen)
+PROGRESS_BATCHES_PER_WORKER = 16
+
+# Mindestabstand zwischen zwei Fortschrittsmeldungen in Sekunden
+PROGRESS_INTERVAL = 0.2
+
+# Größe des ersten Blocks, anhand dessen Binärdateien erkannt werden
+BINARY_CHECK_SIZE = 1024
+
+# Grenzen für die Analyse hochgeladener Archive (Schutz vor Archiv-Bomben)
+ARCHIVE_MAX_TOTAL_SIZE = 1024 * 1024 * 1024
+ARCHIVE_MAX_MEMBERS = 100000
+
+# Dateien oberhalb dieser Größe werden blockweise gezählt (Blockgröße in Bytes),
+# damit der Speicherbedarf pro Datei nicht von ihrer Größe abhängt
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Zeilen ohne Umbruch werden beim blockweisen Zählen ab dieser Länge geteilt
+STREAM_MAX_LINE_LENGTH = 16 * 1024 * 1024
+
+# Standardgrenze für übergroße Dateien und Zeilenlänge für minifizierten Code (siehe OversizePolicy)
+OVERSIZE_FILE_SIZE = 32 * 1024 * 1024
+MINIFIED_LINE_LENGTH = 500
+
+# Aktionen für übergroße Dateien
+OVERSIZE_ACTIONS = ('stream', 'physical', 'skip', 'minified')
+
+# Behandlungen übergroßer Dateien, deren Zeilen nicht in die Statistik eingehen
+_SKIPPED_OVERSIZE = ('skipped', 'minified')
+
+# Kommentar- und String-Syntax für verschiedene Sprachen
+#   'line':    Regex-Anfänge von Zeilenkommentaren
+#   'block':   (Regex-Anfang, Ende) von Blockkommentaren
+#   'strings': (Begrenzer, mehrzeilig) von String-Literalen, in denen keine
+#              Kommentare erkannt werden
+# Jeder Regex-Anfang beginnt mit einem festen Zeichen; ein vorangestelltes '^'
+# bedeutet, dass vor dem Token in der Zeile nur Leerzeichen stehen dürfen.
+COMMENT_SYNTAX = {
+    'py': {
+        'line': [r'#'],
+        # Docstrings (dreifache Anführungszeichen am Zeilenanfang) zählen als Kommentar
+        'block': [('^"""', '"""'), ("^'''", "'''")],
+        # Erlaubte String-Präfixe vor Tokens am Zeilenanfang (r"""...)
+        'line_start_prefixes': 'rRuU',
+        'strings': [('"""', True), ("'''", True), ('"', False), ("'", False)],
+    },
+    'js|jsx|ts|tsx': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('`', True), ('"', False), ("'", False)],
+    },
+    'java|kt|scala': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('"""', True), ('"', False), ("'", False)],
+    },
+    'c|cpp|h|cs|m|mm': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('"', False), ("'", False)],
+    },
+    'go': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('`', True), ('"', False), ("'", False)],
+    },
+    'rs': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        # Keine einfachen Anführungszeichen wegen Lifetimes ('a)
+        'strings': [('"', True)],
+    },
+    'swift': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('"""', True), ('"', False)],
+    },
+    'dart': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('"""', True), ("'''", True), ('"', False), ("'", False)],
+    },
+    'php': {
+        'line': [r'//', r'#'],
+        'block': [(r'/\*', '*/')],
+        'strings': [('"', True), ("'", True)],
+    },
+    'css': {
+        'block': [(r'/\*', '*/')],
+    },
+    'scss': {
+        'line': [r'//'],
+        'block': [(r'/\*', '*/')],
+    },
+    'html|xml|vue': {
+        'block': [(r'<!--', '-->')],
+    },
+    'sql': {
+        'line': [r'--'],
+        'block': [(r'/\*', '*/')],
+        'strings': [("'", False)],
+    },
+    'rb': {
+        'line': [r'#'],
+        'block': [(r'^=begin\b', '\n=end')],
+        'strings': [('"', False), ("'", False)],
+    },
+    'sh|r': {
+        # '#' nur am Wortanfang, damit z.B. $# oder ${#var} Code bleiben
+        'line': [r'#(?<![^\s;&|(]#)'],
+    },
+    'yaml|yml': {
+        'line': [r'#(?<!\S#)'],
+        'strings': [('"', False), ("'", False)],
+    },
+    'ps1': {
+        'line': [r'#'],
+        'block': [(r'<#', '#>')],
+        'strings': [('"', False), ("'", False)],
+    },
+    'bat': {
+        'line': [r'^rem\b', r'^REM\b', r'^Rem\b', r'^::'],
     },
-    # Multi-line comment patterns
-    'multi': {
-        'py': r'""".*?"""|\'\'\'.*?\'\'\'',
-        'js|jsx|ts|tsx|java|c|cpp|cs|go|rs|swift|kt|dart|scala': r'/\*.*?\*/',
-        'html|xml': r'<!--.*?-->',
-    }
 }
 
+# Token-Arten des Lexers
+_COMMENT = 0
+_STRING = 1
+
+# Irgendein Nicht-Leerzeichen (für Suchen mit pos/endpos ohne Teilstrings)
+_NON_SPACE_RE = re.compile(r'\S')
+
+# Leerzeile zwischen zwei Zeilenumbrüchen
+_BLANK_LINE_RE = re.compile(r'\n[^\S\n]*(?=\n)')
+
+# ASCII-Leerzeichen außer Zeilenumbruch (wie str.strip für ASCII-Text)
+_BLANK_BYTES = b' \t\r\x0b\x0c\x1c\x1d\x1e\x1f'
+
+# Zeilenumbruch vor einer leeren Zeile, auf die ein weiterer Umbruch folgt (Bytes)
+_BLANK_BYTES_LINE_RE = re.compile(rb'\n(?=[ \t\r\x0b\x0c\x1c-\x1f]*\n)')
+
+def _string_body(delimiter, multiline):
+    """
+    Regex für den Inhalt eines String-Literals bis vor den schließenden Begrenzer.
+    
+    Die Schleife ist "ausgerollt" (normale Zeichen am Stück, dazwischen
+    Escapes), damit die Regex-Engine nicht Zeichen für Zeichen iteriert und
+    bei nicht abgeschlossenen Strings nicht exponentiell zurücksetzt.
+    """
+    first, rest = re.escape(delimiter[0]), re.escape(delimiter[1:])
+    normal = f'[^\\\\{first}]*' if multiline else f'[^\\\\{first}\\n]*'
+    special = r'\\[\s\S]'
+    if rest:
+        # Einzelnes Anführungszeichen innerhalb eines dreifachen Strings
+        special = f'(?:{special}|{first}(?!{rest}))'
+    return f'{normal}(?:{special}{normal})*'
+
+def _first_char(opener):
+    """Gibt das erste (feste) Zeichen eines Regex-Anfangs zurück."""
+    return opener[1] if opener.startswith('\\') else opener[0]
+
+class _Lexer:
+    """
+    Vorkompilierter Lexer für eine Sprache.
+    
+    Die Kommentar- und String-Syntax wird zu einem einzigen Regex kompiliert,
+    dessen Treffer jeweils aus Code (inklusive vollständiger String-Literale)
+    bis zum nächsten Kommentar-Anfang bestehen. Die Regex-Engine durchläuft den
+    Inhalt damit einmal linear, Python-Code läuft nur einmal pro Kommentar und
+    der Inhalt wird dabei nicht kopiert. Kommentarzeichen in String-Literalen
+    gelten nicht als Kommentar.
+    """
+    
+    __slots__ = ('_regex', '_tokens', '_indent_re')
+    
+    def __init__(self, syntax):
+        prefixes = syntax.get('line_start_prefixes', '')
+        self._indent_re = re.compile(r'[ \t]*' + (f'[{re.escape(prefixes)}]?' if prefixes else ''))
+        # Gruppenname -> (Art, Ende bzw. Ende-Regex, Ersatz-Regex, nur am Zeilenanfang)
+        self._tokens = {}
+        string_ends = {}
+        strings = []
+        openers = []
+        
+        # Längere Begrenzer zuerst, damit z.B. """ vor " erkannt wird
+        for i, (delimiter, multiline) in enumerate(sorted(syntax.get('strings', ()), key=lambda item: -len(item[0]))):
+            body = _string_body(delimiter, multiline)
+            if multiline:
+                string_ends[delimiter] = re.compile(f'{body}(?:{re.escape(delimiter)}|(?P<open>\\Z))')
+                strings.append((delimiter, f'{re.escape(delimiter)}{body}(?:{re.escape(delimiter)}|(?P<o{i}>\\Z))'))
+                self._tokens[f'o{i}'] = (_STRING, string_ends[delimiter], None, False)
+            else:
+                strings.append((delimiter, f'{re.escape(delimiter)}{body}{re.escape(delimiter)}'))
+        
+        comment_syntax = [(f'b{i}', opener, closer) for i, (opener, closer) in enumerate(syntax.get('block', ()))]
+        comment_syntax += [(f'l{i}', opener, '\n') for i, opener in enumerate(syntax.get('line', ()))]
+        for name, opener, closer in comment_syntax:
+            fallback = None
+            line_start = opener.startswith('^')
+            if line_start:
+                # Token nur gültig, wenn davor in der Zeile nur Leerzeichen stehen;
+                # sonst gilt z.B. """ als String mit gleichem Begrenzer
+                opener = opener[1:]
+                fallback = string_ends.get(opener)
+            openers.append((name, opener, closer, line_start))
+            self._tokens[name] = (_COMMENT, closer, fallback, line_start)
+        
+        def excluding_openers(first_char, regex):
+            # Vorrang für Kommentar-Anfänge, die mit demselben Zeichen beginnen
+            clashing = [opener for _, opener, _, _ in openers if _first_char(opener) == first_char]
+            return ('(?!' + '|'.join(clashing) + ')' if clashing else '') + regex
+        
+        # Strings mit dem Begrenzer eines Kommentars am Zeilenanfang werden
+        # über dessen Ersatz-Regex ausgewertet
+        opener_texts = {opener for _, opener, _, _ in openers}
+        alternatives = [excluding_openers(delimiter[0], regex)
+                        for delimiter, regex in strings if delimiter not in opener_texts]
+        specials = sorted({delimiter[0] for delimiter, _ in strings} | {_first_char(opener) for _, opener, _, _ in openers})
+        chars = ''.join(re.escape(char) for char in specials)
+        # Sonderzeichen, das weder Kommentar noch vollständigen String einleitet
+        alternatives.append('(?!' + '|'.join(opener for _, opener, _, _ in openers) + f')[{chars}]')
+        
+        # Zeilenkommentare erfasst der Regex vollständig, zusammen mit direkt
+        # folgenden Zeilen, die nur aus einem weiteren Zeilenkommentar bestehen.
+        # Kommentarblöcke kosten so nur einen Schleifendurchlauf.
+        comments = []
+        for name, opener, closer, line_start in openers:
+            if closer == '\n' and not line_start:
+                self._tokens[name] = (_COMMENT, None, None, False)
+                opener = rf'{opener}[^\n]*(?:\n[ \t]*{opener}[^\n]*)*'
+            comments.append(f'(?P<{name}>{opener})')
+        
+        # Code bis zum nächsten Kommentar oder Textende
+        code = f'(?:[^{chars}]+|' + '|'.join(alternatives) + ')*'
+        self._regex = re.compile(code + '(?:' + '|'.join(comments) + r'|\Z)')
+    
+    def count_comment_lines(self, content, state=None):
+        """
+        Zählt die Zeilen, die ausschließlich Kommentare (und Leerzeichen) enthalten.
+        
+        Args:
+            content: Zu verarbeitender Text
+            state: Offenes Token vom Ende des vorherigen Textabschnitts oder None
+        
+        Returns:
+            Tuple mit (Anzahl Kommentarzeilen, offenes Token am Ende oder None)
+        """
+        comment_lines = 0
+        length = len(content)
+        pos = 0
+        # Beginn der zuletzt von einem Kommentar berührten, noch nicht bewerteten Zeile
+        open_line = -1
+        line_has_code = False
+        line_has_comment = False
+        last_end = 0
+        token, state = state, None
+        
+        # Lokale Namen für die heiße Schleife (einmal pro Kommentar)
+        find, rfind = content.find, content.rfind
+        has_text = _NON_SPACE_RE.search
+        next_comment = self._regex.match
+        tokens = self._tokens
+        
+        while True:
+            if token is not None:
+                # Offenes Token aus dem vorherigen Abschnitt fortsetzen
+                start = pos
+                line_has_text = False
+            else:
+                if pos >= length:
+                    break
+                match = next_comment(content, pos)
+                if match is None:
+                    break
+                name = match.lastgroup
+                pos = match.end()
+                if name is None:
+                    continue
+                token = tokens[name]
+                start = match.start(name)
+                line_has_text = True
+                if token[3]:
+                    line_begin = rfind('\n', 0, start) + 1
+                    if self._indent_re.match(content, line_begin, start).end() == start:
+                        start = line_begin
+                    else:
+                        # Nicht am Zeilenanfang: kein Kommentar, ggf. ein String
+                        fallback = token[2]
+                        token = None if fallback is None else (_STRING, fallback, None, False)
+                        continue
+            
+            kind, closer = token[:2]
+            token = None
+            if kind == _STRING:
+                match = closer.match(content, pos)
+                pos = match.end()
+                if match.group('open') is not None:
+                    # Mehrzeiliger String reicht über das Ende des Abschnitts hinaus
+                    state = (_STRING, closer, None, False)
+                continue
+            
+            if closer is None:
+                # Vom Regex vollständig erfasst
+                end = pos
+            elif closer == '\n':
+                end = find('\n', pos)
+                if end == -1:
+                    end = length
+            else:
+                end = find(closer, pos)
+                if end == -1:
+                    end = length
+                    # Blockkommentar reicht über das Ende des Abschnitts hinaus
+                    state = (_COMMENT, closer, None, False)
+                else:
+                    end += len(closer)
+            pos = end
+            
+            # Zeile bewerten, in der der Kommentar beginnt
+            line_begin = rfind('\n', 0, start) + 1
+            if line_begin == open_line:
+                # Weiterer Kommentar in derselben Zeile: Code dazwischen?
+                if not line_has_code and has_text(content, last_end, start):
+                    line_has_code = True
+            else:
+                if open_line != -1 and line_has_comment and not line_has_code:
+                    line_end = find('\n', last_end)
+                    if not has_text(content, last_end, length if line_end == -1 else line_end):
+                        comment_lines += 1
+                open_line = line_begin
+                line_has_code = line_begin < start and has_text(content, line_begin, start) is not None
+                line_has_comment = False
+            
+            first_break = find('\n', start, end)
+            if first_break == -1:
+                line_has_comment = line_has_comment or line_has_text or has_text(content, start, end) is not None
+            else:
+                # Mehrzeiliger Kommentar: Startzeile abschließen, vollständig
+                # kommentierte Zeilen ohne Leerzeilen zählen, Endzeile offen lassen
+                line_has_comment = (line_has_comment or line_has_text
+                                    or has_text(content, start, first_break) is not None)
+                if line_has_comment and not line_has_code:
+                    comment_lines += 1
+                last_break = rfind('\n', start, end)
+                if last_break > first_break:
+                    comment_lines += (content.count('\n', first_break, last_break)
+                                      - len(_BLANK_LINE_RE.findall(content, first_break, last_break + 1)))
+                open_line = last_break + 1
+                line_has_code = False
+                line_has_comment = has_text(content, open_line, end) is not None
+            last_end = end
+        
+        if open_line != -1 and line_has_comment and not line_has_code:
+            line_end = find('\n', last_end)
+            if not has_text(content, last_end, length if line_end == -1 else line_end):
+                comment_lines += 1
+        
+        return comment_lines, state
+
+class Language:
+    """
+    Eine Sprache mit ihrem Lexer (None = ohne Kommentarsyntax).
+    
+    Mit build_lexer wird der Lexer erst bei der ersten Verwendung kompiliert,
+    damit der Import des Moduls nicht die Regexe aller Sprachen übersetzt.
+    """
+    
+    __slots__ = ('name', '_lexer', '_build_lexer')
+    
+    def __init__(self, name, lexer=None, build_lexer=None):
+        self.name = name
+        self._lexer = lexer
+        self._build_lexer = build_lexer
+    
+    @property
+    def lexer(self):
+        if self._build_lexer is not None:
+            self._lexer = self._build_lexer()
+            self._build_lexer = None
+        return self._lexer
+    
+    def __repr__(self):
+        return f'Language({self.name!r})'
+
+class LanguageRegistry:
+    """
+    Ordnet Dateiendungen, exakte Dateinamen und Shebang-Interpreter je einer Sprache zu.
+    
+    Jede Zuordnung ist ein Dict-Zugriff; die Kosten pro Datei hängen nicht von
+    der Anzahl der registrierten Sprachen ab. Sprachen mit gleicher
+    Kommentarsyntax teilen sich einen Lexer, der nur einmal und erst bei
+    Bedarf kompiliert wird.
+    """
+    
+    def __init__(self):
+        self._by_extension = {}
+        self._by_filename = {}
+        self._by_interpreter = {}
+        # Kommentarsyntax (als repr) -> kompilierter Lexer
+        self._lexers = {}
+        # Alle Registrierungen in Reihenfolge, Grundlage des Fingerabdrucks
+        self._definitions = []
+        self._fingerprint = None
+    
+    def register(self, name, extensions=(), filenames=(), interpreters=(), syntax=None):
+        """
+        Registriert eine Sprache; spätere Registrierungen überschreiben frühere Zuordnungen.
+        
+        Args:
+            name: Anzeigename der Sprache
+            extensions: Dateiendungen mit Punkt (z.B. ['.pl', '.pm'])
+            filenames: Exakte Dateinamen (z.B. ['Makefile'])
+            interpreters: Interpreter in der Shebang-Zeile (z.B. ['perl'])
+            syntax: Kommentar- und String-Syntax im Format von COMMENT_SYNTAX oder None
+        
+        Returns:
+            Die registrierte Language
+        """
+        build_lexer = None
+        if syntax:
+            build_lexer = lambda: self._lexer_for(syntax)
+        language = Language(name, build_lexer=build_lexer)
+        
+        for ext in extensions:
+            self._by_extension[ext.lower()] = language
+        for file_name in filenames:
+            self._by_filename[file_name] = language
+        for interpreter in interpreters:
+            self._by_interpreter[interpreter] = language
+        
+        self._definitions.append((name, tuple(extensions), tuple(filenames), tuple(interpreters), syntax))
+        self._fingerprint = None
+        return language
+    
+    def _lexer_for(self, syntax):
+        """Gibt den (gemeinsamen) Lexer einer Kommentarsyntax zurück und kompiliert ihn beim ersten Aufruf."""
+        syntax_key = repr(syntax)
+        lexer = self._lexers.get(syntax_key)
+        if lexer is None:
+            lexer = self._lexers[syntax_key] = _Lexer(syntax)
+        return lexer
+    
+    def for_extension(self, file_ext):
+        """Gibt die Sprache einer Dateiendung zurück oder None."""
+        return self._by_extension.get(file_ext.lower())
+    
+    def for_file_name(self, file_name):
+        """Gibt die Sprache anhand des exakten Dateinamens bzw. der Endung zurück oder None."""
+        language = self._by_filename.get(file_name)
+        if language is None:
+            language = self._by_extension.get(os.path.splitext(file_name)[1].lower())
+        return language
+    
+    def for_shebang(self, data):
+        """
+        Gibt die Sprache anhand der Shebang-Zeile zurück oder None.
+        
+        Args:
+            data: Anfang des Dateiinhalts als Bytes
+        """
+        if not data.startswith(b'#!'):
+            return None
+        line_end = data.find(b'\n')
+        words = data[2:line_end if line_end != -1 else len(data)].decode('utf-8', errors='ignore').split()
+        if words and posixpath.basename(words[0]) == 'env':
+            # "#!/usr/bin/env -S python3 -u": Optionen und Variablen überspringen
+            words = [word for word in words[1:] if not word.startswith('-') and '=' not in word]
+        if not words:
+            return None
+        
+        interpreter = posixpath.basename(words[0])
+        language = self._by_interpreter.get(interpreter)
+        if language is None:
+            # Versionierte Interpreter wie python3.11
+            language = self._by_interpreter.get(interpreter.rstrip('0123456789.'))
+        return language
+    
+    def may_match(self, file_name):
+        """
+        Prüft ohne Lesen der Datei, ob sie Code sein kann.
+        
+        Dateien ohne Endung sind Kandidaten für die Erkennung per Shebang.
+        """
+        if file_name in self._by_filename:
+            return True
+        file_ext = os.path.splitext(file_name)[1]
+        if file_ext:
+            return file_ext.lower() in self._by_extension
+        return bool(self._by_interpreter)
+    
+    def detect(self, file_name, data):
+        """
+        Bestimmt die Sprache einer Datei: exakter Name, Endung, bei Dateien ohne Endung die Shebang-Zeile.
+        
+        Args:
+            file_name: Dateiname ohne Verzeichnis
+            data: Anfang des Dateiinhalts als Bytes
+        
+        Returns:
+            Language oder None
+        """
+        language = self.for_file_name(file_name)
+        if language is None and not os.path.splitext(file_name)[1]:
+            language = self.for_shebang(data)
+        return language
+    
+    def _syntax_for_extension(self, file_ext):
+        """Gibt die Kommentarsyntax der zuletzt für eine Dateiendung registrierten Sprache zurück."""
+        for _, extensions, _, _, syntax in reversed(self._definitions):
+            if file_ext.lower() in (ext.lower() for ext in extensions):
+                return syntax
+        return None
+    
+    def fingerprint(self):
+        """Hash über alle Registrierungen (geht in die Version der Zählregeln ein)."""
+        if self._fingerprint is None:
+            self._fingerprint = hashlib.sha1(repr(self._definitions).encode('utf-8')).hexdigest()[:12]
+        return self._fingerprint
+    
+    def load_config(self, path):
+        """
+        Registriert Sprachen aus einer JSON-Konfigurationsdatei.
+        
+        Format:
+            {"languages": [{"name": "Perl", "extensions": [".pl", ".pm"], "filenames": [],
+                            "interpreters": ["perl"],
+                            "comments": {"line": ["#"], "strings": [["\"", false]]}}]}
+        
+        Statt "comments" kann "like" auf eine Dateiendung verweisen, deren
+        Kommentarsyntax übernommen wird (z.B. "like": ".sh").
+        
+        Args:
+            path: Pfad zur Konfigurationsdatei
+        
+        Raises:
+            ValueError: Wenn die Datei kein gültiges Format hat
+        """
+        with open(path, encoding='utf-8') as file:
+            try:
+                config = json.load(file)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Ungültige Sprachkonfiguration {path}: {str(e)}")
+        
+        definitions = config.get('languages') if isinstance(config, dict) else None
+        if not isinstance(definitions, list):
+            raise ValueError(f"Ungültige Sprachkonfiguration {path}: Liste 'languages' fehlt")
+        
+        for definition in definitions:
+            if not isinstance(definition, dict) or not definition.get('name'):
+                raise ValueError(f"Ungültige Sprachkonfiguration {path}: Sprache ohne 'name'")
+            
+            syntax = definition.get('comments')
+            if syntax is not None:
+                # JSON kennt keine Tupel
+                syntax = {
+                    'line': list(syntax.get('line', [])),
+                    'block': [tuple(block) for block in syntax.get('block', [])],
+                    'strings': [tuple(string) for string in syntax.get('strings', [])],
+                    'line_start_prefixes': syntax.get('line_start_prefixes', ''),
+                }
+            elif definition.get('like'):
+                if self.for_extension(definition['like']) is None:
+                    raise ValueError(f"Ungültige Sprachkonfiguration {path}: "
+                                     f"unbekannte Dateiendung {definition['like']}")
+                syntax = self._syntax_for_extension(definition['like'])
+            
+            try:
+                # Kommentarsyntax vor der Registrierung prüfen, nicht erst beim ersten Zählen
+                if syntax:
+                    self._lexer_for(syntax)
+                self.register(definition['name'], definition.get('extensions', ()), definition.get('filenames', ()),
+                              definition.get('interpreters', ()), syntax)
+            except (re.error, TypeError, ValueError) as e:
+                raise ValueError(f"Ungültige Sprachkonfiguration {path} ({definition['name']}): {str(e)}")
+
+def _syntax_for_extension(file_ext):
+    """Gibt die eingebaute Kommentarsyntax einer Dateiendung zurück oder None."""
+    for extensions, syntax in COMMENT_SYNTAX.items():
+        if file_ext.lower().lstrip('.') in extensions.split('|'):
+            return syntax
+    return None
+
+def default_language_config_path():
+    """
+    Gibt den Pfad der Sprachkonfiguration des Benutzers zurück.
+    
+    Verwendet CODE_COUNTER_LANGUAGES, sonst XDG_CONFIG_HOME bzw. ~/.config.
+    """
+    config_path = os.environ.get('CODE_COUNTER_LANGUAGES')
+    if config_path:
+        return config_path
+    config_home = os.environ.get('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+    return os.path.join(config_home, 'code_counter', 'languages.json')
+
+def _build_language_registry():
+    """Baut die Registry aus den eingebauten Sprachen und der Konfiguration des Benutzers."""
+    registry = LanguageRegistry()
+    
+    interpreters = {}
+    for interpreter, file_ext in SHEBANG_INTERPRETERS.items():
+        interpreters.setdefault(file_ext, []).append(interpreter)
+    for file_ext, name in CODE_EXTENSIONS.items():
+        registry.register(name, [file_ext], interpreters=interpreters.get(file_ext, ()),
+                          syntax=_syntax_for_extension(file_ext))
+    for file_name, (name, syntax_ext) in CODE_FILENAMES.items():
+        registry.register(name, filenames=[file_name], syntax=_syntax_for_extension(syntax_ext))
+    
+    config_path = default_language_config_path()
+    if os.path.isfile(config_path):
+        try:
+            registry.load_config(config_path)
+        except (OSError, ValueError) as e:
+            print(f"Fehler beim Laden der Sprachkonfiguration: {str(e)}")
+    
+    return registry
+
+LANGUAGES = _build_language_registry()
+
+def load_language_config(path):
+    """
+    Registriert zusätzliche Sprachen aus einer JSON-Datei (siehe LanguageRegistry.load_config).
+    
+    Muss vor dem Start paralleler Scans aufgerufen werden, damit die
+    Worker-Prozesse die Sprachen übernehmen.
+    """
+    LANGUAGES.load_config(path)
+
+# Version der Zählregeln; bei Änderungen an der Zähllogik erhöhen. Änderungen an
+# Sprachen oder Kommentarsyntax fließen automatisch über den Fingerabdruck ein.
+COUNTING_RULES_VERSION = 1
+
+def get_rules_version():
+    """Gibt die Version der Zählregeln einschließlich Inhalts-Hash und aller registrierten Sprachen zurück."""
+    # Der Inhalts-Hash wird mit den Zählwerten gecacht; xxHash- und BLAKE2b-Werte dürfen sich nicht mischen
+    return f'{COUNTING_RULES_VERSION}-{_content_hash_algorithm()}-{LANGUAGES.fingerprint()}'
+
+def get_lexer_for_extension(file_ext):
+    """Gibt den Lexer für eine Dateierweiterung zurück oder None ohne Kommentarsyntax."""
+    language = LANGUAGES.for_extension(file_ext)
+    return language.lexer if language is not None else None
+
 def get_language_from_extension(file_ext):
     """Gibt die Sprache basierend auf der Dateierweiterung zurück."""
-    return CODE_EXTENSIONS.get(file_ext.lower(), "Other")
+    language = LANGUAGES.for_extension(file_ext)
+    return language.name if language is not None else "Other"
 
-def is_binary_file(file_path):
-    """Prüft, ob eine Datei binär ist."""
+# Sprache für Dateien, die ohne erkannte Sprache gezählt werden (z.B. count_lines_in_file)
+_OTHER_LANGUAGE = Language("Other", None)
+
+def _is_binary_block(block):
+    """
+    Prüft anhand des ersten Blocks einer Datei, ob sie binär ist.
+    
+    Binär ist ein Block mit NUL-Bytes oder ungültigem UTF-8. Ein am Blockende
+    abgeschnittenes Mehrbyte-Zeichen gilt nicht als ungültig.
+    """
+    if b'\0' in block:
+        return True
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            file.read(1024)
-            return False
+        codecs.getincrementaldecoder('utf-8')().decode(block, final=False)
+        return False
     except UnicodeDecodeError:
         return True
+
+def is_binary_file(file_path):
+    """Prüft, ob eine Datei binär ist."""
+    try:
+        with open(file_path, 'rb') as file:
+            return _is_binary_block(file.read(BINARY_CHECK_SIZE))
     except Exception:
         return True
 
-def count_lines_in_file(file_path):
+class OversizePolicy:
+    """
+    Legt fest, wie Dateien oberhalb von max_file_size gezählt werden.
+    
+    Aktionen:
+        'stream':   vollständig zählen (blockweise, mit Kommentarauswertung)
+        'physical': nur Gesamt- und Leerzeilen zählen; jede nicht-leere Zeile gilt als Code
+        'skip':     nicht zählen
+        'minified': nicht zählen, wenn die Zeilen im ersten Block im Durchschnitt länger als
+                    max_line_length sind (minifizierter oder generierter Code), sonst 'stream'
+    
+    Übergroße Dateien erhalten im Ergebnis-Dict den Schlüssel 'oversize' mit der
+    angewendeten Behandlung ('streamed', 'physical', 'skipped' oder 'minified')
+    und werden in der Statistik unter 'oversized_files' aufgeführt.
+    """
+    
+    def __init__(self, action='stream', max_file_size=OVERSIZE_FILE_SIZE, max_line_length=MINIFIED_LINE_LENGTH):
+        """
+        Args:
+            action: Eine der Aktionen aus OVERSIZE_ACTIONS
+            max_file_size: Dateien oberhalb dieser Größe in Bytes gelten als übergroß
+            max_line_length: Durchschnittliche Zeilenlänge, ab der 'minified' eine Datei überspringt
+        
+        Raises:
+            ValueError: Bei einer unbekannten Aktion
+        """
+        if action not in OVERSIZE_ACTIONS:
+            raise ValueError(f"Unbekannte Aktion für übergroße Dateien: {action}")
+        self.action = action
+        self.max_file_size = max_file_size
+        self.max_line_length = max_line_length
+    
+    def rules_version(self):
+        """Gibt die Version der Zählregeln einschließlich dieser Richtlinie zurück (für den Scan-Cache)."""
+        return f'{get_rules_version()}-{self.action}-{self.max_file_size}-{self.max_line_length}'
+
+DEFAULT_OVERSIZE_POLICY = OversizePolicy()
+
+def count_lines_in_file(file_path, oversize_policy=None):
     """
     Zählt die Anzahl der Zeilen in einer Datei, wobei leere Zeilen und Kommentare gesondert gezählt werden.
+    
+    Die Datei wird einmal binär geöffnet: Der erste Block dient der
+    Binärprüfung, Gesamt- und Leerzeilen werden direkt auf den Bytes gezählt.
+    Dekodiert wird nur, wenn der Sprach-Lexer Kommentare auswerten muss.
+    Dateien über STREAM_CHUNK_SIZE werden blockweise gezählt. Dateien ohne
+    erkannte Sprache zählen ohne Kommentarauswertung.
+    
+    Args:
+        file_path: Pfad zur Datei
+        oversize_policy: OversizePolicy für übergroße Dateien (Standard: vollständig zählen)
+    """
+    return _count_file(file_path, oversize_policy or DEFAULT_OVERSIZE_POLICY, default_language=_OTHER_LANGUAGE)[1]
+
+def _count_file(file_path, oversize_policy, content_counts=None, default_language=None, profile=None,
+                profile_path=None):
     """
+    Öffnet und zählt eine Datei (siehe _count_open_file); Lesefehler ergeben (0, 0, 0).
+    
+    Mit profile wird die Datei unter profile_path (Standard: file_path) im ScanProfile erfasst.
+    """
+    if profile is not None:
+        started = profile.start()
+    try:
+        with open(file_path, 'rb') as file:
+            file_size = os.fstat(file.fileno()).st_size
+            counted = _count_open_file(file, os.path.basename(file_path), file_size,
+                                       oversize_policy, content_counts, default_language, profile)
+            if profile is not None:
+                profile.add_file(profile_path or file_path, counted[0], _bytes_read(file, file_size), started)
+            return counted
+    except Exception as e:
+        if profile is not None:
+            profile.add_error(profile_path or file_path, e)
+        print(f"Fehler beim Zählen der Zeilen in {file_path}: {str(e)}")
+        return None, (0, 0, 0), None, None
+
+def _bytes_read(file, file_size):
+    """Anzahl der bisher gelesenen Bytes einer Datei (file_size, wenn die Position unbekannt ist)."""
     try:
-        if is_binary_file(file_path):
-            return 0, 0, 0
+        return file.tell()
+    except (OSError, ValueError):
+        return file_size
+
+def _count_open_file(file, file_name, file_size, oversize_policy, content_counts=None, default_language=None,
+                     profile=None):
+    """
+    Zählt eine geöffnete Binärdatei.
+    
+    Dateien bis STREAM_CHUNK_SIZE werden am Stück gelesen, größere und
+    übergroße Dateien blockweise mit festem Speicherbedarf. Für übergroße
+    Dateien gilt oversize_policy.
+    
+    Args:
+        file: Geöffnete Binärdatei oder Archiv-Eintrag, Leseposition am Anfang
+        file_name: Dateiname ohne Verzeichnis zur Erkennung der Sprache
+        file_size: Größe der Datei in Bytes
+        oversize_policy: OversizePolicy
+        content_counts: Dict (content_hash, Sprache) -> Zeilenzahlen bereits gezählter Inhalte
+                        für die Deduplizierung; None = ohne Deduplizierung
+        default_language: Language für Dateien ohne erkannte Sprache; None = nicht zählen
+        profile: ScanProfile, in dem die Phasen und übersprungenen Dateien erfasst werden (optional)
+    
+    Returns:
+        Tuple mit (Language bzw. None, Zeilenzahlen, content_hash bzw. None, Behandlung als
+        übergroße Datei bzw. None); content_hash wird nur mit content_counts berechnet
+    """
+    data = file.read(BINARY_CHECK_SIZE)
+    if _is_binary_block(data):
+        if profile is not None:
+            profile.lap('binary_check')
+            profile.skip('binary')
+        return None, (0, 0, 0), None, None
+    language = LANGUAGES.detect(file_name, data) or default_language
+    if profile is not None:
+        profile.lap('binary_check')
+    if language is None:
+        if profile is not None:
+            profile.skip('unknown_language')
+        return None, (0, 0, 0), None, None
+    
+    if file_size <= min(STREAM_CHUNK_SIZE, oversize_policy.max_file_size):
+        if len(data) == BINARY_CHECK_SIZE:
+            data += file.read()
+        if profile is not None:
+            profile.lap('read')
+        content_hash = None
+        if content_counts is None:
+            counts = _count_lines_in_text_bytes(data, language.lexer)
+        else:
+            content_hash = _content_hash(data)
+            key = (content_hash, language.name)
+            counts = content_counts.get(key)
+            if counts is None:
+                counts = content_counts[key] = _count_lines_in_text_bytes(data, language.lexer)
+        if profile is not None:
+            profile.lap('count')
+        return language, counts, content_hash, None
+    
+    lexer = language.lexer
+    handling = None
+    if file_size > oversize_policy.max_file_size:
+        action = oversize_policy.action
+        if action == 'minified':
+            # Durchschnittliche Zeilenlänge im ersten Block
+            data += file.read(STREAM_CHUNK_SIZE - len(data))
+            if profile is not None:
+                profile.lap('read')
+            if len(data) / (data.count(b'\n') + 1) > oversize_policy.max_line_length:
+                if profile is not None:
+                    profile.skip('minified')
+                return language, (0, 0, 0), None, 'minified'
+            action = 'stream'
+        if action == 'skip':
+            if profile is not None:
+                profile.skip('oversize')
+            return language, (0, 0, 0), None, 'skipped'
+        if action == 'physical':
+            lexer = None
+            handling = 'physical'
+        else:
+            handling = 'streamed'
+    
+    # Große Duplikate werden nicht zwischengespeichert, der Hash entsteht beim Lesen
+    digest = _new_content_digest() if content_counts is not None else None
+    counts = _count_lines_in_stream(file, data, lexer, digest)
+    if profile is not None:
+        # Blockweise gezählte Dateien: Lesen und Zählen wechseln sich ab und zählen zusammen als 'count'
+        profile.lap('count')
+    return language, counts, digest.hexdigest() if digest is not None else None, handling
+
+def _content_hash_algorithm():
+    """Name des Verfahrens, mit dem _content_hash und _new_content_digest arbeiten."""
+    return 'xxh3_128' if xxhash is not None else 'blake2b_128'
+
+def _content_hash(data):
+    """Schneller, nicht-kryptografischer Hash eines Dateiinhalts (xxHash, sonst BLAKE2b)."""
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _new_content_digest():
+    """Hash-Objekt, das blockweise dasselbe Ergebnis wie _content_hash liefert."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+def _count_lines_in_stream(file, data, lexer, digest=None):
+    """
+    Zählt die Zeilen einer Datei blockweise mit festem Speicherbedarf.
+    
+    Jeder Block wird nach seinem letzten Zeilenumbruch abgeschnitten, der Rest
+    kommt in den nächsten Block. Offene Blockkommentare und mehrzeilige Strings
+    gibt der Lexer über seinen Zustand an den nächsten Block weiter; das
+    Ergebnis entspricht dem Zählen der ganzen Datei. Nur Zeilen über
+    STREAM_MAX_LINE_LENGTH werden geteilt und dann nie als Kommentarzeile gezählt.
+    
+    Args:
+        file: Geöffnete Binärdatei
+        data: Bereits gelesener Anfang der Datei
+        lexer: Lexer der Sprache oder None (nur Gesamt- und Leerzeilen)
+        digest: Hash-Objekt, das mit dem gesamten Inhalt fortgeschrieben wird (optional)
+    
+    Returns:
+        Tuple mit (total_lines, empty_lines, code_lines)
+    """
+    total_lines = empty_lines = comment_lines = 0
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    state = None
+    # Ob die Teile einer geteilten überlangen Zeile bereits Text enthielten
+    partial_has_text = False
+    pending = data
+    if digest is not None:
+        digest.update(data)
+    
+    while True:
+        block = file.read(STREAM_CHUNK_SIZE)
+        if block:
+            if digest is not None:
+                digest.update(block)
+            pending = pending + block if pending else block
         
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            content = file.read()
+        cut = pending.rfind(b'\n') + 1
+        if cut == 0:
+            if not block:
+                break
+            if len(pending) < STREAM_MAX_LINE_LENGTH:
+                continue
+            # Überlange Zeile teilen: nur Text-Status und Lexer-Zustand übernehmen
+            partial_has_text = partial_has_text or bool(pending.strip(_BLANK_BYTES))
+            if lexer is not None:
+                state = lexer.count_comment_lines(decoder.decode(pending), state)[1]
+            pending = b''
+            continue
         
-        # Dateiendung ermitteln
-        file_ext = os.path.splitext(file_path)[1].lower()
-        language = get_language_from_extension(file_ext)
+        lines, pending = pending[:cut], pending[cut:]
+        total_lines += lines.count(b'\n')
+        # Die leere "Zeile" nach dem letzten Umbruch gehört zum nächsten Block
+        empty_lines += _count_empty_lines(lines) - 1
+        if partial_has_text:
+            if not lines[:lines.find(b'\n')].strip(_BLANK_BYTES):
+                empty_lines -= 1
+            partial_has_text = False
+        if lexer is not None:
+            block_comment_lines, state = lexer.count_comment_lines(decoder.decode(lines), state)
+            comment_lines += block_comment_lines
         
-        # Alle Zeilen zählen
-        lines = content.split('\n')
-        total_lines = len(lines)
+        if not block:
+            break
+    
+    # Letzte Zeile ohne abschließenden Umbruch
+    total_lines += 1
+    if not partial_has_text and not pending.strip(_BLANK_BYTES):
+        empty_lines += 1
+    if lexer is not None and pending:
+        comment_lines += lexer.count_comment_lines(decoder.decode(pending, final=True), state)[0]
+    
+    return total_lines, empty_lines, total_lines - empty_lines - comment_lines
+
+def count_lines_in_bytes(data, file_ext):
+    """
+    Zählt die Zeilen eines Dateiinhalts, der bereits im Speicher liegt.
+    
+    Args:
+        data: Dateiinhalt als Bytes
+        file_ext: Dateiendung (z.B. '.py') zur Auswahl des Lexers
+    
+    Returns:
+        Tuple mit (total_lines, empty_lines, code_lines); (0, 0, 0) für Binärdaten
+    """
+    if _is_binary_block(data[:BINARY_CHECK_SIZE]):
+        return 0, 0, 0
+    return _count_lines_in_text_bytes(data, get_lexer_for_extension(file_ext))
+
+def _count_empty_lines(data):
+    """Zählt die leeren Zeilen eines Inhalts: innere Zeilen per Regex, erste und letzte Zeile einzeln."""
+    first_break = data.find(b'\n')
+    if first_break == -1:
+        return int(not data.strip(_BLANK_BYTES))
+    return (len(_BLANK_BYTES_LINE_RE.findall(data))
+            + (not data[:first_break].strip(_BLANK_BYTES))
+            + (not data[data.rfind(b'\n') + 1:].strip(_BLANK_BYTES)))
+
+def _count_lines_in_text_bytes(data, lexer):
+    """Zählt Gesamt-, Leer- und Code-Zeilen eines als Text erkannten Inhalts (lexer None = ohne Kommentare)."""
+    # Alle Zeilen zählen
+    total_lines = data.count(b'\n') + 1
+    empty_lines = _count_empty_lines(data)
+    
+    # Kommentarzeilen in einem Durchlauf des Sprach-Lexers bestimmen;
+    # ohne Kommentarsyntax ist jede nicht-leere Zeile Code
+    if lexer is not None:
+        content = data.decode('utf-8', errors='ignore')
+        comment_lines = lexer.count_comment_lines(content)[0]
+    else:
+        comment_lines = 0
+    code_lines = total_lines - empty_lines - comment_lines
+    
+    return total_lines, empty_lines, code_lines
+
+def _extension_key(result):
+    """Schlüssel für lines_by_extension; Dateien ohne Endung (Makefile, Skripte) nach Sprache."""
+    return result['extension'].lower() or result['language']
+
+# Pfadtrenner des Betriebssystems, falls nicht '/' (Ergebnis-Pfade von Verzeichnis-Scans)
+_NATIVE_SEPARATOR = os.sep if os.sep != '/' else None
+
+def _directory_of(file_path):
+    """Verzeichnis eines Ergebnis-Pfads mit '/' als Trenner ('' = Wurzel des Scans)."""
+    if _NATIVE_SEPARATOR:
+        file_path = file_path.replace(_NATIVE_SEPARATOR, '/')
+    return file_path.rpartition('/')[0]
+
+class DirectoryTree:
+    """
+    Zeilensummen pro Verzeichnis auf allen Ebenen als Präfixbaum.
+    
+    Beim Zählen wird jede Datei nur ihrem eigenen Verzeichnis zugeschlagen
+    (ein Dict-Zugriff pro Datei); die Summen der übergeordneten Verzeichnisse
+    entstehen erst in as_dict mit einem Durchlauf über die Verzeichnisse.
+    Bäume verschiedener Worker oder Teil-Scans lassen sich mit merge addieren.
+    """
+    
+    def __init__(self):
+        # Verzeichnis -> [Dateien, Gesamtzeilen, Leerzeilen, Code-Zeilen, {Sprache: Code-Zeilen}]
+        self._directories = {}
+    
+    def add(self, result):
+        """Schlägt das Ergebnis einer Datei seinem Verzeichnis zu."""
+        directory = _directory_of(result['file_path'])
+        entry = self._directories.get(directory)
+        if entry is None:
+            entry = self._directories[directory] = [0, 0, 0, 0, {}]
         
-        # Leere Zeilen zählen
-        empty_lines = sum(1 for line in lines if not line.strip())
+        code_lines = result['code_lines']
+        entry[0] += 1
+        entry[1] += result['total_lines']
+        entry[2] += result['empty_lines']
+        entry[3] += code_lines
+        languages = entry[4]
+        language = result['language']
+        languages[language] = languages.get(language, 0) + code_lines
+    
+    def remove(self, result):
+        """Zieht das Ergebnis einer Datei wieder ab; leere Verzeichnisse fallen heraus."""
+        directory = _directory_of(result['file_path'])
+        entry = self._directories[directory]
+        entry[0] -= 1
+        entry[1] -= result['total_lines']
+        entry[2] -= result['empty_lines']
+        entry[3] -= result['code_lines']
+        entry[4][result['language']] -= result['code_lines']
+        if entry[0] == 0:
+            del self._directories[directory]
+    
+    def merge(self, other):
+        """Addiert die Verzeichnissummen eines anderen DirectoryTree."""
+        for directory, (files, total_lines, empty_lines, code_lines, languages) in other._directories.items():
+            entry = self._directories.get(directory)
+            if entry is None:
+                entry = self._directories[directory] = [0, 0, 0, 0, {}]
+            entry[0] += files
+            entry[1] += total_lines
+            entry[2] += empty_lines
+            entry[3] += code_lines
+            for language, language_lines in languages.items():
+                entry[4][language] = entry[4].get(language, 0) + language_lines
+    
+    def as_dict(self):
+        """
+        Gibt den Baum als verschachtelte Dicts zurück.
         
-        # Kommentare entfernen, um Code-Zeilen zu zählen
-        # Einfache Zuordnung von Dateierweiterungen zu Kommentarmustern
-        comment_pattern = None
+        Returns:
+            Wurzelknoten; jeder Knoten hat 'name', 'path' ('' = Wurzel), 'files', 'total_lines',
+            'empty_lines', 'comment_lines', 'code_lines', 'languages' (Sprache -> Code-Zeilen)
+            und 'children' (Liste der Unterverzeichnisse nach Namen), jeweils inklusive aller
+            Unterverzeichnisse
+        """
+        nodes = {}
         
-        # Single-line Kommentare
-        for pattern_exts, pattern in COMMENT_PATTERNS['single'].items():
-            if any(ext == file_ext.lstrip('.') for ext in pattern_exts.split('|')):
-                content = re.sub(pattern, '', content, flags=re.MULTILINE)
+        def node_for(path):
+            node = nodes.get(path)
+            if node is None:
+                parent_path, _, name = path.rpartition('/')
+                node = nodes[path] = {'name': name, 'path': path, 'files': 0, 'total_lines': 0, 'empty_lines': 0,
+                                      'comment_lines': 0, 'code_lines': 0, 'languages': {}, 'children': []}
+                if path:
+                    node_for(parent_path)['children'].append(node)
+            return node
         
-        # Multi-line Kommentare
-        for pattern_exts, pattern in COMMENT_PATTERNS['multi'].items():
-            if any(ext == file_ext.lstrip('.') for ext in pattern_exts.split('|')):
-                content = re.sub(pattern, '', content, flags=re.DOTALL)
+        root = node_for('')
+        # Sortiert, damit die Unterverzeichnisse in Namensreihenfolge angehängt werden
+        for directory in sorted(self._directories):
+            files, total_lines, empty_lines, code_lines, languages = self._directories[directory]
+            node = node_for(directory)
+            node['files'] = files
+            node['total_lines'] = total_lines
+            node['empty_lines'] = empty_lines
+            node['code_lines'] = code_lines
+            node['languages'] = dict(languages)
         
-        # Verbleibende nicht-leere Zeilen zählen
-        remaining_lines = content.split('\n')
-        code_lines = sum(1 for line in remaining_lines if line.strip())
+        # Von den tiefsten Verzeichnissen aufwärts in die Elternknoten summieren
+        for path in sorted(nodes, key=lambda path: path.count('/') if path else -1, reverse=True):
+            node = nodes[path]
+            node['comment_lines'] = node['total_lines'] - node['empty_lines'] - node['code_lines']
+            node['languages'] = {language: lines for language, lines in node['languages'].items() if lines}
+            if not path:
+                continue
+            parent = nodes[path.rpartition('/')[0]]
+            parent['files'] += node['files']
+            parent['total_lines'] += node['total_lines']
+            parent['empty_lines'] += node['empty_lines']
+            parent['code_lines'] += node['code_lines']
+            for language, language_lines in node['languages'].items():
+                parent['languages'][language] = parent['languages'].get(language, 0) + language_lines
         
-        return total_lines, empty_lines, code_lines
+        return root
+
+def iter_directory_nodes(tree, max_depth=None):
+    """
+    Durchläuft den Verzeichnisbaum aus stats['directory_tree'] (Tiefensuche, Wurzel zuerst).
+    
+    Args:
+        tree: Wurzelknoten aus DirectoryTree.as_dict
+        max_depth: Tiefste Ebene, die geliefert wird (Wurzel = 0, None = alle)
+    
+    Returns:
+        Iterator über Tupel (Knoten, Tiefe)
+    """
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        yield node, depth
+        if max_depth is None or depth < max_depth:
+            stack.extend((child, depth + 1) for child in reversed(node['children']))
+
+class ScanTotals:
+    """
+    Laufende Gesamtstatistik eines Scans.
+    
+    Wird mit jedem Ergebnis-Dict fortgeschrieben und lässt sich mit den
+    Teilsummen anderer Scans oder Worker zusammenführen. Übergroße Dateien
+    (siehe OversizePolicy) werden zusätzlich in oversized_files aufgeführt;
+    übersprungene gehen nicht in die Summen ein. directory_tree enthält die
+    Summen pro Verzeichnis.
+    """
+    
+    def __init__(self):
+        self.total_lines = 0
+        self.total_empty_lines = 0
+        self.total_code_lines = 0
+        self.total_files = 0
+        self.lines_by_extension = {}
+        self.oversized_files = []
+        self.directory_tree = DirectoryTree()
+    
+    def add(self, result):
+        """Addiert das Ergebnis einer Datei."""
+        handling = result.get('oversize')
+        if handling is not None:
+            self.oversized_files.append({'file_path': result['file_path'], 'handling': handling,
+                                         'total_lines': result['total_lines']})
+            if handling in _SKIPPED_OVERSIZE:
+                return
         
-    except Exception as e:
-        print(f"Fehler beim Zählen der Zeilen in {file_path}: {str(e)}")
-        return 0, 0, 0
+        self.total_lines += result['total_lines']
+        self.total_empty_lines += result['empty_lines']
+        self.total_code_lines += result['code_lines']
+        self.total_files += 1
+        
+        # Zeilen nach Dateityp und Verzeichnis aggregieren
+        ext_key = _extension_key(result)
+        self.lines_by_extension[ext_key] = self.lines_by_extension.get(ext_key, 0) + result['code_lines']
+        self.directory_tree.add(result)
+    
+    def remove(self, result):
+        """Zieht das Ergebnis einer Datei wieder ab, z.B. wenn sie geändert oder gelöscht wurde."""
+        handling = result.get('oversize')
+        if handling is not None:
+            self.oversized_files = [entry for entry in self.oversized_files
+                                    if entry['file_path'] != result['file_path']]
+            if handling in _SKIPPED_OVERSIZE:
+                return
+        
+        self.total_lines -= result['total_lines']
+        self.total_empty_lines -= result['empty_lines']
+        self.total_code_lines -= result['code_lines']
+        self.total_files -= 1
+        
+        ext_key = _extension_key(result)
+        self.lines_by_extension[ext_key] -= result['code_lines']
+        self.directory_tree.remove(result)
+    
+    def merge(self, other):
+        """Addiert die Teilsummen eines anderen ScanTotals."""
+        self.total_lines += other.total_lines
+        self.total_empty_lines += other.total_empty_lines
+        self.total_code_lines += other.total_code_lines
+        self.total_files += other.total_files
+        
+        for ext_key, code_lines in other.lines_by_extension.items():
+            self.lines_by_extension[ext_key] = self.lines_by_extension.get(ext_key, 0) + code_lines
+        self.oversized_files.extend(other.oversized_files)
+        self.directory_tree.merge(other.directory_tree)
+    
+    def as_stats(self):
+        """Gibt die Gesamtstatistik als Dict zurück (Format von count_lines_in_directory)."""
+        return {
+            'total_lines': self.total_lines,
+            'total_empty_lines': self.total_empty_lines,
+            'total_code_lines': self.total_code_lines,
+            'total_files': self.total_files,
+            'lines_by_extension': dict(self.lines_by_extension),
+            'oversized_files': list(self.oversized_files),
+            'directory_tree': self.directory_tree.as_dict()
+        }
+
+# Phasen eines ScanProfile in Ausgabereihenfolge
+PROFILE_PHASES = ('walk', 'cache', 'binary_check', 'read', 'count', 'aggregate', 'dataframe')
 
-def count_lines_in_directory(directory_path, exclude_dirs=None):
+# Anzahl der langsamsten Dateien und der Lesefehler, die ein ScanProfile aufführt
+PROFILE_SLOWEST_FILES = 20
+PROFILE_MAX_ERRORS = 100
+
+class ScanProfile:
     """
-    Zählt die Anzahl der Zeilen in allen Dateien eines Verzeichnisses.
+    Optionale Messung eines Scans.
+    
+    Erfasst Wand- und CPU-Zeit pro Phase, gelesene Bytes, übersprungene
+    Dateien nach Grund, Lesefehler, die langsamsten Dateien und den
+    Durchsatz pro Sprache. Ohne ScanProfile (profile=None) misst der Scan
+    nichts; mit werden pro Datei einige Zeitstempel genommen.
+    
+    Phasen (PROFILE_PHASES):
+        'walk':         Verzeichnisdurchlauf bzw. Lesen des Archiv-Inhaltsverzeichnisses
+        'cache':        Nachschlagen und Speichern im Scan-Cache
+        'binary_check': Erster Block, Binärprüfung und Spracherkennung
+        'read':         Lesen des restlichen Inhalts
+        'count':        Zeilen zählen und Kommentare auswerten (blockweise gezählte Dateien samt Lesen)
+        'aggregate':    Sortieren, Gesamtstatistik und Duplikatgruppen
+        'dataframe':    Aufbau des DataFrames
+    
+    Die Zeiten paralleler Worker werden addiert und können daher die
+    Gesamtdauer übersteigen. Wie ScanTotals lässt sich ein ScanProfile mit
+    denen der Worker zusammenführen.
+    """
+    
+    def __init__(self):
+        self.wall_seconds = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self.cpu_seconds = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self.elapsed_seconds = 0.0
+        self.files = 0
+        self.bytes_read = 0
+        self.cached_files = 0
+        self.skipped = {}
+        self.errors = []
+        # Sprache -> [Dateien, Bytes, Sekunden]
+        self.languages = {}
+        # Min-Heap von (Sekunden, Pfad, Sprache, Bytes)
+        self.slowest_files = []
+        self._wall_mark = self._cpu_mark = 0.0
+    
+    def start(self):
+        """Beginnt einen Messabschnitt; gibt den Startzeitpunkt für add_file zurück."""
+        self._wall_mark = time.perf_counter()
+        self._cpu_mark = time.process_time()
+        return self._wall_mark
+    
+    def lap(self, phase):
+        """Rechnet die Zeit seit start bzw. dem letzten lap der Phase zu."""
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        self.wall_seconds[phase] += wall - self._wall_mark
+        self.cpu_seconds[phase] += cpu - self._cpu_mark
+        self._wall_mark = wall
+        self._cpu_mark = cpu
+    
+    def skip(self, reason, count=1):
+        """Zählt übersprungene Dateien (z.B. 'binary', 'unknown_language', 'error')."""
+        self.skipped[reason] = self.skipped.get(reason, 0) + count
+    
+    def add_error(self, file_path, error):
+        """Erfasst einen Lesefehler (höchstens PROFILE_MAX_ERRORS mit Meldung)."""
+        self.skip('error')
+        if len(self.errors) < PROFILE_MAX_ERRORS:
+            self.errors.append({'file_path': file_path, 'error': str(error)})
+    
+    def add_file(self, file_path, language, bytes_read, started):
+        """
+        Erfasst eine gelesene Datei.
+        
+        Args:
+            file_path: Pfad für die Liste der langsamsten Dateien
+            language: Language bzw. None für Binärdateien und Dateien ohne Sprache
+            bytes_read: Gelesene Bytes
+            started: Rückgabewert von start zu Beginn der Datei
+        """
+        seconds = time.perf_counter() - started
+        self.files += 1
+        self.bytes_read += bytes_read
+        if language is not None:
+            entry = self.languages.get(language.name)
+            if entry is None:
+                entry = self.languages[language.name] = [0, 0, 0.0]
+            entry[0] += 1
+            entry[1] += bytes_read
+            entry[2] += seconds
+        self._add_slowest((seconds, file_path, language.name if language is not None else None, bytes_read))
+    
+    def _add_slowest(self, item):
+        if len(self.slowest_files) < PROFILE_SLOWEST_FILES:
+            heapq.heappush(self.slowest_files, item)
+        elif item > self.slowest_files[0]:
+            heapq.heapreplace(self.slowest_files, item)
+    
+    def merge(self, other):
+        """Addiert die Messungen eines anderen ScanProfile (z.B. eines Worker-Prozesses)."""
+        for phase in PROFILE_PHASES:
+            self.wall_seconds[phase] += other.wall_seconds[phase]
+            self.cpu_seconds[phase] += other.cpu_seconds[phase]
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        self.cached_files += other.cached_files
+        for reason, count in other.skipped.items():
+            self.skip(reason, count)
+        self.errors.extend(other.errors[:PROFILE_MAX_ERRORS - len(self.errors)])
+        for name, (files, bytes_read, seconds) in other.languages.items():
+            entry = self.languages.setdefault(name, [0, 0, 0.0])
+            entry[0] += files
+            entry[1] += bytes_read
+            entry[2] += seconds
+        for item in other.slowest_files:
+            self._add_slowest(item)
+    
+    def as_dict(self):
+        """
+        Gibt die Messung als JSON-taugliches Dict zurück (stats['profile']).
+        
+        Returns:
+            Dict mit 'elapsed_seconds', 'files', 'bytes_read', 'cached_files', 'phases'
+            (Phase -> 'wall_seconds', 'cpu_seconds'), 'skipped' (Grund -> Anzahl), 'errors',
+            'slowest_files' (absteigend) und 'languages' (nach Zeit absteigend, mit Durchsatz)
+        """
+        languages = []
+        for name, (files, bytes_read, seconds) in self.languages.items():
+            languages.append({
+                'language': name,
+                'files': files,
+                'bytes': bytes_read,
+                'seconds': seconds,
+                'files_per_second': files / seconds if seconds else None,
+                'mb_per_second': bytes_read / (1024 * 1024) / seconds if seconds else None,
+            })
+        languages.sort(key=lambda entry: entry['seconds'], reverse=True)
+        
+        return {
+            'elapsed_seconds': self.elapsed_seconds,
+            'files': self.files,
+            'bytes_read': self.bytes_read,
+            'cached_files': self.cached_files,
+            'phases': {phase: {'wall_seconds': self.wall_seconds[phase], 'cpu_seconds': self.cpu_seconds[phase]}
+                       for phase in PROFILE_PHASES},
+            'skipped': dict(self.skipped),
+            'errors': list(self.errors),
+            'slowest_files': [{'file_path': file_path, 'language': language, 'seconds': seconds, 'bytes': bytes_read}
+                              for seconds, file_path, language, bytes_read in sorted(self.slowest_files, reverse=True)],
+            'languages': languages,
+        }
+
+class ScanCancelled(Exception):
+    """Der Scan wurde über sein Abbruch-Signal (cancel) beendet."""
+
+class _ScanProgress:
+    """
+    Fortschritt eines laufenden Scans für progress-Callbacks und Abbruch.
+    
+    Meldet höchstens alle PROGRESS_INTERVAL Sekunden sowie am Ende einen
+    Stand (siehe snapshot) und prüft bei jedem Fortschritt das Abbruch-Signal.
+    """
+    
+    def __init__(self, callback=None, cancel=None):
+        """
+        Args:
+            callback: Funktion, die mit dem Dict aus snapshot aufgerufen wird (optional)
+            cancel: Abbruch-Signal mit is_set(), z.B. threading.Event (optional)
+        """
+        self.callback = callback
+        self.cancel = cancel
+        self.phase = 'walk'
+        self.files_done = 0
+        self.bytes_done = 0
+        self.files_total = None
+        self.bytes_total = None
+        self.total_files = 0
+        self.total_lines = 0
+        self.total_empty_lines = 0
+        self.total_code_lines = 0
+        self.started = time.perf_counter()
+        self._next_report = self.started
+    
+    def check(self):
+        """
+        Raises:
+            ScanCancelled: Wenn das Abbruch-Signal gesetzt ist
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise ScanCancelled("Scan abgebrochen")
+    
+    def watch_walk(self, entries):
+        """Reicht die Einträge des Verzeichnisdurchlaufs durch und meldet dabei die Anzahl gefundener Dateien."""
+        for entry in entries:
+            self.files_total = (self.files_total or 0) + 1
+            if not self.files_total % 256:
+                self.tick()
+            yield entry
+    
+    def start_counting(self, files_total, bytes_total):
+        """Beginnt die Zählphase mit bekannter Anzahl und Größe der Dateien (None = unbekannt)."""
+        self.phase = 'count'
+        self.files_total = files_total
+        self.bytes_total = bytes_total
+        self.tick()
+    
+    def advance(self, files, bytes_read, results=()):
+        """
+        Schreibt den Fortschritt fort.
+        
+        Args:
+            files: Anzahl der bearbeiteten Dateien
+            bytes_read: Deren Größe in Bytes
+            results: Ergebnis-Dicts dieser Dateien für die vorläufigen Summen
+        
+        Raises:
+            ScanCancelled: Wenn das Abbruch-Signal gesetzt ist
+        """
+        self.files_done += files
+        self.bytes_done += bytes_read
+        for result in results:
+            if result.get('oversize') not in _SKIPPED_OVERSIZE:
+                self.total_files += 1
+                self.total_lines += result['total_lines']
+                self.total_empty_lines += result['empty_lines']
+                self.total_code_lines += result['code_lines']
+        self.tick()
+    
+    def tick(self):
+        """Meldet den Stand, wenn PROGRESS_INTERVAL vergangen ist, und prüft das Abbruch-Signal."""
+        if self.callback is not None:
+            now = time.perf_counter()
+            if now >= self._next_report:
+                self._next_report = now + PROGRESS_INTERVAL
+                self.callback(self.snapshot(now))
+        self.check()
+    
+    def finish(self):
+        """Meldet den Endstand unabhängig vom Mindestabstand."""
+        self.phase = 'done'
+        if self.callback is not None:
+            self.callback(self.snapshot(time.perf_counter()))
+    
+    def snapshot(self, now):
+        """
+        Aktueller Stand als Dict.
+        
+        Returns:
+            Dict mit 'phase' ('walk', 'count' oder 'done'), 'files_done', 'files_total' und
+            'bytes_total' (None, solange unbekannt; in der Phase 'walk' die bisher gefundenen Dateien),
+            'bytes_done', 'elapsed_seconds', 'files_per_second', 'bytes_per_second',
+            'eta_seconds' (None ohne bekannte Gesamtgröße) und den vorläufigen Summen
+            'total_files', 'total_lines', 'total_empty_lines' und 'total_code_lines'
+        """
+        elapsed = now - self.started
+        eta = None
+        if self.phase == 'count' and self.bytes_total and self.bytes_done:
+            eta = elapsed * (self.bytes_total - self.bytes_done) / self.bytes_done
+        return {
+            'phase': self.phase,
+            'files_done': self.files_done,
+            'files_total': self.files_total,
+            'bytes_done': self.bytes_done,
+            'bytes_total': self.bytes_total,
+            'elapsed_seconds': elapsed,
+            'files_per_second': self.files_done / elapsed if elapsed else 0.0,
+            'bytes_per_second': self.bytes_done / elapsed if elapsed else 0.0,
+            'eta_seconds': eta,
+            'total_files': self.total_files,
+            'total_lines': self.total_lines,
+            'total_empty_lines': self.total_empty_lines,
+            'total_code_lines': self.total_code_lines,
+        }
+
+def _make_scan_progress(progress, cancel):
+    """_ScanProgress für die Parameter progress und cancel der Scan-Funktionen (None, wenn beide fehlen)."""
+    if progress is None and cancel is None:
+        return None
+    return _ScanProgress(progress, cancel)
+
+# Endmarke für _profiled
+_PROFILE_END = object()
+
+def _profiled(iterable, profile, phase):
+    """Rechnet die Zeit für das Erzeugen jedes Elements von iterable der Phase des ScanProfile zu."""
+    iterator = iter(iterable)
+    while True:
+        profile.start()
+        item = next(iterator, _PROFILE_END)
+        profile.lap(phase)
+        if item is _PROFILE_END:
+            return
+        yield item
+
+def _iter_code_files(directory_path, exclude_dirs, use_gitignore=True, profile=None):
+    """
+    Liefert alle möglichen Code-Dateien eines Verzeichnisses in os.walk-Reihenfolge.
+    
+    Ausgeschlossene und per .gitignore ignorierte Verzeichnisse werden nicht
+    betreten (siehe directory_walker.walk_files). Dateien ohne Endung sind
+    dabei, bis die Shebang-Zeile beim Zählen geprüft wird. Mit profile wird
+    der Durchlauf als Phase 'walk' gemessen.
+    
+    Returns:
+        Iterator über Tupel (index, file_path, file_ext, file_size, mtime_ns, inode)
+    """
+    files = walk_files(directory_path, exclude_dirs, file_filter=LANGUAGES.may_match, use_gitignore=use_gitignore,
+                       skipped=profile.skipped if profile is not None else None)
+    if profile is not None:
+        files = _profiled(files, profile, 'walk')
+    for index, (file_path, _, file_name, file_stat) in enumerate(files):
+        yield (index, file_path, os.path.splitext(file_name)[1],
+               file_stat.st_size, file_stat.st_mtime_ns, file_stat.st_ino)
+
+def _collect_code_files(directory_path, exclude_dirs, use_gitignore=True, profile=None):
+    """Sammelt alle bekannten Code-Dateien eines Verzeichnisses (siehe _iter_code_files)."""
+    return list(_iter_code_files(directory_path, exclude_dirs, use_gitignore, profile))
+
+def _relative_path(file_path, directory_path):
+    """Pfad relativ zum Scan-Verzeichnis; ohne os.path.relpath für Pfade aus dem Durchlauf."""
+    prefix = os.path.join(directory_path, '')
+    if file_path.startswith(prefix) and directory_path:
+        return file_path[len(prefix):]
+    return os.path.relpath(file_path, directory_path)
+
+def directory_fingerprint(directory_path, exclude_dirs=None, use_gitignore=True):
+    """
+    Berechnet einen Fingerabdruck aller Code-Dateien eines Verzeichnisses.
+    
+    Verwendet nur Pfad, Größe, Änderungszeit und Inode (ein stat pro Datei,
+    kein Lesen der Inhalte). Ändert sich eine Datei, kommt eine hinzu oder
+    fällt eine weg, ändert sich der Fingerabdruck.
     
     Args:
-        directory_path: Pfad zum zu analysierenden Verzeichnis
+        directory_path: Pfad zum Verzeichnis
         exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
-        
+        use_gitignore: .gitignore-Dateien beachten
+    
     Returns:
-        DataFrame mit Zeilenzahlen pro Datei und Gesamtstatistik
+        Hex-String
     """
     if exclude_dirs is None:
-        exclude_dirs = ['node_modules', 'venv', '.git', '__pycache__']
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(get_rules_version().encode('utf-8'))
+    for _, file_path, _, file_size, mtime_ns, inode in _iter_code_files(directory_path, exclude_dirs, use_gitignore):
+        digest.update(f'\0{file_path}\0{file_size}\0{mtime_ns}\0{inode}'.encode('utf-8', 'surrogateescape'))
+    return digest.hexdigest()
+
+# Abbruch-Signal der Worker-Prozesse (siehe _init_scan_worker); im Hauptprozess None
+_worker_cancel_event = None
+
+def _init_scan_worker(cancel_event):
+    """Initialisiert einen Worker-Prozess mit dem gemeinsamen Abbruch-Signal."""
+    global _worker_cancel_event
+    _worker_cancel_event = cancel_event
+
+def _count_file_batch(batch, directory_path, content_counts=None, oversize_policy=DEFAULT_OVERSIZE_POLICY,
+                      profile=None):
+    """
+    Zählt die Zeilen eines Stapels von Dateien.
     
+    Wird sowohl im seriellen Pfad als auch in den Worker-Prozessen verwendet,
+    damit beide Pfade identische Ergebnisse liefern. Ist das Abbruch-Signal
+    des Workers gesetzt, endet der Stapel vorzeitig.
+    
+    Args:
+        batch: Liste von Dateieinträgen aus _iter_code_files
+        directory_path: Wurzelverzeichnis für relative Pfade
+        content_counts: Dict für die Deduplizierung (siehe _count_open_file);
+                        None = ohne Deduplizierung
+        oversize_policy: OversizePolicy für übergroße Dateien
+        profile: ScanProfile, in dem jede Datei erfasst wird (optional)
+    
+    Returns:
+        Liste von (index, Ergebnis-Dict) der Dateien mit mindestens einer Zeile
+        sowie aller übergroßen Dateien
+    """
     results = []
-    total_lines = 0
-    total_empty_lines = 0
-    total_code_lines = 0
-    total_files = 0
-    lines_by_extension = {}
     
+    for index, file_path, file_ext, *_ in batch:
+        if _worker_cancel_event is not None and _worker_cancel_event.is_set():
+            break
+        profile_path = _relative_path(file_path, directory_path) if profile is not None else None
+        language, counts, content_hash, handling = _count_file(file_path, oversize_policy, content_counts,
+                                                               profile=profile, profile_path=profile_path)
+        
+        if counts[0] > 0 or handling is not None:
+            result = _make_result(_relative_path(file_path, directory_path), file_ext, language.name, *counts)
+            if content_counts is not None:
+                result['content_hash'] = content_hash
+            if handling is not None:
+                result['oversize'] = handling
+            results.append((index, result))
+    
+    return results
+
+def _count_file_batch_profiled(batch, directory_path, content_counts, oversize_policy):
+    """Zählt einen Stapel im Worker-Prozess mit eigenem ScanProfile; gibt (Ergebnisse, ScanProfile) zurück."""
+    profile = ScanProfile()
+    return _count_file_batch(batch, directory_path, content_counts, oversize_policy, profile), profile
+
+def _make_result(rel_path, file_ext, language, file_lines, file_empty_lines, file_code_lines):
+    """Erstellt das Ergebnis-Dict einer Datei."""
+    return {
+        'file_path': rel_path,
+        'language': language,
+        'extension': file_ext,
+        'total_lines': file_lines,
+        'empty_lines': file_empty_lines,
+        'code_lines': file_code_lines,
+    }
+
+def _make_balanced_batches(files_to_count, batch_count):
+    """
+    Verteilt Dateien anhand ihrer Größe auf möglichst gleich schwere Stapel.
+    
+    Die größten Dateien werden zuerst jeweils dem aktuell leichtesten Stapel
+    zugewiesen (LPT-Verfahren), damit einzelne große Dateien keinen Worker
+    zum Nachzügler machen.
+    """
+    batch_count = max(1, min(batch_count, len(files_to_count)))
+    heap = [(0, batch_index) for batch_index in range(batch_count)]
+    batches = [[] for _ in range(batch_count)]
+    
+    for entry in sorted(files_to_count, key=lambda entry: entry[3], reverse=True):
+        batch_size, batch_index = heapq.heappop(heap)
+        batches[batch_index].append(entry)
+        # Jede Datei kostet mindestens eine Einheit (Öffnen, Binärprüfung)
+        heapq.heappush(heap, (batch_size + entry[3] + 1, batch_index))
+    
+    return [batch for batch in batches if batch]
+
+def _count_files_parallel(files_to_count, directory_path, workers, counted_files, dedupe, oversize_policy,
+                          profile=None, tracker=None):
+    """
+    Zählt Dateien mit einem Prozess-Pool.
+    
+    Die Ergebnisse werden stapelweise geliefert, sobald ein Worker fertig ist,
+    also nicht in Scan-Reihenfolge. Die Dateien fertiger Stapel werden an
+    counted_files angehängt. Mit dedupe werden gleiche Inhalte innerhalb
+    eines Stapels nur einmal gezählt. Mit profile misst jeder Worker seine
+    Stapel selbst; die Messungen werden in profile zusammengeführt.
+    
+    Mit tracker (_ScanProgress) wird in kleineren Stapeln gezählt und der
+    Fortschritt auch während laufender Stapel gemeldet. Bei einem Abbruch
+    werden offene Stapel verworfen und die Worker über ein gemeinsames
+    Signal nach ihrer aktuellen Datei angehalten.
+    
+    Returns:
+        Iterator über (index, Ergebnis-Dict)
+    """
+    # Erst hier laden: der Import des Prozess-Pools kostet spürbar Startzeit
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    
+    batches_per_worker = PROGRESS_BATCHES_PER_WORKER if tracker is not None else BATCHES_PER_WORKER
+    batches = _make_balanced_batches(files_to_count, workers * batches_per_worker)
+    count_batch = _count_file_batch_profiled if profile is not None else _count_file_batch
+    
+    pool_options = {}
+    cancel_event = None
+    if tracker is not None:
+        import multiprocessing
+        cancel_event = multiprocessing.Event()
+        pool_options = {'initializer': _init_scan_worker, 'initargs': (cancel_event,)}
+    
+    with ProcessPoolExecutor(max_workers=workers, **pool_options) as executor:
+        futures = {executor.submit(count_batch, batch, directory_path, {} if dedupe else None,
+                                   oversize_policy): batch
+                   for batch in batches}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=PROGRESS_INTERVAL if tracker is not None else None,
+                                     return_when=FIRST_COMPLETED)
+                if tracker is not None and not done:
+                    tracker.tick()
+                for future in done:
+                    # Fertige Futures nicht länger halten, sonst blieben alle Ergebnisse bis zum Ende im Speicher
+                    batch = futures.pop(future)
+                    counted_files.extend(batch)
+                    if profile is not None:
+                        results, worker_profile = future.result()
+                        profile.merge(worker_profile)
+                    else:
+                        results = future.result()
+                    if tracker is not None:
+                        tracker.advance(len(batch), sum(entry[3] for entry in batch),
+                                        [result for _, result in results])
+                    yield from results
+        finally:
+            # Vorzeitiges Ende (Abbruch, Fehler): offene Stapel verwerfen, laufende Worker anhalten
+            if pending:
+                if cancel_event is not None:
+                    cancel_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+def _lookup_cached_files(cache, files_to_count, directory_path, dedupe, oversize_policy):
+    """
+    Sucht die Ergebnisse unveränderter Dateien im Cache.
+    
+    Mit dedupe gelten nur Einträge mit gespeichertem Inhalts-Hash (oder
+    übersprungene übergroße Dateien) als Treffer.
+    
+    Returns:
+        Dict index -> Ergebnis-Dict bzw. None für Dateien ohne Zeilen
+    """
+    hits = cache.lookup(directory_path, [entry[1:2] + entry[3:] for entry in files_to_count],
+                        oversize_policy.rules_version())
+    cached_results = {}
+    
+    for entry in files_to_count:
+        index, file_path, file_ext = entry[:3]
+        counts = hits.get(file_path)
+        if counts is None:
+            continue
+        file_lines, file_empty_lines, file_code_lines, language, content_hash, handling = counts
+        if file_lines == 0 and handling is None:
+            cached_results[index] = None
+        elif not dedupe or content_hash is not None or handling in _SKIPPED_OVERSIZE:
+            result = _make_result(_relative_path(file_path, directory_path), file_ext, language,
+                                  file_lines, file_empty_lines, file_code_lines)
+            if dedupe:
+                result['content_hash'] = content_hash
+            if handling is not None:
+                result['oversize'] = handling
+            cached_results[index] = result
+    
+    return cached_results
+
+def _store_counted_files(cache, counted_files, results, oversize_policy):
+    """Speichert die Zählergebnisse neu gezählter Dateien im Cache."""
+    results_by_index = dict(results)
+    rows = []
+    
+    for index, file_path, file_ext, file_size, mtime_ns, inode in counted_files:
+        result = results_by_index.get(index)
+        if result is not None:
+            counts = (result['total_lines'], result['empty_lines'], result['code_lines'], result['language'],
+                      result.get('content_hash'), result.get('oversize'))
+        else:
+            # Binärdateien und leere Ergebnisse ebenfalls merken
+            counts = (0, 0, 0, get_language_from_extension(file_ext), None, None)
+        rows.append((file_path, file_size, mtime_ns, inode) + counts)
+    
+    cache.store(rows, oversize_policy.rules_version())
+
+def _iter_indexed_counts(directory_path, exclude_dirs, workers, cache, dedupe=False,
+                         oversize_policy=DEFAULT_OVERSIZE_POLICY, use_gitignore=True, profile=None, tracker=None):
+    """
+    Liefert die Ergebnisse aller Dateien mit ihrem Index in der Scan-Reihenfolge.
+    
+    Seriell werden die Dateien während des Verzeichnisdurchlaufs gezählt und
+    in Scan-Reihenfolge geliefert. Mit Cache, mehreren Workern oder
+    Fortschrittsmeldung (tracker) wird das Verzeichnis zuerst vollständig
+    erfasst; parallele Ergebnisse kommen in der Reihenfolge, in der die Worker
+    fertig werden.
+    
+    Returns:
+        Iterator über (index, Ergebnis-Dict)
+    """
+    # Bereits gezählte Inhalte für die Deduplizierung im seriellen Pfad
+    content_counts = {} if dedupe else None
+    
+    if cache is None and workers <= 1 and tracker is None:
+        for entry in _iter_code_files(directory_path, exclude_dirs, use_gitignore, profile):
+            yield from _count_file_batch([entry], directory_path, content_counts, oversize_policy, profile)
+        return
+    
+    if tracker is not None:
+        files_to_count = list(tracker.watch_walk(_iter_code_files(directory_path, exclude_dirs, use_gitignore,
+                                                                  profile)))
+        tracker.start_counting(len(files_to_count), sum(entry[3] for entry in files_to_count))
+    else:
+        files_to_count = _collect_code_files(directory_path, exclude_dirs, use_gitignore, profile)
+    cached_results = {}
+    if cache is not None:
+        # Nur geänderte Dateien lesen
+        if profile is not None:
+            profile.start()
+        cached_results = _lookup_cached_files(cache, files_to_count, directory_path, dedupe, oversize_policy)
+        if profile is not None:
+            profile.lap('cache')
+            profile.cached_files += len(cached_results)
+        if tracker is not None:
+            tracker.advance(len(cached_results),
+                            sum(entry[3] for entry in files_to_count if entry[0] in cached_results),
+                            [result for result in cached_results.values() if result is not None])
+    changed_files = [entry for entry in files_to_count if entry[0] not in cached_results]
+    
+    counted_files = []
+    counted_results = []
     try:
-        for root, dirs, files in os.walk(directory_path):
-            # Ausgeschlossene Verzeichnisse überspringen
-            dirs[:] = [d for d in dirs if d not in exclude_dirs]
-            
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_ext = os.path.splitext(file)[1]
+        if workers > 1 and len(changed_files) > 1:
+            for index, result in sorted(cached_results.items()):
+                if result is not None:
+                    yield index, result
+            for item in _count_files_parallel(changed_files, directory_path, workers, counted_files, dedupe,
+                                              oversize_policy, profile, tracker):
+                if cache is not None:
+                    counted_results.append(item)
+                yield item
+        else:
+            for entry in files_to_count:
+                index = entry[0]
+                if index in cached_results:
+                    if cached_results[index] is not None:
+                        yield index, cached_results[index]
+                    continue
                 
-                # Nur bekannte Code-Dateien analysieren
-                if file_ext.lower() in CODE_EXTENSIONS:
-                    file_lines, file_empty_lines, file_code_lines = count_lines_in_file(file_path)
-                    
-                    if file_lines > 0:
-                        rel_path = os.path.relpath(file_path, directory_path)
-                        language = get_language_from_extension(file_ext)
-                        
-                        results.append({
-                            'file_path': rel_path,
-                            'language': language,
-                            'extension': file_ext,
-                            'total_lines': file_lines,
-                            'empty_lines': file_empty_lines,
-                            'code_lines': file_code_lines,
-                        })
-                        
-                        total_lines += file_lines
-                        total_empty_lines += file_empty_lines
-                        total_code_lines += file_code_lines
-                        total_files += 1
-                        
-                        # Zeilen nach Dateityp aggregieren
-                        if file_ext.lower() in lines_by_extension:
-                            lines_by_extension[file_ext.lower()] += file_code_lines
-                        else:
-                            lines_by_extension[file_ext.lower()] = file_code_lines
-        
-        # DataFrame mit den Ergebnissen erstellen
-        results_df = pd.DataFrame(results)
-        
-        # Zusammenfassung der Statistik
-        stats = {
-            'total_lines': total_lines,
-            'total_empty_lines': total_empty_lines,
-            'total_code_lines': total_code_lines,
-            'total_files': total_files,
-            'lines_by_extension': lines_by_extension
-        }
+                results = _count_file_batch([entry], directory_path, content_counts, oversize_policy, profile)
+                if cache is not None:
+                    counted_files.append(entry)
+                    counted_results.extend(results)
+                if tracker is not None:
+                    tracker.advance(1, entry[3], [result for _, result in results])
+                yield from results
+    finally:
+        # Auch bei vorzeitig beendetem Durchlauf alles bereits Gezählte speichern
+        if cache is not None and counted_files:
+            if profile is not None:
+                profile.start()
+            _store_counted_files(cache, counted_files, counted_results, oversize_policy)
+            if profile is not None:
+                profile.lap('cache')
+
+def _normalize_workers(workers):
+    """Gibt die Anzahl der Worker-Prozesse zurück (None oder 0 = alle CPU-Kerne)."""
+    if not workers:
+        return os.cpu_count() or 1
+    return workers
+
+def iter_file_counts(directory_path, exclude_dirs=None, workers=1, cache=None, totals=None, dedupe=False,
+                     oversize_policy=None, use_gitignore=True, profile=None, progress=None, cancel=None):
+    """
+    Liefert die Zeilenzahlen der Dateien eines Verzeichnisses, sobald sie vorliegen.
+    
+    Seriell kommen die Ergebnisse in Scan-Reihenfolge, ohne dass vorher das
+    ganze Verzeichnis erfasst wird; der Speicherbedarf hängt dann nicht von
+    der Anzahl der Dateien ab.
+    
+    Args:
+        directory_path: Pfad zum zu analysierenden Verzeichnis
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+        workers: Anzahl der Worker-Prozesse (1 = seriell, None oder 0 = alle CPU-Kerne)
+        cache: ScanCache, aus dem unveränderte Dateien übernommen werden (None = ohne Cache)
+        totals: ScanTotals, das mit jedem Ergebnis fortgeschrieben wird (optional)
+        dedupe: Gleiche Dateiinhalte nur einmal zählen und 'content_hash' mitliefern
+        oversize_policy: OversizePolicy für übergroße Dateien (Standard: vollständig zählen)
+        use_gitignore: Per .gitignore ignorierte Dateien und Verzeichnisse überspringen
+        profile: ScanProfile, das Phasen, übersprungene und langsamste Dateien erfasst (optional)
+        progress: Funktion, die höchstens alle PROGRESS_INTERVAL Sekunden und am Ende mit dem
+                  Stand des Scans aufgerufen wird (siehe _ScanProgress.snapshot); das Verzeichnis
+                  wird dann vor dem Zählen vollständig erfasst
+        cancel: Abbruch-Signal mit is_set(), z.B. threading.Event (optional)
+    
+    Returns:
+        Iterator über Ergebnis-Dicts mit den Schlüsseln aus RESULT_FIELDS (und ggf. 'content_hash');
+        übergroße Dateien haben zusätzlich 'oversize', übersprungene mit 0 Zeilen
+    
+    Raises:
+        ScanCancelled: Wenn cancel gesetzt wird; bereits Gezähltes steht dann im Cache
+    """
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    tracker = _make_scan_progress(progress, cancel)
+    
+    for _, result in _iter_indexed_counts(directory_path, exclude_dirs, _normalize_workers(workers), cache, dedupe,
+                                          oversize_policy or DEFAULT_OVERSIZE_POLICY, use_gitignore, profile,
+                                          tracker):
+        if totals is not None:
+            totals.add(result)
+        yield result
+    if tracker is not None:
+        tracker.finish()
+
+def write_file_counts(results, output, output_format='ndjson'):
+    """
+    Schreibt Ergebnis-Dicts fortlaufend als NDJSON oder CSV.
+    
+    Jedes Ergebnis wird sofort geschrieben, sodass auch sehr große Scans
+    mit konstantem Speicherbedarf an andere Werkzeuge weitergereicht werden.
+    
+    Args:
+        results: Iterierbare Ergebnis-Dicts, z.B. von iter_file_counts
+        output: Geöffnete Textdatei oder Stream (z.B. sys.stdout)
+        output_format: 'ndjson' oder 'csv'
+    
+    Returns:
+        Anzahl der geschriebenen Ergebnisse
+    """
+    count = 0
+    
+    if output_format == 'ndjson':
+        for result in results:
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            count += 1
+    elif output_format == 'csv':
+        writer = None
+        for result in results:
+            if writer is None:
+                # Zusätzliche Felder (z.B. content_hash) nach den Standardspalten; 'oversize'
+                # haben nur einzelne Ergebnisse und steht immer in der letzten Spalte
+                fieldnames = RESULT_FIELDS + [key for key in result if key not in RESULT_FIELDS + ['oversize']]
+                writer = csv.DictWriter(output, fieldnames=fieldnames + ['oversize'], lineterminator='\n')
+                writer.writeheader()
+            writer.writerow(result)
+            count += 1
+    else:
+        raise ValueError(f"Unbekanntes Ausgabeformat: {output_format}")
+    
+    return count
+
+def find_duplicate_groups(results):
+    """
+    Fasst Dateien mit identischem Inhalt (und gleicher Endung) zu Gruppen zusammen.
+    
+    Args:
+        results: Ergebnis-Dicts mit 'content_hash' (z.B. aus iter_file_counts mit dedupe=True)
+    
+    Returns:
+        Tuple mit (Code-Zeilen bei einmaliger Zählung jedes Inhalts, Liste der Duplikatgruppen).
+        Jede Gruppe ist ein Dict mit 'content_hash', 'code_lines' (pro Kopie), 'copies' und
+        'files'; die Liste ist nach eingesparten Code-Zeilen absteigend sortiert.
+    """
+    groups = {}
+    for result in results:
+        key = (result['content_hash'], result['extension'].lower())
+        group = groups.get(key)
+        if group is None:
+            groups[key] = group = {
+                'content_hash': result['content_hash'],
+                'code_lines': result['code_lines'],
+                'copies': 0,
+                'files': [],
+            }
+        group['copies'] += 1
+        group['files'].append(result['file_path'])
+    
+    unique_code_lines = sum(group['code_lines'] for group in groups.values())
+    duplicate_groups = sorted((group for group in groups.values() if group['copies'] > 1),
+                              key=lambda group: group['code_lines'] * (group['copies'] - 1), reverse=True)
+    return unique_code_lines, duplicate_groups
+
+def count_lines_in_directory(directory_path, exclude_dirs=None, workers=1, cache=None, dedupe=False,
+                             oversize_policy=None, use_gitignore=True, profile=False, progress=None, cancel=None):
+    """
+    Zählt die Anzahl der Zeilen in allen Dateien eines Verzeichnisses.
+    
+    Args:
+        directory_path: Pfad zum zu analysierenden Verzeichnis
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+        workers: Anzahl der Worker-Prozesse (1 = seriell, None oder 0 = alle CPU-Kerne)
+        cache: ScanCache, aus dem unveränderte Dateien übernommen werden (None = ohne Cache)
+        dedupe: Gleiche Dateiinhalte nur einmal zählen; die Statistik enthält dann zusätzlich
+                'unique_code_lines', 'duplicate_files' und 'duplicate_groups'
+        oversize_policy: OversizePolicy für übergroße Dateien (Standard: vollständig zählen);
+                         sie stehen in der Statistik unter 'oversized_files'
+        use_gitignore: Per .gitignore ignorierte Dateien und Verzeichnisse überspringen
+        profile: Den Scan messen; die Statistik enthält dann zusätzlich 'profile'
+                 (siehe ScanProfile.as_dict)
+        progress: Funktion für Fortschrittsmeldungen (siehe iter_file_counts)
+        cancel: Abbruch-Signal mit is_set(), z.B. threading.Event (optional)
+    
+    Returns:
+        DataFrame mit Zeilenzahlen pro Datei (kategorische Spalten 'language' und 'extension',
+        siehe ScanResultStore.to_dataframe) und Gesamtstatistik
+    
+    Raises:
+        ScanCancelled: Wenn cancel während des Scans gesetzt wird
+    """
+    # pandas erst bei Bedarf laden; der reine Scan kommt ohne aus (siehe main)
+    import pandas as pd
+    
+    try:
+        scan_profile = ScanProfile() if profile else None
+        started = time.perf_counter()
+        results, stats = _scan_directory_results(directory_path, exclude_dirs, workers, cache, dedupe,
+                                                 oversize_policy, use_gitignore, scan_profile, progress, cancel)
+        
+        # DataFrame mit den Ergebnissen erstellen; die Spalten werden nicht kopiert
+        if scan_profile is not None:
+            scan_profile.start()
+        results_df = results.to_dataframe()
+        if scan_profile is not None:
+            scan_profile.lap('dataframe')
+            scan_profile.elapsed_seconds = time.perf_counter() - started
+            stats['profile'] = scan_profile.as_dict()
         
         return results_df, stats
     
+    except ScanCancelled:
+        raise
     except Exception as e:
         print(f"Fehler bei der Verzeichnisanalyse: {str(e)}")
         # Leere Ergebnisse zurückgeben
-        return pd.DataFrame(), {
-            'total_lines': 0,
-            'total_empty_lines': 0,
-            'total_code_lines': 0,
-            'total_files': 0,
-            'lines_by_extension': {}
-        }
+        return pd.DataFrame(), ScanTotals().as_stats()
 
-def estimate_effort_and_cost(total_code_lines, team_size, dev_monthly_salary):
+def _scan_directory_results(directory_path, exclude_dirs=None, workers=1, cache=None, dedupe=False,
+                            oversize_policy=None, use_gitignore=True, profile=None, progress=None, cancel=None):
     """
-    Schätzt den Entwicklungsaufwand in Personenmonaten und die Kosten.
+    Scannt ein Verzeichnis wie count_lines_in_directory, aber ohne DataFrame.
     
-    Args:
-        total_code_lines: Gesamtanzahl der Code-Zeilen
-        team_size: Anzahl der Entwickler im Team
-        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+    Die Ergebnisse werden beim Eintreffen spaltenweise abgelegt, ohne die
+    Ergebnis-Dicts aller Dateien gleichzeitig im Speicher zu halten. Mit
+    profile (ScanProfile) werden alle Phasen bis auf 'dataframe' gemessen.
+    
+    Returns:
+        Tuple mit (ScanResultStore in Scan-Reihenfolge ohne übersprungene Dateien, Gesamtstatistik)
+    """
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    
+    tracker = _make_scan_progress(progress, cancel)
+    collector = _ScanCollector()
+    for index, result in _iter_indexed_counts(directory_path, exclude_dirs, _normalize_workers(workers), cache, dedupe,
+                                              oversize_policy or DEFAULT_OVERSIZE_POLICY, use_gitignore, profile,
+                                              tracker):
+        if profile is not None:
+            profile.start()
+        collector.add(index, result)
+        if profile is not None:
+            profile.lap('aggregate')
+    
+    if profile is not None:
+        profile.start()
+    results, stats = collector.finish(dedupe)
+    if profile is not None:
+        profile.lap('aggregate')
+    if tracker is not None:
+        tracker.finish()
+    return results, stats
+
+class _ScanCollector:
+    """Legt die Ergebnisse eines Scans beim Eintreffen ab und erstellt am Ende die Gesamtstatistik."""
+    
+    def __init__(self):
+        self.results = ScanResultStore()
+        self.totals = ScanTotals()
+        # Übersprungene übergroße Dateien nur in der Statistik aufführen
+        self.skipped_results = []
+        # Kamen alle Ergebnisse (auch übersprungene) in Scan-Reihenfolge?
+        self._in_order = True
+        self._last_index = -1
+    
+    def add(self, index, result):
+        """Legt das Ergebnis der Datei mit Position index in der Scan-Reihenfolge ab."""
+        if index < self._last_index:
+            self._in_order = False
+        self._last_index = max(self._last_index, index)
+        if result.get('oversize') in _SKIPPED_OVERSIZE:
+            self.skipped_results.append((index, result))
+        else:
+            self.results.append(result, index)
+        self.totals.add(result)
+    
+    def finish(self, dedupe=False):
+        """
+        Bringt die Ergebnisse in Scan-Reihenfolge und erstellt die Gesamtstatistik.
+        
+        Args:
+            dedupe: Die Statistik um 'unique_code_lines', 'duplicate_files' und
+                    'duplicate_groups' ergänzen
+        
+        Returns:
+            Tuple mit (ScanResultStore ohne übersprungene Dateien, Gesamtstatistik)
+        """
+        results = self.results
+        # Reihenfolge des seriellen Durchlaufs (auch bei parallelen Workern); kamen die Ergebnisse
+        # in anderer Reihenfolge, die Statistik in dieser neu aufbauen. heapq.merge setzt zwei
+        # sortierte Folgen voraus, also auch die übersprungenen Dateien sortieren
+        results.sort()
+        if not self._in_order:
+            self.skipped_results.sort(key=lambda item: item[0])
+            self.totals = ScanTotals()
+            for _, result in heapq.merge(results.iter_indexed(), self.skipped_results, key=lambda item: item[0]):
+                self.totals.add(result)
+        stats = self.totals.as_stats()
         
+        if dedupe:
+            unique_code_lines, duplicate_groups = find_duplicate_groups(results)
+            stats['unique_code_lines'] = unique_code_lines
+            stats['duplicate_files'] = sum(group['copies'] - 1 for group in duplicate_groups)
+            stats['duplicate_groups'] = duplicate_groups
+        return results, stats
+
+def _is_excluded_member(member_name, exclude_match):
+    """Prüft, ob ein Archiv-Eintrag in einem ausgeschlossenen Verzeichnis liegt (exclude_match aus compile_name_globs)."""
+    return exclude_match is not None and any(exclude_match(part) for part in posixpath.dirname(member_name).split('/'))
+
+def _iter_archive_members(archive):
+    """
+    Liefert die Dateien eines ZIP- oder tar-Archivs, ohne sie zu entpacken.
+    
+    tar-Archive (auch komprimiert) werden als Datenstrom gelesen. Der Inhalt
+    eines Eintrags wird erst beim Aufruf von read() dekomprimiert.
+    
+    Args:
+        archive: Pfad oder geöffnetes Dateiobjekt des Archivs
+    
     Returns:
-        Tuple mit (effort_months, total_cost)
+        Iterator über Tupel (member_name, uncompressed_size, open), wobei open() den Inhalt
+        als Binärdatei öffnet
     """
-    # Produktivitätsraten basierend auf Projektgröße (Code-Zeilen pro Entwickler pro Tag)
-    if total_code_lines < 5000:
-        # Kleine Projekte: höhere Produktivität
-        lines_per_dev_per_day = 150
-    elif total_code_lines < 50000:
-        # Mittlere Projekte: mittlere Produktivität
-        lines_per_dev_per_day = 100
+    # Archiv-Module erst bei Bedarf laden (Startzeit der Kommandozeile)
+    import tarfile
+    import zipfile
+    
+    if zipfile.is_zipfile(archive):
+        if hasattr(archive, 'seek'):
+            archive.seek(0)
+        with zipfile.ZipFile(archive) as zip_file:
+            for info in zip_file.infolist():
+                if not info.is_dir():
+                    yield info.filename, info.file_size, lambda info=info: zip_file.open(info)
+        return
+    
+    if hasattr(archive, 'seek'):
+        archive.seek(0)
+    if isinstance(archive, (str, os.PathLike)):
+        tar_file = tarfile.open(archive, mode='r|*')
     else:
-        # Große Projekte: niedrigere Produktivität
-        lines_per_dev_per_day = 80
+        tar_file = tarfile.open(fileobj=archive, mode='r|*')
+    with tar_file:
+        for member in tar_file:
+            if member.isfile():
+                yield member.name, member.size, lambda member=member: tar_file.extractfile(member)
+            else:
+                # Verzeichnisse und Links zählen nur für die Eintragsgrenze
+                yield member.name, 0, None
+
+def count_lines_in_archive(archive, exclude_dirs=None, max_total_size=ARCHIVE_MAX_TOTAL_SIZE,
+                           max_members=ARCHIVE_MAX_MEMBERS, oversize_policy=None, profile=False, progress=None,
+                           cancel=None):
+    """
+    Zählt die Zeilen aller Code-Dateien eines ZIP- oder tar(.gz)-Archivs.
     
-    # Arbeitstage pro Monat
-    work_days_per_month = 21
+    Die Einträge werden direkt aus dem Archiv gelesen, nichts wird auf die
+    Festplatte entpackt. Dateityp und ausgeschlossene Verzeichnisse werden
+    anhand des Eintragsnamens geprüft, bevor ein Eintrag dekomprimiert wird;
+    große Einträge werden blockweise dekomprimiert und gezählt.
     
-    # Produktive Zeit pro Tag (in Prozent) - berücksichtigt Meetings, Planung, etc.
-    productive_time_percentage = 0.7
+    Args:
+        archive: Pfad oder geöffnetes Dateiobjekt des Archivs (z.B. ein Upload)
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+        max_total_size: Maximale Gesamtgröße der dekomprimierten Code-Dateien in Bytes
+        max_members: Maximale Anzahl von Einträgen im Archiv
+        oversize_policy: OversizePolicy für übergroße Dateien (Standard: vollständig zählen)
+        profile: Den Scan messen; die Statistik enthält dann zusätzlich 'profile'
+                 (siehe ScanProfile.as_dict)
+        progress: Funktion für Fortschrittsmeldungen (siehe iter_file_counts); die Gesamtzahl der
+                  Dateien ist bei Archiven unbekannt
+        cancel: Abbruch-Signal mit is_set(), z.B. threading.Event (optional)
     
-    # Zeilen pro Entwickler pro Monat
-    lines_per_dev_per_month = lines_per_dev_per_day * work_days_per_month * productive_time_percentage
+    Returns:
+        DataFrame mit Zeilenzahlen pro Datei (wie bei count_lines_in_directory) und Gesamtstatistik
     
-    # Gesamte Personenmonate
-    effort_months = total_code_lines / lines_per_dev_per_month
+    Raises:
+        ValueError: Wenn das Archiv eine der Grenzen überschreitet oder kein unterstütztes Format hat
+        ScanCancelled: Wenn cancel während des Scans gesetzt wird
+    """
+    scan_profile = ScanProfile() if profile else None
+    started = time.perf_counter()
+    results, stats = _scan_archive_results(archive, exclude_dirs, max_total_size, max_members, oversize_policy,
+                                           scan_profile, progress, cancel)
+    if scan_profile is None:
+        return results.to_dataframe(), stats
     
-    # Kalenderzeit in Monaten (dividiert durch Teamgröße)
-    calendar_months = effort_months / team_size
+    scan_profile.start()
+    results_df = results.to_dataframe()
+    scan_profile.lap('dataframe')
+    scan_profile.elapsed_seconds = time.perf_counter() - started
+    stats['profile'] = scan_profile.as_dict()
+    return results_df, stats
+
+def _scan_archive_results(archive, exclude_dirs=None, max_total_size=ARCHIVE_MAX_TOTAL_SIZE,
+                          max_members=ARCHIVE_MAX_MEMBERS, oversize_policy=None, profile=None, progress=None,
+                          cancel=None):
+    """
+    Scannt ein Archiv wie count_lines_in_archive, aber ohne DataFrame.
     
-    # Teameffizienz-Faktor (größere Teams haben mehr Overhead)
-    if team_size <= 2:
-        efficiency_factor = 1.0
-    elif team_size <= 5:
-        efficiency_factor = 0.9
-    else:
-        efficiency_factor = 0.8
+    Mit profile (ScanProfile) werden alle Phasen bis auf 'dataframe' gemessen.
     
-    # Angepasste Kalenderzeit
-    calendar_months = calendar_months / efficiency_factor
+    Returns:
+        Tuple mit (ScanResultStore ohne übersprungene Dateien, Gesamtstatistik)
+    """
+    results = ScanResultStore()
+    totals = ScanTotals()
+    for result in iter_archive_counts(archive, exclude_dirs, max_total_size, max_members, oversize_policy, profile,
+                                      progress, cancel):
+        if profile is not None:
+            profile.start()
+        totals.add(result)
+        if result.get('oversize') not in _SKIPPED_OVERSIZE:
+            results.append(result)
+        if profile is not None:
+            profile.lap('aggregate')
+    
+    if profile is not None:
+        profile.start()
+    stats = totals.as_stats()
+    if profile is not None:
+        profile.lap('aggregate')
+    return results, stats
+
+def iter_archive_counts(archive, exclude_dirs=None, max_total_size=ARCHIVE_MAX_TOTAL_SIZE,
+                        max_members=ARCHIVE_MAX_MEMBERS, oversize_policy=None, profile=None, progress=None,
+                        cancel=None):
+    """
+    Zählt die Code-Dateien eines Archivs und liefert die Ergebnisse einzeln (siehe count_lines_in_archive).
     
-    # Gesamtkosten (Teamgröße * Monate * Monatsgehalt)
-    total_cost = team_size * calendar_months * dev_monthly_salary
+    Übersprungene übergroße Dateien sind mit ihrer Behandlung unter 'oversize'
+    enthalten, damit ScanTotals sie aufführen kann. Mit profile (ScanProfile)
+    zählt das Lesen des Inhaltsverzeichnisses als Phase 'walk'; progress und
+    cancel wie bei iter_file_counts.
     
-    return calendar_months, total_cost 
\ No newline at end of file
+    Returns:
+        Iterator über Ergebnis-Dicts in der Reihenfolge des Archivs
+    
+    Raises:
+        ValueError: Wenn das Archiv eine der Grenzen überschreitet oder kein unterstütztes Format hat
+        ScanCancelled: Wenn cancel während des Scans gesetzt wird
+    """
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    oversize_policy = oversize_policy or DEFAULT_OVERSIZE_POLICY
+    exclude_match = compile_name_globs(exclude_dirs)
+    import tarfile
+    import zipfile
+    import zlib
+    
+    member_count = 0
+    total_size = 0
+    
+    members = _iter_archive_members(archive)
+    if profile is not None:
+        members = _profiled(members, profile, 'walk')
+    tracker = _make_scan_progress(progress, cancel)
+    if tracker is not None:
+        tracker.start_counting(None, None)
+    
+    try:
+        for member_name, member_size, open_member in members:
+            member_count += 1
+            if member_count > max_members:
+                raise ValueError(f"Archiv enthält mehr als {max_members} Einträge")
+            
+            file_name = posixpath.basename(member_name)
+            if open_member is None:
+                continue
+            if not LANGUAGES.may_match(file_name):
+                if profile is not None:
+                    profile.skip('not_code')
+                continue
+            if _is_excluded_member(member_name, exclude_match):
+                if profile is not None:
+                    profile.skip('excluded')
+                continue
+            
+            total_size += member_size
+            if total_size > max_total_size:
+                raise ValueError(f"Entpackte Code-Dateien im Archiv überschreiten {max_total_size} Bytes")
+            
+            if profile is not None:
+                started = profile.start()
+            with open_member() as member_file:
+                language, counts, _, handling = _count_open_file(member_file, file_name, member_size, oversize_policy,
+                                                                 profile=profile)
+                if profile is not None:
+                    profile.add_file(member_name, language, _bytes_read(member_file, member_size), started)
+            result = None
+            if counts[0] > 0 or handling is not None:
+                result = _make_result(member_name, posixpath.splitext(file_name)[1], language.name, *counts)
+                if handling is not None:
+                    result['oversize'] = handling
+            if tracker is not None:
+                tracker.advance(1, member_size, (result,) if result is not None else ())
+            if result is not None:
+                yield result
+    except (tarfile.TarError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+        # Unbekanntes Format, beschädigter Inhalt oder abgeschnittenes Archiv
+        raise ValueError("Archiv ist beschädigt oder hat kein unterstütztes Format "
+                         "(erwartet ZIP, tar oder tar.gz)") from e
+    if tracker is not None:
+        tracker.finish()
+
+def count_lines_in_git_revision(repository, revision='HEAD', exclude_dirs=None):
+    """
+    Zählt die Zeilen aller Code-Dateien eines Git-Repositorys in einer Revision.
+    
+    Die Dateien werden direkt aus der Objektdatenbank gelesen, ohne die
+    Revision auszuchecken. Jeder Blob wird pro Dateiendung nur einmal gezählt;
+    bei einem wiederverwendeten GitRepository gilt das über alle Revisionen.
+    
+    Args:
+        repository: GitRepository oder Pfad zu einem lokalen Repository
+        revision: Branch, Tag oder Commit-SHA
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+    
+    Returns:
+        DataFrame mit Zeilenzahlen pro Datei (wie bei count_lines_in_directory, siehe
+        ScanResultStore.to_dataframe) und Gesamtstatistik
+    
+    Raises:
+        ValueError: Wenn der Pfad kein Repository oder die Revision unbekannt ist
+    """
+    if not isinstance(repository, GitRepository):
+        with GitRepository(repository) as git_repository:
+            return count_lines_in_git_revision(git_repository, revision, exclude_dirs)
+    
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    
+    exclude_match = compile_name_globs(exclude_dirs)
+    results = ScanResultStore()
+    totals = ScanTotals()
+    
+    for file_path, sha in repository.iter_tree(revision):
+        result = _count_git_blob(repository, file_path, sha, exclude_match)
+        if result is not None:
+            results.append(result)
+            totals.add(result)
+    
+    return results.to_dataframe(), totals.as_stats()
+
+def _count_git_blob(repository, file_path, sha, exclude_match):
+    """Zählt einen Blob (mit Zwischenspeicher) und gibt das Ergebnis-Dict oder None zurück."""
+    file_name = posixpath.basename(file_path)
+    if not LANGUAGES.may_match(file_name) or _is_excluded_member(file_path, exclude_match):
+        return None
+    file_ext = posixpath.splitext(file_name)[1]
+    
+    # Unveränderte Blobs aus früheren Revisionen nicht erneut zählen; Dateien
+    # ohne Endung hängen über Name bzw. Shebang vom Dateinamen ab
+    key = (sha, file_ext.lower() or file_name)
+    entry = repository.blob_counts.get(key)
+    if entry is None:
+        data = repository.read_blob(sha)
+        language = None
+        if not _is_binary_block(data[:BINARY_CHECK_SIZE]):
+            language = LANGUAGES.detect(file_name, data[:BINARY_CHECK_SIZE])
+        if language is None:
+            entry = (None, (0, 0, 0))
+        else:
+            entry = (language.name, _count_lines_in_text_bytes(data, language.lexer))
+        repository.blob_counts[key] = entry
+    
+    language_name, counts = entry
+    if counts[0] == 0:
+        return None
+    return _make_result(file_path, file_ext, language_name, *counts)
+
+def count_lines_in_git_history(repository, revision='HEAD', every=1, tags=False, exclude_dirs=None,
+                               team_size=3, dev_monthly_salary=8000):
+    """
+    Erstellt eine Zeitreihe der Zeilenzahlen und Aufwandsschätzung über die Git-Historie.
+    
+    Nur die erste Revision wird vollständig gezählt. Für jede weitere werden
+    per `git diff-tree` nur die geänderten Pfade von den laufenden Summen
+    abgezogen bzw. neu gezählt und addiert.
+    
+    Args:
+        repository: GitRepository oder Pfad zu einem lokalen Repository
+        revision: Revision, deren First-Parent-Historie ausgewertet wird
+        every: Nur jeden N-ten Commit auswerten (der neueste ist immer dabei)
+        tags: Statt Commits alle Tags in zeitlicher Reihenfolge auswerten
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+        team_size: Teamgröße für estimate_effort_and_cost
+        dev_monthly_salary: Monatsgehalt für estimate_effort_and_cost
+    
+    Returns:
+        DataFrame mit einer Zeile pro Revision, indiziert nach Commit-Datum
+    """
+    if not isinstance(repository, GitRepository):
+        with GitRepository(repository) as git_repository:
+            return count_lines_in_git_history(git_repository, revision, every, tags, exclude_dirs,
+                                              team_size, dev_monthly_salary)
+    
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    
+    import pandas as pd
+    
+    revisions = repository.list_tags() if tags else repository.list_commits(revision, every)
+    exclude_match = compile_name_globs(exclude_dirs)
+    
+    rows = []
+    totals = ScanTotals()
+    # Pfad -> Ergebnis-Dict der Dateien im aktuellen Stand
+    current_files = {}
+    previous_sha = None
+    
+    for sha, timestamp, label in revisions:
+        if previous_sha is None:
+            changes = [(file_path, None, blob_sha) for file_path, blob_sha in repository.iter_tree(sha)]
+        else:
+            changes = repository.diff_tree(previous_sha, sha)
+        
+        for file_path, _, new_sha in changes:
+            old_result = current_files.pop(file_path, None)
+            if old_result is not None:
+                totals.remove(old_result)
+            
+            if new_sha is not None:
+                result = _count_git_blob(repository, file_path, new_sha, exclude_match)
+                if result is not None:
+                    current_files[file_path] = result
+                    totals.add(result)
+        
+        effort_months, cost = estimate_effort_and_cost(totals.total_code_lines, team_size, dev_monthly_salary)
+        rows.append({
+            'date': pd.Timestamp(timestamp, unit='s'),
+            'commit': sha,
+            'label': label,
+            'total_files': totals.total_files,
+            'total_lines': totals.total_lines,
+            'total_empty_lines': totals.total_empty_lines,
+            'total_code_lines': totals.total_code_lines,
+            'effort_months': effort_months,
+            'cost': cost,
+        })
+        previous_sha = sha
+    
+    columns = ['date', 'commit', 'label', 'total_files', 'total_lines', 'total_empty_lines',
+               'total_code_lines', 'effort_months', 'cost']
+    return pd.DataFrame(rows, columns=columns).set_index('date')
+
+def estimate_effort_and_cost(total_code_lines, team_size, dev_monthly_salary):
+    """
+    Schätzt den Entwicklungsaufwand in Personenmonaten und die Kosten.
+    
+    Args:
+        total_code_lines: Gesamtanzahl der Code-Zeilen
+        team_size: Anzahl der Entwickler im Team
+        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+    
+    Returns:
+        Tuple mit (effort_months, total_cost)
+    """
+    # Skalare Variante der vektorisierten Schätzung in estimation (ohne NumPy)
+    return estimate_effort_and_cost_scalar(total_code_lines, team_size, dev_monthly_salary)
+
+def _make_estimate(stats, team_size, dev_monthly_salary):
+    """Schätzt Aufwand und Kosten zu einer Gesamtstatistik (ohne doppelte Dateien, falls dedupliziert)."""
+    estimate_lines = stats.get('unique_code_lines', stats['total_code_lines'])
+    effort_months, total_cost = estimate_effort_and_cost(estimate_lines, team_size, dev_monthly_salary)
+    return {
+        'team_size': team_size,
+        'dev_monthly_salary': dev_monthly_salary,
+        'effort_months': effort_months,
+        'total_cost': total_cost,
+    }
+
+if __name__ == '__main__':
+    # Die Kommandozeile liegt in cli; `python -m code_counter` bleibt als Aufruf erhalten
+    from cli import main
+    sys.exit(main())
@@ -0,0 +1,268 @@
+import os
+import re
+import fnmatch
+
+# Name der Ignore-Dateien, die beim Durchlauf ausgewertet werden
+IGNORE_FILE_NAME = '.gitignore'
+
+def compile_name_globs(patterns):
+    """
+    Kompiliert Glob-Muster für Verzeichnisnamen (z.B. 'node_modules', '.venv*') zu einem Regex.
+    
+    Args:
+        patterns: Liste von Mustern im fnmatch-Format; exakte Namen passen nur auf sich selbst
+    
+    Returns:
+        Match-Funktion für einen Namen oder None ohne Muster
+    """
+    patterns = [pattern for pattern in patterns if pattern]
+    if not patterns:
+        return None
+    return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns)).match
+
+def _translate_gitignore_glob(pattern):
+    """Übersetzt ein Glob-Muster aus einer .gitignore (ohne '!' und abschließendes '/') in einen Regex."""
+    parts = []
+    i, length = 0, len(pattern)
+    
+    while i < length:
+        char = pattern[i]
+        if char == '*':
+            segment_start = i == 0 or pattern[i - 1] == '/'
+            if pattern.startswith('**', i) and segment_start:
+                if i + 2 == length:
+                    # "foo/**": alles unterhalb
+                    parts.append('.*')
+                    i += 2
+                    continue
+                if pattern[i + 2] == '/':
+                    # "**/foo" bzw. "a/**/b": beliebig viele Verzeichnisse (auch keins)
+                    parts.append('(?:.*/)?')
+                    i += 3
+                    continue
+            parts.append('[^/]*')
+            while i < length and pattern[i] == '*':
+                i += 1
+            continue
+        if char == '?':
+            parts.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 2 if pattern.startswith(('[!', '[^', '[]'), i) else i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        elif char == '\\' and i + 1 < length:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    
+    return ''.join(parts)
+
+class IgnoreRules:
+    """
+    Die Muster einer .gitignore-Datei, kompiliert zu zwei Regexen.
+    
+    Alle Muster stehen in umgekehrter Reihenfolge als benannte Alternativen in
+    einem Regex; der erste Treffer ist damit das letzte passende Muster der
+    Datei, wie es die Git-Semantik verlangt. Ein zweiter Regex ohne
+    Verzeichnis-Muster ('build/') gilt für Dateien.
+    """
+    
+    __slots__ = ('_directory_match', '_file_match', '_negated')
+    
+    def __init__(self, lines):
+        """
+        Args:
+            lines: Zeilen der Ignore-Datei
+        """
+        directory_patterns = []
+        file_patterns = []
+        # Gruppenname -> Muster mit '!' (nimmt Pfade wieder auf)
+        self._negated = {}
+        
+        for index, line in enumerate(lines):
+            line = line.rstrip('\r\n')
+            # Abschließende Leerzeichen zählen nur, wenn sie maskiert sind
+            stripped = line.rstrip(' ')
+            if stripped.endswith('\\') and len(stripped) < len(line):
+                stripped += ' '
+            line = stripped
+            if not line or line.startswith('#'):
+                continue
+            
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            elif line.startswith('\\'):
+                line = line[1:]
+            directory_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            
+            # Muster mit '/' gelten relativ zum Verzeichnis der Ignore-Datei,
+            # andere für den Namen auf jeder Ebene
+            anchored = '/' in line
+            regex = _translate_gitignore_glob(line.lstrip('/'))
+            if not anchored:
+                regex = '(?:.*/)?' + regex
+            
+            group = f'p{index}'
+            self._negated[group] = negated
+            directory_patterns.append(f'(?P<{group}>{regex})')
+            if not directory_only:
+                file_patterns.append(f'(?P<{group}>{regex})')
+        
+        self._directory_match = self._compile(directory_patterns)
+        self._file_match = self._compile(file_patterns)
+    
+    @staticmethod
+    def _compile(patterns):
+        if not patterns:
+            return None
+        return re.compile('(?:' + '|'.join(reversed(patterns)) + r')\Z', re.DOTALL).match
+    
+    @classmethod
+    def from_file(cls, path):
+        """Liest eine Ignore-Datei; unlesbare Dateien ergeben keine Regeln."""
+        try:
+            with open(path, encoding='utf-8', errors='replace') as file:
+                return cls(file.readlines())
+        except OSError:
+            return cls([])
+    
+    def __bool__(self):
+        return self._directory_match is not None
+    
+    def match(self, relative_path, is_directory):
+        """
+        Prüft einen Pfad relativ zum Verzeichnis der Ignore-Datei.
+        
+        Returns:
+            True (ignoriert), False (per '!' wieder aufgenommen) oder None (kein Muster passt)
+        """
+        match = (self._directory_match if is_directory else self._file_match)
+        if match is None:
+            return None
+        result = match(relative_path)
+        if result is None:
+            return None
+        return not self._negated[result.lastgroup]
+
+def _is_ignored(ignore_rules, relative_path, is_directory):
+    """Wertet die aktiven Ignore-Dateien von der tiefsten zur obersten aus."""
+    for prefix_length, rules in reversed(ignore_rules):
+        decision = rules.match(relative_path[prefix_length:], is_directory)
+        if decision is not None:
+            return decision
+    return False
+
+def walk_files(directory_path, exclude_dirs=(), file_filter=None, use_gitignore=True, follow_symlinks=False,
+               skipped=None):
+    """
+    Durchläuft ein Verzeichnis mit os.scandir und liefert alle Dateien in os.walk-Reihenfolge.
+    
+    Ausgeschlossene und ignorierte Verzeichnisse werden nicht betreten. Die
+    Dateien eines Verzeichnisses kommen vor seinen Unterverzeichnissen. stat
+    wird nur für Dateien aufgerufen, die file_filter akzeptiert.
+    
+    Args:
+        directory_path: Wurzelverzeichnis
+        exclude_dirs: Glob-Muster für Verzeichnisnamen, die übersprungen werden (z.B. '.venv*')
+        file_filter: Funktion Dateiname -> bool; None = alle Dateien
+        use_gitignore: .gitignore-Dateien (auch in Unterverzeichnissen) beachten
+        follow_symlinks: Symbolischen Links auf Verzeichnisse folgen; jedes Verzeichnis
+                         wird dabei höchstens einmal betreten, Zyklen sind ausgeschlossen
+        skipped: Dict Grund -> Anzahl, in dem Übersprungenes gezählt wird (optional):
+                 'excluded_directories', 'gitignored' (Dateien und Verzeichnisse) und
+                 'not_code' (von file_filter abgelehnte Dateien)
+    
+    Returns:
+        Iterator über Tupel (file_path, relativer Pfad mit '/', Dateiname, os.stat_result)
+    """
+    exclude_match = compile_name_globs(exclude_dirs)
+    visited = set()
+    if follow_symlinks:
+        try:
+            root_stat = os.stat(directory_path)
+            visited.add((root_stat.st_dev, root_stat.st_ino))
+        except OSError:
+            return
+    
+    # Stapel offener Verzeichnisse: (Pfad, relatives Präfix, aktive Ignore-Regeln)
+    # mit Ignore-Regeln als Liste von (Länge des Präfixes ihres Verzeichnisses, IgnoreRules)
+    stack = [(directory_path, '', [])]
+    
+    while stack:
+        current_path, prefix, ignore_rules = stack.pop()
+        try:
+            with os.scandir(current_path) as scanner:
+                entries = list(scanner)
+        except OSError:
+            continue
+        
+        if use_gitignore:
+            for entry in entries:
+                if entry.name == IGNORE_FILE_NAME and entry.is_file():
+                    rules = IgnoreRules.from_file(entry.path)
+                    if rules:
+                        ignore_rules = ignore_rules + [(len(prefix), rules)]
+                    break
+        
+        subdirectories = []
+        for entry in entries:
+            name = entry.name
+            try:
+                is_directory = entry.is_dir(follow_symlinks=follow_symlinks)
+            except OSError:
+                continue
+            
+            if is_directory:
+                if exclude_match is not None and exclude_match(name):
+                    if skipped is not None:
+                        skipped['excluded_directories'] = skipped.get('excluded_directories', 0) + 1
+                    continue
+                relative_path = prefix + name
+                if ignore_rules and _is_ignored(ignore_rules, relative_path, True):
+                    if skipped is not None:
+                        skipped['gitignored'] = skipped.get('gitignored', 0) + 1
+                    continue
+                if follow_symlinks:
+                    try:
+                        directory_stat = entry.stat()
+                    except OSError:
+                        continue
+                    key = (directory_stat.st_dev, directory_stat.st_ino)
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                subdirectories.append((entry.path, relative_path + '/', ignore_rules))
+                continue
+            
+            if file_filter is not None and not file_filter(name):
+                if skipped is not None:
+                    skipped['not_code'] = skipped.get('not_code', 0) + 1
+                continue
+            relative_path = prefix + name
+            if ignore_rules and _is_ignored(ignore_rules, relative_path, False):
+                if skipped is not None:
+                    skipped['gitignored'] = skipped.get('gitignored', 0) + 1
+                continue
+            try:
+                # Links auf Dateien werden aufgelöst; verwaiste Links übersprungen
+                if not entry.is_file():
+                    continue
+                file_stat = entry.stat()
+            except OSError:
+                continue
+            yield entry.path, relative_path, name, file_stat
+        
+        # Umgekehrt auf den Stapel, damit die Unterverzeichnisse in Scan-Reihenfolge folgen
+        stack.extend(reversed(subdirectories))
@@ -0,0 +1,165 @@
+import numpy as np
+import estimation_rules
+
+# Stufen und Annahmen der Schätzung (siehe estimation_rules) als Arrays für searchsorted
+PROJECT_SIZE_THRESHOLDS = np.array(estimation_rules.PROJECT_SIZE_THRESHOLDS)
+LINES_PER_DEV_PER_DAY = np.array(estimation_rules.LINES_PER_DEV_PER_DAY)
+TEAM_SIZE_THRESHOLDS = np.array(estimation_rules.TEAM_SIZE_THRESHOLDS)
+TEAM_EFFICIENCY_FACTORS = np.array(estimation_rules.TEAM_EFFICIENCY_FACTORS)
+WORK_DAYS_PER_MONTH = estimation_rules.WORK_DAYS_PER_MONTH
+PRODUCTIVE_TIME_PERCENTAGE = estimation_rules.PRODUCTIVE_TIME_PERCENTAGE
+
+# Standard-Unsicherheiten der Monte-Carlo-Schätzung als Dreiecksverteilungen
+# (Minimum, wahrscheinlichster Wert, Maximum)
+DEFAULT_UNCERTAINTY = {
+    # Multiplikator auf die Produktivitätsraten der Projektgrößen-Stufen
+    'productivity_factor': (0.7, 1.0, 1.3),
+    'work_days_per_month': (19, 21, 22),
+    'productive_time_percentage': (0.55, 0.7, 0.8),
+    # Multiplikator auf den Teameffizienz-Faktor der Teamgrößen-Stufen
+    'efficiency_factor': (0.9, 1.0, 1.05),
+}
+
+# Anzahl der Stichproben der Monte-Carlo-Schätzung
+MONTE_CARLO_SAMPLES = 100000
+
+# Ausgewiesene Perzentile der Monte-Carlo-Schätzung
+MONTE_CARLO_PERCENTILES = (10, 50, 90)
+
+def estimate_effort_and_cost_array(total_code_lines, team_size, dev_monthly_salary, productivity_factor=1.0,
+                                   work_days_per_month=WORK_DAYS_PER_MONTH,
+                                   productive_time_percentage=PRODUCTIVE_TIME_PERCENTAGE, efficiency_factor=1.0):
+    """
+    Vektorisierte Aufwands- und Kostenschätzung.
+    
+    Alle Argumente dürfen Skalare oder NumPy-Arrays sein und werden nach den
+    üblichen Broadcasting-Regeln kombiniert. Die Stufen für Produktivität und
+    Teameffizienz werden per searchsorted statt if/elif bestimmt.
+    
+    Args:
+        total_code_lines: Gesamtanzahl der Code-Zeilen
+        team_size: Anzahl der Entwickler im Team
+        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+        productivity_factor: Multiplikator auf die Produktivitätsraten (1.0 = Standardannahme)
+        work_days_per_month: Arbeitstage pro Monat
+        productive_time_percentage: Anteil produktiver Zeit pro Tag
+        efficiency_factor: Multiplikator auf den Teameffizienz-Faktor (1.0 = Standardannahme)
+    
+    Returns:
+        Tuple mit (effort_months, total_cost) als Arrays in der Broadcast-Form
+    """
+    total_code_lines = np.asarray(total_code_lines, dtype=float)
+    team_size = np.asarray(team_size, dtype=float)
+    dev_monthly_salary = np.asarray(dev_monthly_salary, dtype=float)
+    
+    # Stufe 0 unter 5.000 Zeilen, 1 unter 50.000 Zeilen, sonst 2
+    size_tier = np.searchsorted(PROJECT_SIZE_THRESHOLDS, total_code_lines, side='right')
+    lines_per_dev_per_day = LINES_PER_DEV_PER_DAY[size_tier] * np.asarray(productivity_factor, dtype=float)
+    
+    # Zeilen pro Entwickler pro Monat
+    lines_per_dev_per_month = lines_per_dev_per_day * work_days_per_month * productive_time_percentage
+    
+    # Gesamte Personenmonate
+    effort_months = total_code_lines / lines_per_dev_per_month
+    
+    # Kalenderzeit in Monaten (dividiert durch Teamgröße)
+    calendar_months = effort_months / team_size
+    
+    # Stufe 0 bis 2 Entwickler, 1 bis 5 Entwickler, sonst 2
+    team_tier = np.searchsorted(TEAM_SIZE_THRESHOLDS, team_size, side='left')
+    calendar_months = calendar_months / (TEAM_EFFICIENCY_FACTORS[team_tier] * efficiency_factor)
+    
+    # Gesamtkosten (Teamgröße * Monate * Monatsgehalt)
+    total_cost = team_size * calendar_months * dev_monthly_salary
+    
+    return calendar_months, total_cost
+
+def estimate_effort_and_cost_grid(total_code_lines, team_sizes, dev_monthly_salaries, productivity_factors=(1.0,)):
+    """
+    Berechnet Aufwand und Kosten für alle Kombinationen der Parameter in einem Aufruf.
+    
+    Args:
+        total_code_lines: Code-Zeilen (Skalar oder Liste, z.B. eine pro Repository)
+        team_sizes: Liste von Teamgrößen
+        dev_monthly_salaries: Liste von Monatsgehältern
+        productivity_factors: Liste von Multiplikatoren auf die Produktivitätsraten
+    
+    Returns:
+        Dict mit 'effort_months' und 'total_cost' (Arrays der Form
+        (Code-Zeilen, Teamgrößen, Gehälter, Produktivitätsfaktoren)) sowie den
+        Achsenwerten unter 'total_code_lines', 'team_sizes', 'dev_monthly_salaries'
+        und 'productivity_factors'
+    """
+    axes = [np.atleast_1d(np.asarray(values, dtype=float))
+            for values in (total_code_lines, team_sizes, dev_monthly_salaries, productivity_factors)]
+    
+    # Jede Achse in eine eigene Dimension legen; Broadcasting bildet das Gitter
+    shaped = [values.reshape([-1 if axis == index else 1 for axis in range(len(axes))])
+              for index, values in enumerate(axes)]
+    effort_months, total_cost = estimate_effort_and_cost_array(*shaped)
+    shape = tuple(len(values) for values in axes)
+    
+    return {
+        'effort_months': np.broadcast_to(effort_months, shape),
+        'total_cost': np.broadcast_to(total_cost, shape),
+        'total_code_lines': axes[0],
+        'team_sizes': axes[1],
+        'dev_monthly_salaries': axes[2],
+        'productivity_factors': axes[3],
+    }
+
+def _draw_samples(distribution, rng, samples):
+    """
+    Zieht Stichproben eines Parameters.
+    
+    Args:
+        distribution: Fester Wert, Tupel (Minimum, wahrscheinlichster Wert, Maximum) für eine
+                      Dreiecksverteilung oder Funktion (rng, samples) -> Array
+        rng: numpy.random.Generator
+        samples: Anzahl der Stichproben
+    """
+    if callable(distribution):
+        return np.asarray(distribution(rng, samples), dtype=float)
+    if isinstance(distribution, (tuple, list)):
+        low, mode, high = distribution
+        if low == high:
+            return np.full(samples, float(mode))
+        return rng.triangular(low, mode, high, samples)
+    return np.full(samples, float(distribution))
+
+def estimate_effort_and_cost_monte_carlo(total_code_lines, team_size, dev_monthly_salary, uncertainty=None,
+                                         samples=MONTE_CARLO_SAMPLES, seed=None):
+    """
+    Probabilistische Aufwands- und Kostenschätzung per Monte-Carlo-Simulation.
+    
+    Jeder Parameter kann eine Verteilung sein; alle Stichproben werden in
+    einem vektorisierten Aufruf von estimate_effort_and_cost_array berechnet.
+    
+    Args:
+        total_code_lines: Gesamtanzahl der Code-Zeilen
+        team_size: Anzahl der Entwickler im Team
+        dev_monthly_salary: Monatsgehalt (fester Wert oder Verteilung, siehe _draw_samples)
+        uncertainty: Dict mit Verteilungen für 'productivity_factor', 'work_days_per_month',
+                     'productive_time_percentage' und 'efficiency_factor'; fehlende Einträge
+                     kommen aus DEFAULT_UNCERTAINTY
+        samples: Anzahl der Stichproben
+        seed: Startwert des Zufallsgenerators (für reproduzierbare Ergebnisse)
+    
+    Returns:
+        Dict mit den Stichproben 'effort_months' und 'total_cost' sowie den Perzentilen
+        'effort_percentiles' und 'cost_percentiles' (Dict Perzentil -> Wert, z.B. {10: ..., 50: ..., 90: ...})
+    """
+    parameters = dict(DEFAULT_UNCERTAINTY)
+    parameters.update(uncertainty or {})
+    rng = np.random.default_rng(seed)
+    
+    drawn = {name: _draw_samples(distribution, rng, samples) for name, distribution in parameters.items()}
+    effort_months, total_cost = estimate_effort_and_cost_array(
+        total_code_lines, team_size, _draw_samples(dev_monthly_salary, rng, samples), **drawn)
+    
+    return {
+        'effort_months': effort_months,
+        'total_cost': total_cost,
+        'effort_percentiles': dict(zip(MONTE_CARLO_PERCENTILES, np.percentile(effort_months, MONTE_CARLO_PERCENTILES))),
+        'cost_percentiles': dict(zip(MONTE_CARLO_PERCENTILES, np.percentile(total_cost, MONTE_CARLO_PERCENTILES))),
+    }
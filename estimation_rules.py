@@ -0,0 +1,53 @@
+from bisect import bisect_left, bisect_right
+
+# Produktivitätsraten basierend auf Projektgröße (Code-Zeilen pro Entwickler pro Tag):
+# unter 5.000 Zeilen 150, unter 50.000 Zeilen 100, darüber 80
+PROJECT_SIZE_THRESHOLDS = (5000, 50000)
+LINES_PER_DEV_PER_DAY = (150, 100, 80)
+
+# Teameffizienz-Faktor (größere Teams haben mehr Overhead):
+# bis 2 Entwickler 1.0, bis 5 Entwickler 0.9, darüber 0.8
+TEAM_SIZE_THRESHOLDS = (2, 5)
+TEAM_EFFICIENCY_FACTORS = (1.0, 0.9, 0.8)
+
+# Arbeitstage pro Monat
+WORK_DAYS_PER_MONTH = 21
+
+# Produktive Zeit pro Tag (in Prozent) - berücksichtigt Meetings, Planung, etc.
+PRODUCTIVE_TIME_PERCENTAGE = 0.7
+
+def estimate_effort_and_cost_scalar(total_code_lines, team_size, dev_monthly_salary):
+    """
+    Aufwands- und Kostenschätzung für einzelne Werte ohne NumPy.
+    
+    Rechnet in derselben Reihenfolge wie estimation.estimate_effort_and_cost_array
+    und liefert damit bitgleiche Ergebnisse; für die Kommandozeile, deren
+    Startzeit der NumPy-Import sonst vervielfachen würde. Beide Varianten
+    lesen die Stufen aus den Tabellen oben; dass die Formeln übereinstimmen,
+    prüft tests/test_estimation.py.
+    
+    Args:
+        total_code_lines: Gesamtanzahl der Code-Zeilen
+        team_size: Anzahl der Entwickler im Team
+        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+    
+    Returns:
+        Tuple mit (effort_months, total_cost)
+    """
+    total_code_lines = float(total_code_lines)
+    team_size = float(team_size)
+    
+    # Stufe 0 unter 5.000 Zeilen, 1 unter 50.000 Zeilen, sonst 2
+    lines_per_dev_per_day = LINES_PER_DEV_PER_DAY[bisect_right(PROJECT_SIZE_THRESHOLDS, total_code_lines)] * 1.0
+    lines_per_dev_per_month = lines_per_dev_per_day * WORK_DAYS_PER_MONTH * PRODUCTIVE_TIME_PERCENTAGE
+    
+    # Gesamte Personenmonate, verteilt auf das Team
+    calendar_months = total_code_lines / lines_per_dev_per_month / team_size
+    
+    # Stufe 0 bis 2 Entwickler, 1 bis 5 Entwickler, sonst 2
+    calendar_months = calendar_months / (TEAM_EFFICIENCY_FACTORS[bisect_left(TEAM_SIZE_THRESHOLDS, team_size)] * 1.0)
+    
+    # Gesamtkosten (Teamgröße * Monate * Monatsgehalt)
+    total_cost = team_size * calendar_months * float(dev_monthly_salary)
+    
+    return calendar_months, total_cost
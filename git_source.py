@@ -0,0 +1,160 @@
+import os
+import subprocess
+
+# Dateimodi regulärer Dateien im Git-Baum (Symlinks und Submodule werden übersprungen)
+_REGULAR_FILE_MODES = ('100644', '100755')
+
+class GitRepository:
+    """
+    Lesezugriff auf die Objektdatenbank eines lokalen Git-Repositorys.
+    
+    Dateiinhalte werden über einen einzigen, langlebigen
+    `git cat-file --batch`-Prozess gelesen, ohne eine Revision auszuchecken.
+    Zählergebnisse pro Blob werden in blob_counts zwischengespeichert, damit
+    unveränderte Dateien über mehrere Revisionen hinweg nur einmal gezählt werden.
+    """
+    
+    def __init__(self, repo_path):
+        """
+        Args:
+            repo_path: Pfad zum Arbeitsverzeichnis oder Bare-Repository
+        
+        Raises:
+            ValueError: Wenn der Pfad kein Git-Repository ist
+        """
+        self.repo_path = os.path.abspath(repo_path)
+        # (Blob-SHA, Dateiendung bzw. Name ohne Endung) -> (Sprache, (total_lines, empty_lines, code_lines))
+        self.blob_counts = {}
+        self._batch = None
+        
+        try:
+            self._git('rev-parse', '--git-dir')
+        except (OSError, subprocess.CalledProcessError):
+            raise ValueError(f"Kein Git-Repository: {repo_path}")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Beendet den cat-file-Prozess."""
+        if self._batch is not None:
+            self._batch.stdin.close()
+            self._batch.wait()
+            self._batch.stdout.close()
+            self._batch = None
+    
+    def _git(self, *args):
+        """Führt einen Git-Befehl im Repository aus und gibt die Ausgabe als Bytes zurück."""
+        return subprocess.run(['git', '-C', self.repo_path] + list(args),
+                              check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+    
+    def resolve(self, revision):
+        """
+        Löst eine Revision (Branch, Tag, SHA, ...) zur Commit-SHA auf.
+        
+        Raises:
+            ValueError: Wenn die Revision nicht existiert
+        """
+        try:
+            return self._git('rev-parse', '--verify', '--quiet', f'{revision}^{{commit}}').decode('ascii').strip()
+        except subprocess.CalledProcessError:
+            raise ValueError(f"Unbekannte Revision: {revision}")
+    
+    def iter_tree(self, revision):
+        """
+        Liefert alle regulären Dateien im Baum einer Revision.
+        
+        Returns:
+            Iterator über Tupel (Pfad relativ zur Wurzel mit '/', Blob-SHA)
+        """
+        output = self._git('ls-tree', '-r', '-z', '--full-tree', self.resolve(revision))
+        for entry in output.split(b'\0'):
+            if not entry:
+                continue
+            info, path = entry.split(b'\t', 1)
+            mode, object_type, sha = info.decode('ascii').split(' ')
+            if object_type == 'blob' and mode in _REGULAR_FILE_MODES:
+                yield os.fsdecode(path), sha
+    
+    def list_commits(self, revision='HEAD', every=1):
+        """
+        Liefert jeden N-ten Commit der First-Parent-Historie, vom ältesten zum neuesten.
+        
+        Der neueste Commit ist immer enthalten.
+        
+        Args:
+            revision: Branch, Tag oder Commit-SHA, dessen Historie gelesen wird
+            every: Abstand zwischen zwei ausgewählten Commits
+            
+        Returns:
+            Liste von Tupeln (Commit-SHA, Unix-Zeitstempel, Bezeichnung)
+        """
+        output = self._git('log', '--first-parent', '--reverse', '--format=%H %ct', self.resolve(revision))
+        commits = [line.split() for line in output.decode('ascii').splitlines()]
+        selected = commits[::-1][::max(1, every)][::-1]
+        return [(sha, int(timestamp), sha[:10]) for sha, timestamp in selected]
+    
+    def list_tags(self):
+        """
+        Liefert alle Tags, die auf Commits zeigen, nach Erstellungsdatum sortiert.
+        
+        Returns:
+            Liste von Tupeln (Commit-SHA, Unix-Zeitstempel, Tag-Name)
+        """
+        output = self._git('for-each-ref', '--sort=creatordate', '--format=%(objecttype) %(objectname) '
+                           '%(*objecttype) %(*objectname) %(creatordate:unix) %(refname:short)', 'refs/tags')
+        tags = []
+        for line in output.decode('utf-8').splitlines():
+            object_type, sha, peeled_type, peeled_sha, timestamp, name = line.split(' ', 5)
+            # Annotierte Tags: Commit ist das dereferenzierte Objekt
+            if peeled_type:
+                object_type, sha = peeled_type, peeled_sha
+            if object_type == 'commit':
+                tags.append((sha, int(timestamp), name))
+        return tags
+    
+    def diff_tree(self, old_revision, new_revision):
+        """
+        Liefert die geänderten Dateien zwischen zwei Revisionen (ohne Umbenennungserkennung).
+        
+        Returns:
+            Liste von Tupeln (Pfad, alte Blob-SHA oder None, neue Blob-SHA oder None);
+            None steht für "keine reguläre Datei"
+        """
+        output = self._git('diff-tree', '-r', '-z', '--no-renames', old_revision, new_revision)
+        fields = output.split(b'\0')
+        changes = []
+        # Abwechselnd ":altmodus neumodus altsha neusha status" und Pfad
+        for info, path in zip(fields[0::2], fields[1::2]):
+            old_mode, new_mode, old_sha, new_sha, _ = info.decode('ascii').lstrip(':').split(' ')
+            changes.append((os.fsdecode(path),
+                            old_sha if old_mode in _REGULAR_FILE_MODES else None,
+                            new_sha if new_mode in _REGULAR_FILE_MODES else None))
+        return changes
+    
+    def read_blob(self, sha):
+        """
+        Liest den Inhalt eines Blobs über den cat-file-Prozess.
+        
+        Raises:
+            KeyError: Wenn das Objekt nicht existiert
+        """
+        if self._batch is None:
+            self._batch = subprocess.Popen(['git', '-C', self.repo_path, 'cat-file', '--batch'],
+                                           stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        
+        self._batch.stdin.write(sha.encode('ascii') + b'\n')
+        self._batch.stdin.flush()
+        
+        # Kopfzeile: "<sha> <typ> <größe>" oder "<sha> missing"
+        header = self._batch.stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(sha)
+        size = int(header[2])
+        data = self._batch.stdout.read(size)
+        # Abschließenden Zeilenumbruch überspringen
+        self._batch.stdout.read(1)
+        return data
@@ -0,0 +1,363 @@
+import os
+import heapq
+from collections import deque
+from code_counter import (DEFAULT_EXCLUDE_DIRS, DEFAULT_OVERSIZE_POLICY, PROGRESS_INTERVAL, ScanCancelled,
+                          estimate_effort_and_cost, _ScanCollector, _collect_code_files, _count_file_batch,
+                          _init_scan_worker, _lookup_cached_files, _make_balanced_batches, _make_estimate,
+                          _normalize_workers, _scan_directory_results, _store_counted_files)
+
+# Zielgröße der Stapel im Portfolio-Scan (Bytes bzw. Dateien); kleine Stapel verteilen große
+# Repositorys auf alle Worker, damit sie am Ende nicht als Nachzügler allein weiterlaufen
+PORTFOLIO_BATCH_BYTES = 8 * 1024 * 1024
+PORTFOLIO_BATCH_FILES = 512
+
+# Aufträge pro Worker, die der Portfolio-Scan gleichzeitig im Prozess-Pool hält
+PORTFOLIO_TASKS_PER_WORKER = 2
+
+# Anzahl der Repositorys mit den höchsten Kosten in der Portfolio-Zusammenfassung
+PORTFOLIO_TOP_REPOSITORIES = 10
+
+def read_portfolio_manifest(manifest_path):
+    """
+    Liest die Verzeichnisse eines Portfolios aus einer Manifest-Datei.
+    
+    Die Datei enthält ein Verzeichnis pro Zeile; Leerzeilen und Zeilen, die
+    mit '#' beginnen, werden ignoriert. Relative Pfade gelten relativ zum
+    Verzeichnis der Manifest-Datei.
+    
+    Args:
+        manifest_path: Pfad zur Manifest-Datei
+    
+    Returns:
+        Liste der Verzeichnispfade
+    """
+    base_path = os.path.dirname(os.path.abspath(manifest_path))
+    roots = []
+    with open(manifest_path, encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                roots.append(os.path.join(base_path, os.path.expanduser(line)))
+    return roots
+
+class _PortfolioRepository:
+    """Stand eines Repositorys im parallelen Portfolio-Scan."""
+    
+    def __init__(self, source):
+        self.source = source
+        self.collector = _ScanCollector()
+        # Stapel, die noch gezählt werden müssen (wartend oder im Pool); None = Durchlauf läuft noch
+        self.open_batches = None
+        self.error = None
+        # Neu gezählte Dateien und ihre Ergebnisse für den Scan-Cache
+        self.counted_files = []
+        self.counted_results = []
+    
+    @property
+    def finished(self):
+        return self.open_batches == 0
+
+def _make_portfolio_batches(files_to_count):
+    """Teilt die Dateien eines Repositorys in Stapel von etwa PORTFOLIO_BATCH_BYTES bzw. PORTFOLIO_BATCH_FILES."""
+    if not files_to_count:
+        return []
+    total_size = sum(entry[3] + 1 for entry in files_to_count)
+    batch_count = max(-(-total_size // PORTFOLIO_BATCH_BYTES), -(-len(files_to_count) // PORTFOLIO_BATCH_FILES))
+    return _make_balanced_batches(files_to_count, batch_count)
+
+def _iter_portfolio_parallel(roots, exclude_dirs, workers, cache, dedupe, oversize_policy, use_gitignore, cancel):
+    """
+    Scannt die Verzeichnisse eines Portfolios mit einem gemeinsamen Prozess-Pool.
+    
+    Durchlauf und Zählen aller Repositorys laufen als Aufträge im selben
+    Pool. Jedes Repository wird nach seinem Durchlauf in kleine, nach
+    Dateigröße ausgeglichene Stapel geteilt; alle Stapel stehen in einer
+    gemeinsamen Warteschlange, aus der sich jeder freie Worker den nächsten
+    nimmt, egal zu welchem Repository er gehört. So bleiben bei kleinen
+    Repositorys keine Kerne ungenutzt, und große werden von allen Workern
+    gemeinsam abgearbeitet. Der Pool hält höchstens
+    workers * PORTFOLIO_TASKS_PER_WORKER Aufträge; solange die Warteschlange
+    kurz ist, läuft bereits der Durchlauf des nächsten Repositorys.
+    
+    Returns:
+        Iterator über _PortfolioRepository in der Reihenfolge, in der die Repositorys fertig werden
+    """
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    import multiprocessing
+    
+    capacity = workers * PORTFOLIO_TASKS_PER_WORKER
+    roots = iter(roots)
+    next_root = next(roots, None)
+    # Gezählte, aber noch nicht übergebene Stapel: (Repository, Stapel)
+    ready_batches = deque()
+    # Future -> (Repository, Stapel); Stapel None = Durchlauf
+    futures = {}
+    walks_running = 0
+    finished = []
+    
+    cancel_event = multiprocessing.Event()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_scan_worker,
+                             initargs=(cancel_event,)) as executor:
+        try:
+            while True:
+                while len(futures) < capacity:
+                    if next_root is not None and (not ready_batches or
+                                                  (not walks_running and len(ready_batches) < capacity)):
+                        repository = _PortfolioRepository(next_root)
+                        next_root = next(roots, None)
+                        if not os.path.isdir(repository.source):
+                            repository.error = f"Verzeichnis nicht gefunden: {repository.source}"
+                            repository.open_batches = 0
+                            finished.append(repository)
+                            continue
+                        future = executor.submit(_collect_code_files, repository.source, exclude_dirs, use_gitignore)
+                        futures[future] = (repository, None)
+                        walks_running += 1
+                    elif ready_batches:
+                        repository, batch = ready_batches.popleft()
+                        future = executor.submit(_count_file_batch, batch, repository.source,
+                                                 {} if dedupe else None, oversize_policy)
+                        futures[future] = (repository, batch)
+                    else:
+                        break
+                
+                yield from finished
+                finished.clear()
+                if not futures:
+                    break
+                
+                done, _ = wait(futures, timeout=PROGRESS_INTERVAL if cancel is not None else None,
+                               return_when=FIRST_COMPLETED)
+                if cancel is not None and cancel.is_set():
+                    raise ScanCancelled("Scan abgebrochen")
+                for future in done:
+                    repository, batch = futures.pop(future)
+                    if batch is None:
+                        walks_running -= 1
+                        try:
+                            files_to_count = future.result()
+                        except Exception as e:
+                            repository.error = str(e)
+                            repository.open_batches = 0
+                        else:
+                            batches = _plan_portfolio_repository(repository, files_to_count, cache, dedupe,
+                                                                 oversize_policy)
+                            repository.open_batches = len(batches)
+                            ready_batches.extend((repository, batch) for batch in batches)
+                    else:
+                        repository.open_batches -= 1
+                        if repository.error is None:
+                            try:
+                                results = future.result()
+                            except Exception as e:
+                                # Wartende Stapel des Repositorys verwerfen; laufende werden nicht mehr ausgewertet
+                                repository.error = str(e)
+                                remaining = len(ready_batches)
+                                ready_batches = deque(item for item in ready_batches if item[0] is not repository)
+                                repository.open_batches -= remaining - len(ready_batches)
+                            else:
+                                for index, result in results:
+                                    repository.collector.add(index, result)
+                                if cache is not None:
+                                    repository.counted_files.extend(batch)
+                                    repository.counted_results.extend(results)
+                    if repository.finished:
+                        finished.append(repository)
+        finally:
+            # Vorzeitiges Ende (Abbruch, Fehler): offene Aufträge verwerfen, laufende Worker anhalten
+            if futures:
+                cancel_event.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+def _plan_portfolio_repository(repository, files_to_count, cache, dedupe, oversize_policy):
+    """Übernimmt unveränderte Dateien aus dem Cache und gibt die Stapel der übrigen zurück."""
+    if cache is None:
+        return _make_portfolio_batches(files_to_count)
+    cached_results = _lookup_cached_files(cache, files_to_count, repository.source, dedupe, oversize_policy)
+    for index, result in cached_results.items():
+        if result is not None:
+            repository.collector.add(index, result)
+    return _make_portfolio_batches([entry for entry in files_to_count if entry[0] not in cached_results])
+
+def _unique_roots(roots):
+    """Liefert jedes Verzeichnis nur beim ersten Vorkommen (verglichen als absoluter Pfad)."""
+    seen = set()
+    for source in roots:
+        key = os.path.abspath(source)
+        if key not in seen:
+            seen.add(key)
+            yield source
+
+def iter_portfolio_counts(roots, exclude_dirs=None, workers=None, cache=None, dedupe=False, oversize_policy=None,
+                          use_gitignore=True, team_size=3, dev_monthly_salary=8000, cancel=None):
+    """
+    Scannt viele Verzeichnisse (z.B. alle Checkouts eines Portfolios) und liefert jedes, sobald es fertig ist.
+    
+    Mit mehreren Workern teilen sich alle Verzeichnisse einen Prozess-Pool
+    (siehe _iter_portfolio_parallel); die Berichte kommen dann in der
+    Reihenfolge, in der die Verzeichnisse fertig werden. Seriell werden die
+    Verzeichnisse nacheinander wie mit count_lines_in_directory gescannt.
+    Ein fehlgeschlagenes Verzeichnis beendet den Scan der übrigen nicht;
+    mehrfach angegebene Verzeichnisse werden nur einmal gescannt.
+    
+    Args:
+        roots: Verzeichnispfade (z.B. aus read_portfolio_manifest)
+        exclude_dirs: Liste von Verzeichnisnamen, die ausgeschlossen werden sollen
+        workers: Anzahl der Worker-Prozesse (1 = seriell, None oder 0 = alle CPU-Kerne)
+        cache: ScanCache, aus dem unveränderte Dateien übernommen werden (None = ohne Cache)
+        dedupe: Gleiche Dateiinhalte innerhalb eines Verzeichnisses nur einmal zählen
+        oversize_policy: OversizePolicy für übergroße Dateien (Standard: vollständig zählen)
+        use_gitignore: Per .gitignore ignorierte Dateien und Verzeichnisse überspringen
+        team_size: Anzahl der Entwickler im Team für die Schätzung
+        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+        cancel: Abbruch-Signal mit is_set(), z.B. threading.Event (optional)
+    
+    Returns:
+        Iterator über Berichte pro Verzeichnis: Dicts mit 'source', 'stats' (wie bei
+        count_lines_in_directory) und 'estimate' (Dict mit 'team_size', 'dev_monthly_salary',
+        'effort_months' und 'total_cost'), bei einem Fehler nur 'source' und 'error'
+    
+    Raises:
+        ScanCancelled: Wenn cancel gesetzt wird
+    """
+    if exclude_dirs is None:
+        exclude_dirs = list(DEFAULT_EXCLUDE_DIRS)
+    oversize_policy = oversize_policy or DEFAULT_OVERSIZE_POLICY
+    workers = _normalize_workers(workers)
+    roots = _unique_roots(roots)
+    
+    if workers <= 1:
+        for source in roots:
+            if not os.path.isdir(source):
+                yield {'source': source, 'error': f"Verzeichnis nicht gefunden: {source}"}
+                continue
+            try:
+                _, stats = _scan_directory_results(source, exclude_dirs, 1, cache, dedupe, oversize_policy,
+                                                   use_gitignore, cancel=cancel)
+            except ScanCancelled:
+                raise
+            except Exception as e:
+                yield {'source': source, 'error': str(e)}
+                continue
+            yield {'source': source, 'stats': stats,
+                   'estimate': _make_estimate(stats, team_size, dev_monthly_salary)}
+        return
+    
+    for repository in _iter_portfolio_parallel(roots, exclude_dirs, workers, cache, dedupe, oversize_policy,
+                                               use_gitignore, cancel):
+        if repository.error is not None:
+            yield {'source': repository.source, 'error': repository.error}
+            continue
+        _, stats = repository.collector.finish(dedupe)
+        if cache is not None and repository.counted_files:
+            _store_counted_files(cache, repository.counted_files, repository.counted_results, oversize_policy)
+        yield {'source': repository.source, 'stats': stats,
+               'estimate': _make_estimate(stats, team_size, dev_monthly_salary)}
+
+class PortfolioTotals:
+    """
+    Zusammenfassung eines Portfolios aus den Berichten von iter_portfolio_counts.
+    
+    Aufwand und Kosten werden zweimal angegeben: als Summe der Schätzungen
+    pro Repository und als Schätzung aller Code-Zeilen als eine Codebasis.
+    Da die Produktivität mit der Projektgröße sinkt, liegt die gemeinsame
+    Schätzung über der Summe.
+    """
+    
+    def __init__(self, team_size=3, dev_monthly_salary=8000):
+        self.team_size = team_size
+        self.dev_monthly_salary = dev_monthly_salary
+        self.repositories = 0
+        self.failed = []
+        self.total_files = 0
+        self.total_lines = 0
+        self.total_empty_lines = 0
+        self.total_code_lines = 0
+        self.estimate_lines = 0
+        self.effort_months = 0.0
+        self.total_cost = 0.0
+        self.lines_by_extension = {}
+        # Kleinster Eintrag vorne: (Kosten, Position, Repository-Eintrag)
+        self._largest = []
+    
+    def add(self, report):
+        """Addiert den Bericht eines Repositorys."""
+        if 'error' in report:
+            self.failed.append({'source': report['source'], 'error': report['error']})
+            return
+        stats = report['stats']
+        estimate = report['estimate']
+        self.repositories += 1
+        self.total_files += stats['total_files']
+        self.total_lines += stats['total_lines']
+        self.total_empty_lines += stats['total_empty_lines']
+        self.total_code_lines += stats['total_code_lines']
+        self.estimate_lines += stats.get('unique_code_lines', stats['total_code_lines'])
+        self.effort_months += estimate['effort_months']
+        self.total_cost += estimate['total_cost']
+        for ext_key, code_lines in stats['lines_by_extension'].items():
+            self.lines_by_extension[ext_key] = self.lines_by_extension.get(ext_key, 0) + code_lines
+        
+        entry = {
+            'source': report['source'],
+            'total_code_lines': stats['total_code_lines'],
+            'effort_months': estimate['effort_months'],
+            'total_cost': estimate['total_cost'],
+        }
+        item = (estimate['total_cost'], self.repositories, entry)
+        if len(self._largest) < PORTFOLIO_TOP_REPOSITORIES:
+            heapq.heappush(self._largest, item)
+        else:
+            heapq.heappushpop(self._largest, item)
+    
+    def as_summary(self):
+        """
+        Gibt die Zusammenfassung als Dict zurück.
+        
+        Returns:
+            Dict mit 'repositories', 'failed_repositories', den Summen 'total_files',
+            'total_lines', 'total_empty_lines', 'total_code_lines' und 'estimate_lines',
+            'lines_by_extension', 'effort_months' und 'total_cost' (Summe pro Repository),
+            'combined_effort_months' und 'combined_total_cost' (eine Codebasis) sowie
+            'largest_repositories' (die teuersten PORTFOLIO_TOP_REPOSITORIES Repositorys)
+        """
+        combined_effort_months, combined_total_cost = estimate_effort_and_cost(self.estimate_lines, self.team_size,
+                                                                               self.dev_monthly_salary)
+        return {
+            'repositories': self.repositories,
+            'failed_repositories': list(self.failed),
+            'total_files': self.total_files,
+            'total_lines': self.total_lines,
+            'total_empty_lines': self.total_empty_lines,
+            'total_code_lines': self.total_code_lines,
+            'estimate_lines': self.estimate_lines,
+            'lines_by_extension': dict(self.lines_by_extension),
+            'team_size': self.team_size,
+            'dev_monthly_salary': self.dev_monthly_salary,
+            'effort_months': self.effort_months,
+            'total_cost': self.total_cost,
+            'combined_effort_months': combined_effort_months,
+            'combined_total_cost': combined_total_cost,
+            'largest_repositories': [entry for _, _, entry in sorted(self._largest, reverse=True)],
+        }
+
+def count_lines_in_portfolio(roots, exclude_dirs=None, workers=None, cache=None, dedupe=False, oversize_policy=None,
+                             use_gitignore=True, team_size=3, dev_monthly_salary=8000, cancel=None):
+    """
+    Scannt alle Verzeichnisse eines Portfolios und fasst sie zusammen.
+    
+    Args:
+        Siehe iter_portfolio_counts
+    
+    Returns:
+        Tuple mit (Liste der Berichte pro Verzeichnis in der Reihenfolge von roots, ohne
+        mehrfach angegebene Verzeichnisse; Zusammenfassung aus PortfolioTotals.as_summary)
+    """
+    roots = list(_unique_roots(roots))
+    totals = PortfolioTotals(team_size, dev_monthly_salary)
+    reports = {}
+    for report in iter_portfolio_counts(roots, exclude_dirs, workers, cache, dedupe, oversize_policy, use_gitignore,
+                                        team_size, dev_monthly_salary, cancel):
+        totals.add(report)
+        reports[report['source']] = report
+    return [reports[source] for source in roots], totals.as_summary()
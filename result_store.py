@@ -0,0 +1,284 @@
+import os
+from array import array
+
+# Zählspalten; gespeichert als 64-Bit-Ganzzahlen, die pandas ohne Kopie übernimmt
+COUNT_FIELDS = ('total_lines', 'empty_lines', 'code_lines')
+
+# Typcodes der Kategorie-Codes in aufsteigender Breite mit der jeweils größten Anzahl an
+# Kategorien; entspricht der Breite, die pandas für Categorical-Codes wählt
+_CODE_TYPES = (('b', 2 ** 7 - 1), ('h', 2 ** 15 - 1), ('i', 2 ** 31 - 1))
+
+# Trenner, nach denen Pfade in Verzeichnis und Dateiname zerlegt werden
+_SEPARATORS = '/' + (os.sep if os.sep != '/' else '')
+
+class _CategoryColumn:
+    """Spalte mit wenigen verschiedenen Werten: Liste der Werte und ein Code pro Zeile."""
+    
+    def __init__(self):
+        self.values = []
+        self._codes_by_value = {}
+        self._code_type = 0
+        self.codes = array(_CODE_TYPES[0][0])
+    
+    def append(self, value):
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = self._codes_by_value[value] = len(self.values)
+            self.values.append(value)
+            if code > _CODE_TYPES[self._code_type][1]:
+                # Nächstbreiteren Typcode verwenden, sobald die Kategorien nicht mehr hineinpassen
+                self._code_type += 1
+                self.codes = array(_CODE_TYPES[self._code_type][0], self.codes)
+        self.codes.append(code)
+    
+    def reorder(self, order):
+        self.codes = array(self.codes.typecode, map(self.codes.__getitem__, order))
+    
+    def categorical(self):
+        """Gibt die Spalte als pandas.Categorical zurück; die Codes werden nicht kopiert."""
+        import numpy as np
+        import pandas as pd
+        codes = np.frombuffer(self.codes, dtype=np.dtype(self.codes.typecode))
+        return pd.Categorical.from_codes(codes, self.values)
+
+class ScanResultStore:
+    """
+    Spaltenweise Ablage der Ergebnisse eines Scans.
+    
+    Statt eines Dicts pro Datei hält der Speicher ein Typ-Array pro
+    Zählspalte, Kategorie-Codes für Sprache und Dateiendung sowie alle
+    Dateinamen UTF-8-kodiert in einem Puffer mit Offsets; das Verzeichnis
+    jedes Pfads wird nur einmal gespeichert und pro Datei über einen Code
+    referenziert. Pro Datei fallen so etwa 40 Bytes zuzüglich des
+    Dateinamens an.
+    
+    Iteriert liefert der Speicher wieder Ergebnis-Dicts (siehe
+    code_counter.iter_file_counts); to_dataframe übergibt die Spalten ohne
+    Kopie an pandas. Danach kann nichts mehr angehängt werden.
+    """
+    
+    def __init__(self):
+        # Verzeichnis-Präfixe inklusive abschließendem Trenner ('' = Wurzel) und ihre Codes
+        self._directories = []
+        self._directory_codes_by_prefix = {}
+        self._directory_codes = array('I')
+        self._names = bytearray()
+        self._name_offsets = array('q', [0])
+        # Dateinamen, die nicht als UTF-8 kodierbar sind (surrogateescape aus os.fsdecode)
+        self._undecodable_names = False
+        self._languages = _CategoryColumn()
+        self._extensions = _CategoryColumn()
+        self._counts = {field: array('q') for field in COUNT_FIELDS}
+        # Inhalts-Hashes (nur bei Deduplizierung) als Rohbytes fester Breite; Zeilen ohne Hash extra
+        self._content_hashes = None
+        self._content_hash_size = None
+        self._missing_content_hashes = set()
+        # Zeile -> Behandlung übergroßer Dateien (siehe code_counter.OversizePolicy)
+        self._oversize = {}
+        # Position jeder Datei in der Scan-Reihenfolge, für sort
+        self._scan_indices = array('q')
+        self._sorted = True
+    
+    def __len__(self):
+        return len(self._scan_indices)
+    
+    def append(self, result, scan_index=None):
+        """
+        Hängt das Ergebnis-Dict einer Datei an.
+        
+        Args:
+            result: Ergebnis-Dict mit den Schlüsseln aus code_counter.RESULT_FIELDS und
+                    optional 'content_hash' und 'oversize'
+            scan_index: Position der Datei in der Scan-Reihenfolge (Standard: Anzahl der Zeilen)
+        """
+        row = len(self._scan_indices)
+        if scan_index is None:
+            scan_index = self._scan_indices[-1] + 1 if row else 0
+        elif row and scan_index < self._scan_indices[-1]:
+            self._sorted = False
+        self._scan_indices.append(scan_index)
+        
+        file_path = result['file_path']
+        split = max(map(file_path.rfind, _SEPARATORS)) + 1
+        prefix = file_path[:split]
+        directory_code = self._directory_codes_by_prefix.get(prefix)
+        if directory_code is None:
+            directory_code = self._directory_codes_by_prefix[prefix] = len(self._directories)
+            self._directories.append(prefix)
+        self._directory_codes.append(directory_code)
+        try:
+            self._names += file_path[split:].encode('utf-8')
+        except UnicodeEncodeError:
+            self._names += file_path[split:].encode('utf-8', 'surrogateescape')
+            self._undecodable_names = True
+        self._name_offsets.append(len(self._names))
+        
+        self._languages.append(result['language'])
+        self._extensions.append(result['extension'])
+        for field in COUNT_FIELDS:
+            self._counts[field].append(result[field])
+        
+        if 'content_hash' in result or self._content_hashes is not None:
+            self._append_content_hash(row, result.get('content_hash'))
+        handling = result.get('oversize')
+        if handling is not None:
+            self._oversize[row] = handling
+    
+    def _append_content_hash(self, row, content_hash):
+        if self._content_hashes is None:
+            self._content_hashes = bytearray()
+            # Frühere Zeilen hatten keinen Hash
+            self._missing_content_hashes.update(range(row))
+        if content_hash is None:
+            self._missing_content_hashes.add(row)
+            digest = b''
+        else:
+            digest = bytes.fromhex(content_hash)
+            if self._content_hash_size is None:
+                self._content_hash_size = len(digest)
+                # Platzhalter der Zeilen ohne Hash auf die feste Breite bringen
+                self._content_hashes += bytes(len(self._missing_content_hashes) * len(digest))
+            elif len(digest) != self._content_hash_size:
+                raise ValueError(f"Inhalts-Hash mit {len(digest)} statt {self._content_hash_size} Bytes")
+        if self._content_hash_size is not None:
+            self._content_hashes += digest or bytes(self._content_hash_size)
+    
+    def sort(self):
+        """
+        Bringt die Zeilen in Scan-Reihenfolge, z.B. nach parallelen Workern.
+        
+        Returns:
+            True, wenn die Zeilen umsortiert wurden
+        """
+        if self._sorted:
+            return False
+        order = sorted(range(len(self)), key=self._scan_indices.__getitem__)
+        
+        def reordered(column):
+            return array(column.typecode, map(column.__getitem__, order))
+        
+        self._scan_indices = reordered(self._scan_indices)
+        self._directory_codes = reordered(self._directory_codes)
+        self._languages.reorder(order)
+        self._extensions.reorder(order)
+        for field in COUNT_FIELDS:
+            self._counts[field] = reordered(self._counts[field])
+        
+        names = bytearray()
+        offsets = self._name_offsets
+        name_offsets = array('q', [0])
+        for row in order:
+            names += self._names[offsets[row]:offsets[row + 1]]
+            name_offsets.append(len(names))
+        self._names = names
+        self._name_offsets = name_offsets
+        
+        new_rows = {row: new_row for new_row, row in enumerate(order)}
+        if self._content_hashes is not None and self._content_hash_size is not None:
+            size = self._content_hash_size
+            self._content_hashes = bytearray().join(self._content_hashes[row * size:(row + 1) * size]
+                                                    for row in order)
+        self._missing_content_hashes = {new_rows[row] for row in self._missing_content_hashes}
+        self._oversize = {new_rows[row]: handling for row, handling in self._oversize.items()}
+        self._sorted = True
+        return True
+    
+    def _name(self, row):
+        return self._names[self._name_offsets[row]:self._name_offsets[row + 1]].decode('utf-8', 'surrogateescape')
+    
+    def _content_hash(self, row):
+        if row in self._missing_content_hashes or self._content_hash_size is None:
+            return None
+        size = self._content_hash_size
+        return self._content_hashes[row * size:(row + 1) * size].hex()
+    
+    def __iter__(self):
+        """Liefert die Ergebnis-Dicts in der Reihenfolge der Zeilen."""
+        directories = self._directories
+        languages = self._languages.values
+        extensions = self._extensions.values
+        total_lines, empty_lines, code_lines = (self._counts[field] for field in COUNT_FIELDS)
+        for row, (directory_code, language_code, extension_code) in enumerate(
+                zip(self._directory_codes, self._languages.codes, self._extensions.codes)):
+            result = {
+                'file_path': directories[directory_code] + self._name(row),
+                'language': languages[language_code],
+                'extension': extensions[extension_code],
+                'total_lines': total_lines[row],
+                'empty_lines': empty_lines[row],
+                'code_lines': code_lines[row],
+            }
+            if self._content_hashes is not None:
+                result['content_hash'] = self._content_hash(row)
+            handling = self._oversize.get(row)
+            if handling is not None:
+                result['oversize'] = handling
+            yield result
+    
+    def iter_indexed(self):
+        """Liefert Tupel (Position in der Scan-Reihenfolge, Ergebnis-Dict) in der Reihenfolge der Zeilen."""
+        return zip(self._scan_indices, self)
+    
+    def _file_path_column(self):
+        """
+        Pfadspalte für pandas: mit pyarrow als Arrow-String-Spalte, die Verzeichnis und Namen
+        in einem Puffer zusammensetzt, sonst als Python-Strings.
+        """
+        import numpy as np
+        import pandas as pd
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+        except ImportError:
+            # Optional; ohne pyarrow entsteht ein String-Objekt pro Pfad
+            pa = None
+        
+        rows = len(self)
+        if pa is not None and not self._undecodable_names:
+            names = pa.LargeStringArray.from_buffers(rows, pa.py_buffer(self._name_offsets), pa.py_buffer(self._names))
+            directory_codes = pa.Array.from_buffers(pa.uint32(), rows, [None, pa.py_buffer(self._directory_codes)])
+            directories = pa.array(self._directories, pa.large_string()).take(directory_codes)
+            return pd.arrays.ArrowStringArray(pc.binary_join_element_wise(directories, names, pa.scalar('', pa.large_string())))
+        
+        directories = self._directories
+        offsets = self._name_offsets
+        if self._names.isascii():
+            # Byte- und Zeichen-Offsets stimmen überein: einmal dekodieren, dann nur schneiden
+            text = self._names.decode('ascii')
+            paths = (directories[directory_code] + text[offsets[row]:offsets[row + 1]]
+                     for row, directory_code in enumerate(self._directory_codes))
+        else:
+            paths = (directories[directory_code] + self._name(row)
+                     for row, directory_code in enumerate(self._directory_codes))
+        return np.fromiter(paths, dtype=object, count=rows)
+    
+    def to_dataframe(self):
+        """
+        Gibt die Ergebnisse als pandas DataFrame zurück (Spalten wie code_counter.RESULT_FIELDS).
+        
+        Die Zählspalten und Kategorie-Codes teilen sich den Speicher mit diesem
+        Objekt; 'language' und 'extension' sind kategorisch. Mit Deduplizierung
+        gibt es zusätzlich 'content_hash', bei übergroßen Dateien 'oversize'.
+        
+        Returns:
+            DataFrame mit einer Zeile pro Datei
+        """
+        import numpy as np
+        import pandas as pd
+        
+        columns = {
+            'file_path': self._file_path_column(),
+            'language': self._languages.categorical(),
+            'extension': self._extensions.categorical(),
+        }
+        for field in COUNT_FIELDS:
+            columns[field] = np.frombuffer(self._counts[field], dtype=np.int64)
+        if self._content_hashes is not None:
+            columns['content_hash'] = np.fromiter(map(self._content_hash, range(len(self))), dtype=object,
+                                                  count=len(self))
+        if self._oversize:
+            oversize = np.full(len(self), np.nan, dtype=object)
+            for row, handling in self._oversize.items():
+                oversize[row] = handling
+            columns['oversize'] = oversize
+        return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,157 @@
+import os
+import time
+import sqlite3
+
+# Maximale Anzahl gespeicherter Dateien, bevor die am längsten nicht mehr
+# verwendeten Einträge entfernt werden
+DEFAULT_MAX_ENTRIES = 500000
+
+# Version des Tabellenschemas; ältere Cache-Datenbanken werden neu angelegt
+_SCHEMA_VERSION = 3
+
+def default_cache_path():
+    """
+    Gibt den Standardpfad der Cache-Datenbank zurück.
+    
+    Verwendet CODE_COUNTER_CACHE_DIR, sonst XDG_CACHE_HOME bzw. ~/.cache.
+    """
+    cache_dir = os.environ.get('CODE_COUNTER_CACHE_DIR')
+    if not cache_dir:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(cache_home, 'code_counter')
+    return os.path.join(cache_dir, 'scan_cache.sqlite3')
+
+class ScanCache:
+    """
+    Persistenter Cache der Zeilenzahlen pro Datei in einer SQLite-Datenbank.
+    
+    Ein Eintrag gilt nur, solange Pfad, Größe, Änderungszeit und Inode der
+    Datei sowie die Version der Zählregeln übereinstimmen. Einträge gelöschter
+    Dateien werden beim nächsten Scan ihres Verzeichnisses entfernt; wird
+    max_entries überschritten, fallen die am längsten ungenutzten heraus.
+    """
+    
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            path: Pfad der Datenbank (Standard: default_cache_path())
+            max_entries: Maximale Anzahl gespeicherter Dateien
+        """
+        self.path = path or default_cache_path()
+        self.max_entries = max_entries
+        
+        cache_dir = os.path.dirname(self.path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        self._connection = sqlite3.connect(self.path)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        with self._connection:
+            if self._connection.execute('PRAGMA user_version').fetchone()[0] != _SCHEMA_VERSION:
+                # Der Inhalt ist nur ein Cache und kann verworfen werden
+                self._connection.execute('DROP TABLE IF EXISTS files')
+                self._connection.execute(f'PRAGMA user_version = {_SCHEMA_VERSION}')
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER NOT NULL,
+                    rules_version TEXT NOT NULL,
+                    total_lines INTEGER NOT NULL,
+                    empty_lines INTEGER NOT NULL,
+                    code_lines INTEGER NOT NULL,
+                    language TEXT NOT NULL,
+                    content_hash TEXT,
+                    oversize TEXT,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._connection.execute('CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used)')
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Schließt die Datenbankverbindung."""
+        self._connection.close()
+    
+    def __len__(self):
+        return self._connection.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+    
+    def lookup(self, directory_path, entries, rules_version):
+        """
+        Sucht die gespeicherten Zeilenzahlen der Dateien eines Verzeichnisses.
+        
+        Alle Einträge unterhalb des Verzeichnisses werden mit einer Abfrage
+        gelesen. Einträge von Dateien, die es dort nicht mehr gibt, sowie
+        Einträge des Verzeichnisses mit anderer Regelversion werden dabei
+        entfernt; andere Verzeichnisse bleiben unberührt.
+        
+        Args:
+            directory_path: Gescanntes Verzeichnis
+            entries: Liste von Tupeln (file_path, size, mtime_ns, inode) aller gefundenen Dateien
+            rules_version: Version der Zählregeln
+        
+        Returns:
+            Dict file_path -> (total_lines, empty_lines, code_lines, language, content_hash, oversize) der
+            unveränderten Dateien; content_hash ist None, wenn er nicht berechnet wurde, oversize
+            ist die Behandlung als übergroße Datei oder None
+        """
+        prefix = os.path.join(os.path.abspath(directory_path), '')
+        # Alle Pfade mit diesem Präfix liegen im Bereich [prefix, upper)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        
+        rows = self._connection.execute(
+            'SELECT path, size, mtime_ns, inode, rules_version, total_lines, empty_lines, code_lines, language, '
+            'content_hash, oversize FROM files WHERE path >= ? AND path < ?', (prefix, upper)).fetchall()
+        cached = {row[0]: row for row in rows}
+        
+        hits = {}
+        for file_path, size, mtime_ns, inode in entries:
+            row = cached.pop(os.path.abspath(file_path), None)
+            if row is not None and row[1:5] == (size, mtime_ns, inode, rules_version):
+                hits[file_path] = row[5:]
+        
+        # Nicht mehr vorhandene Dateien bzw. geänderte Regeln
+        stale = list(cached)
+        with self._connection:
+            self._connection.execute(
+                'UPDATE files SET last_used = ? WHERE path >= ? AND path < ?', (time.time(), prefix, upper))
+            self._connection.executemany('DELETE FROM files WHERE path = ?', ((path,) for path in stale))
+            # Nur unterhalb des Verzeichnisses: andere Verzeichnisse können mit anderen Regeln
+            # (z.B. einer anderen OversizePolicy) gescannt worden sein
+            self._connection.execute('DELETE FROM files WHERE path >= ? AND path < ? AND rules_version != ?',
+                                     (prefix, upper, rules_version))
+        
+        return hits
+    
+    def store(self, rows, rules_version):
+        """
+        Speichert die Zeilenzahlen neu gezählter Dateien.
+        
+        Args:
+            rows: Liste von Tupeln (file_path, size, mtime_ns, inode, total_lines, empty_lines, code_lines,
+                  language, content_hash, oversize)
+            rules_version: Version der Zählregeln
+        """
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((os.path.abspath(file_path), size, mtime_ns, inode, rules_version,
+                  total_lines, empty_lines, code_lines, language, content_hash, oversize, now)
+                 for file_path, size, mtime_ns, inode, total_lines, empty_lines, code_lines, language, content_hash,
+                 oversize in rows))
+            self._evict()
+    
+    def _evict(self):
+        """Entfernt die am längsten ungenutzten Einträge oberhalb von max_entries."""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._connection.execute(
+                'DELETE FROM files WHERE path IN (SELECT path FROM files ORDER BY last_used LIMIT ?)', (excess,))
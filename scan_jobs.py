@@ -0,0 +1,274 @@
+import time
+import itertools
+import threading
+from collections import OrderedDict, deque
+
+# Anzahl gleichzeitig laufender Scans; weitere Aufträge warten in der Warteschlange
+DEFAULT_MAX_RUNNING = 2
+
+# Höchstzahl wartender Aufträge insgesamt und pro Benutzer (Zulassungskontrolle)
+DEFAULT_MAX_QUEUED = 32
+DEFAULT_MAX_QUEUED_PER_USER = 2
+
+# Anzahl fertiger Ergebnisse im gemeinsamen Ergebnisspeicher
+DEFAULT_MAX_RESULTS = 16
+
+# Sekunden, die fehlgeschlagene und abgebrochene Aufträge abrufbar bleiben
+FINISHED_JOB_RETENTION = 600
+
+# Zustände eines Auftrags; die letzten drei sind endgültig
+JOB_STATES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+class JobRejected(Exception):
+    """Die Zulassungskontrolle hat einen Auftrag abgelehnt, weil die Warteschlange voll ist."""
+
+class ScanJob:
+    """
+    Ein Auftrag des ScanScheduler.
+    
+    Die Attribute werden nur vom Scheduler geschrieben; Sitzungen lesen
+    state, progress, result und error, während sie auf das Ergebnis warten.
+    """
+    
+    def __init__(self, job_id, key, user, function, args):
+        self.job_id = job_id
+        self.key = key
+        self.user = user
+        # Benutzer, die auf das Ergebnis warten (mehrere bei zusammengefassten Aufträgen)
+        self.users = {user}
+        self.function = function
+        self.args = args
+        self.state = 'queued'
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed', 'cancelled')
+    
+    def __repr__(self):
+        return f'ScanJob({self.job_id!r}, {self.state!r})'
+
+class ScanScheduler:
+    """
+    Prozessweiter Scheduler für die Scans aller Sitzungen eines Servers.
+    
+    Höchstens max_running Aufträge laufen gleichzeitig, jeder in einem der
+    Worker-Threads des Schedulers. Wartende Aufträge stehen in einer
+    Warteschlange pro Benutzer; freie Worker bedienen die Benutzer reihum,
+    damit viele Aufträge eines Benutzers die anderen nicht verdrängen.
+    
+    Aufträge mit gleichem Schlüssel (Fingerabdruck der Quelle samt
+    Scan-Parametern) werden zu einem zusammengefasst. Fertige Ergebnisse
+    bleiben im gemeinsamen Ergebnisspeicher, bis mehr als max_results
+    vorliegen; die am längsten nicht abgefragten fallen dann heraus.
+    """
+    
+    def __init__(self, max_running=DEFAULT_MAX_RUNNING, max_queued=DEFAULT_MAX_QUEUED,
+                 max_queued_per_user=DEFAULT_MAX_QUEUED_PER_USER, max_results=DEFAULT_MAX_RESULTS):
+        """
+        Args:
+            max_running: Anzahl der Worker-Threads (gleichzeitig laufende Scans)
+            max_queued: Höchstzahl wartender Aufträge insgesamt
+            max_queued_per_user: Höchstzahl wartender Aufträge pro Benutzer
+            max_results: Anzahl fertiger Ergebnisse im Ergebnisspeicher
+        """
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.max_queued_per_user = max_queued_per_user
+        self.max_results = max_results
+        
+        self._condition = threading.Condition()
+        self._job_ids = itertools.count(1)
+        # job_id -> ScanJob für alle abrufbaren Aufträge
+        self._jobs = {}
+        # Schlüssel -> wartender oder laufender ScanJob
+        self._active = {}
+        # Schlüssel -> fertiger ScanJob, zuletzt abgefragte am Ende
+        self._results = OrderedDict()
+        # Benutzer -> deque wartender Aufträge; der nächste Benutzer steht vorne
+        self._queues = OrderedDict()
+        self._queued_count = 0
+        # Laufende Scans, auch abgebrochene, die noch nicht beendet sind
+        self._running_count = 0
+        
+        self._threads = [threading.Thread(target=self._work, name=f'scan-worker-{index}', daemon=True)
+                         for index in range(max_running)]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, key, user, function, *args):
+        """
+        Reicht einen Scan ein.
+        
+        Liegt für key bereits ein Ergebnis vor oder wartet bzw. läuft ein
+        Auftrag mit diesem Schlüssel, wird dessen job_id zurückgegeben und
+        nichts neu gestartet. Ein abgebrochener Auftrag, dessen Scan noch
+        ausläuft, wird dabei nicht wiederverwendet, sondern ersetzt.
+        
+        Args:
+            key: Hashbarer Schlüssel des Scans (Fingerabdruck der Quelle und Parameter)
+            user: Kennung des Benutzers bzw. der Sitzung für die faire Verteilung
+            function: Scan-Funktion; wird als function(*args, progress=..., cancel=...) aufgerufen
+            args: Argumente der Scan-Funktion
+        
+        Returns:
+            job_id des Auftrags
+        
+        Raises:
+            JobRejected: Wenn die Warteschlange insgesamt oder für den Benutzer voll ist
+        """
+        with self._condition:
+            self._forget_finished_jobs()
+            
+            job = self._results.get(key)
+            if job is not None:
+                self._results.move_to_end(key)
+                return job.job_id
+            job = self._active.get(key)
+            if job is not None and not job.cancel_event.is_set():
+                job.users.add(user)
+                return job.job_id
+            
+            if self._queued_count >= self.max_queued:
+                raise JobRejected(f"Es warten bereits {self._queued_count} Analysen; bitte später erneut versuchen")
+            user_queue = self._queues.get(user)
+            if user_queue is not None and len(user_queue) >= self.max_queued_per_user:
+                raise JobRejected(f"Höchstens {self.max_queued_per_user} wartende Analysen pro Benutzer")
+            
+            job = ScanJob(str(next(self._job_ids)), key, user, function, args)
+            self._jobs[job.job_id] = job
+            self._active[key] = job
+            self._queues.setdefault(user, deque()).append(job)
+            self._queued_count += 1
+            self._condition.notify()
+            return job.job_id
+    
+    def get(self, job_id):
+        """Gibt den ScanJob zu job_id zurück (None, wenn unbekannt oder nicht mehr gespeichert)."""
+        with self._condition:
+            return self._jobs.get(job_id)
+    
+    def queue_position(self, job_id):
+        """
+        Gibt an, wie viele Aufträge voraussichtlich vor einem wartenden Auftrag starten.
+        
+        Reihum verteilt: vor dem n-ten Auftrag eines Benutzers starten höchstens
+        je n Aufträge der anderen Benutzer. None, wenn der Auftrag nicht wartet.
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != 'queued':
+                return None
+            queues = list(self._queues.values())
+            own_queue = self._queues[job.user]
+            rank = own_queue.index(job)
+            user_index = list(self._queues).index(job.user)
+            # Benutzer vor diesem in der Reihe kommen in Runde rank noch einmal dran, die dahinter nicht
+            return rank + sum(min(len(queue), rank + (index < user_index))
+                              for index, queue in enumerate(queues) if queue is not own_queue)
+    
+    def cancel(self, job_id, user):
+        """
+        Meldet einen Benutzer von einem Auftrag ab.
+        
+        Der Auftrag wird erst abgebrochen, wenn kein anderer Benutzer mehr auf
+        ihn wartet; ein laufender Scan erhält dazu sein Abbruch-Signal.
+        
+        Returns:
+            True, wenn der Auftrag abgebrochen wurde
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.users.discard(user)
+            if job.users:
+                return False
+            
+            if job.state == 'queued':
+                user_queue = self._queues[job.user]
+                user_queue.remove(job)
+                if not user_queue:
+                    del self._queues[job.user]
+                self._queued_count -= 1
+                self._finish(job, 'cancelled')
+            else:
+                job.cancel_event.set()
+            return True
+    
+    def stats(self):
+        """Gibt die Anzahl wartender, laufender und gespeicherter Aufträge als Dict zurück."""
+        with self._condition:
+            return {
+                'queued': self._queued_count,
+                'running': self._running_count,
+                'results': len(self._results),
+                'users_waiting': len(self._queues),
+            }
+    
+    def _next_job(self):
+        """Nimmt den nächsten Auftrag reihum aus den Warteschlangen der Benutzer (mit Sperre aufrufen)."""
+        user, user_queue = next(iter(self._queues.items()))
+        job = user_queue.popleft()
+        if user_queue:
+            self._queues.move_to_end(user)
+        else:
+            del self._queues[user]
+        self._queued_count -= 1
+        return job
+    
+    def _work(self):
+        """Schleife eines Worker-Threads."""
+        while True:
+            with self._condition:
+                while not self._queues:
+                    self._condition.wait()
+                job = self._next_job()
+                job.state = 'running'
+                job.started_at = time.time()
+                self._running_count += 1
+            
+            def report(snapshot, job=job):
+                job.progress = snapshot
+            
+            try:
+                result = job.function(*job.args, progress=report, cancel=job.cancel_event)
+            except Exception as e:
+                with self._condition:
+                    job.error = e
+                    self._finish(job, 'cancelled' if job.cancel_event.is_set() else 'failed')
+            else:
+                with self._condition:
+                    job.result = result
+                    self._finish(job, 'done')
+    
+    def _finish(self, job, state):
+        """Schließt einen Auftrag ab und legt erfolgreiche Ergebnisse im Ergebnisspeicher ab (mit Sperre aufrufen)."""
+        if job.state == 'running':
+            self._running_count -= 1
+        job.state = state
+        job.finished_at = time.time()
+        # Argumente (z.B. hochgeladene Archive) nicht länger als nötig halten
+        job.function = job.args = None
+        # Ein abgebrochener Auftrag kann unter seinem Schlüssel bereits durch einen neuen ersetzt sein
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        
+        if state == 'done':
+            self._results[job.key] = job
+            while len(self._results) > self.max_results:
+                _, evicted = self._results.popitem(last=False)
+                del self._jobs[evicted.job_id]
+    
+    def _forget_finished_jobs(self):
+        """Entfernt fehlgeschlagene und abgebrochene Aufträge nach FINISHED_JOB_RETENTION (mit Sperre aufrufen)."""
+        expired = time.time() - FINISHED_JOB_RETENTION
+        for job_id, job in list(self._jobs.items()):
+            if job.state in ('failed', 'cancelled') and job.finished_at < expired:
+                del self._jobs[job_id]
@@ -0,0 +1,268 @@
+import json
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from code_counter import RESULT_FIELDS, estimate_effort_and_cost, get_rules_version
+
+# Version des Snapshot-Formats; Dateien einer anderen Version werden abgelehnt
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Schlüssel von Statistik und Metadaten in den Schema-Metadaten der Arrow-Tabelle
+SNAPSHOT_METADATA_KEY = b'code_counter.snapshot'
+
+# Dateiendungen, die als Parquet geschrieben werden; alle anderen als Arrow IPC (Feather v2)
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+# Kennungen am Anfang von Parquet- und Arrow-IPC-Dateien
+_PARQUET_MAGIC = b'PAR1'
+_ARROW_MAGIC = b'ARROW1'
+
+# Zählspalten, die der Vergleich gegenüberstellt
+DIFF_COUNT_FIELDS = ('total_lines', 'empty_lines', 'code_lines')
+
+# Status einer Datei im Vergleich zweier Snapshots
+DIFF_STATUSES = ('added', 'removed', 'changed')
+
+# Leere Ergebnisse (z.B. nach einem Fehler) haben keine Spalten; dann dieses Schema verwenden
+_EMPTY_SCHEMA = pa.schema([('file_path', pa.large_string()), ('language', pa.string()), ('extension', pa.string())]
+                          + [(field, pa.int64()) for field in DIFF_COUNT_FIELDS])
+
+class Snapshot:
+    """
+    Geladener Snapshot einer Analyse.
+    
+    table ist die Arrow-Tabelle mit einer Zeile pro Datei (Spalten wie der
+    DataFrame von count_lines_in_directory); aus einer Datei geladen liegt sie
+    memory-mapped vor und wird nicht in den Speicher kopiert. stats ist die
+    Gesamtstatistik zum Zeitpunkt des Scans.
+    """
+    
+    def __init__(self, table, info):
+        self.table = table
+        self.stats = info['stats']
+        self.source = info.get('source')
+        self.label = info.get('label')
+        self.created = info.get('created')
+        self.rules_version = info.get('rules_version')
+    
+    def __len__(self):
+        return self.table.num_rows
+    
+    @property
+    def estimate_lines(self):
+        """Code-Zeilen für die Aufwandsschätzung (ohne doppelte Dateien, falls dedupliziert)."""
+        return self.stats.get('unique_code_lines', self.stats['total_code_lines'])
+    
+    def to_dataframe(self):
+        """Gibt die Tabelle als DataFrame zurück; Pfade bleiben Arrow-Strings ohne Python-Objekte."""
+        import pandas as pd
+        string_dtype = pd.StringDtype('pyarrow')
+        return self.table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+
+def snapshot_table(results_df, stats, source=None, label=None):
+    """
+    Wandelt Ergebnisse und Statistik einer Analyse in eine Arrow-Tabelle um.
+    
+    Args:
+        results_df: DataFrame von count_lines_in_directory oder count_lines_in_archive
+        stats: Gesamtstatistik derselben Analyse
+        source: Analysiertes Verzeichnis oder Archiv (optional)
+        label: Bezeichnung des Snapshots, z.B. ein Release (optional)
+    
+    Returns:
+        pyarrow.Table mit Statistik und Metadaten in den Schema-Metadaten
+    """
+    if len(results_df.columns):
+        table = pa.Table.from_pandas(results_df, preserve_index=False)
+    else:
+        table = _EMPTY_SCHEMA.empty_table()
+    info = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'source': source,
+        'label': label,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'rules_version': get_rules_version(),
+        # Laufzeitmessung gehört nicht zum Stand der Codebasis
+        'stats': {key: value for key, value in stats.items() if key != 'profile'},
+    }
+    metadata = dict(table.schema.metadata or {})
+    metadata[SNAPSHOT_METADATA_KEY] = json.dumps(info, ensure_ascii=False).encode('utf-8')
+    return table.replace_schema_metadata(metadata)
+
+def write_snapshot(destination, results_df, stats, source=None, label=None):
+    """
+    Speichert eine Analyse als Snapshot-Datei.
+    
+    Endet der Pfad auf PARQUET_SUFFIXES, wird Parquet geschrieben (kleiner,
+    muss beim Laden dekodiert werden), sonst unkomprimiertes Arrow IPC, das
+    sich ohne Kopie memory-mapped laden lässt.
+    
+    Args:
+        destination: Dateipfad oder geöffnete Binärdatei (immer Arrow IPC)
+        results_df, stats, source, label: Siehe snapshot_table
+    """
+    table = snapshot_table(results_df, stats, source, label)
+    if isinstance(destination, str) and destination.lower().endswith(PARQUET_SUFFIXES):
+        import pyarrow.parquet as pq
+        pq.write_table(table, destination)
+        return
+    with pa.ipc.new_file(destination, table.schema) as writer:
+        writer.write_table(table)
+
+def snapshot_bytes(results_df, stats, source=None, label=None):
+    """Gibt den Snapshot einer Analyse als Arrow-IPC-Datei im Speicher zurück, z.B. für einen Download."""
+    sink = pa.BufferOutputStream()
+    write_snapshot(sink, results_df, stats, source, label)
+    return sink.getvalue().to_pybytes()
+
+def load_snapshot(source):
+    """
+    Lädt einen Snapshot aus einer Datei oder aus Bytes (z.B. einem Upload).
+    
+    Das Format wird am Dateianfang erkannt. Arrow-IPC-Dateien werden
+    memory-mapped geöffnet, Bytes ohne Kopie gelesen.
+    
+    Args:
+        source: Dateipfad oder bytes
+    
+    Returns:
+        Snapshot
+    
+    Raises:
+        ValueError: Wenn die Datei kein Snapshot dieser Formatversion ist
+    """
+    import pyarrow.parquet as pq
+    
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buffer = pa.py_buffer(source)
+        if bytes(source[:len(_PARQUET_MAGIC)]) == _PARQUET_MAGIC:
+            table = pq.read_table(pa.BufferReader(buffer))
+        else:
+            table = _read_arrow_file(pa.BufferReader(buffer))
+    else:
+        with open(source, 'rb') as file:
+            magic = file.read(len(_ARROW_MAGIC))
+        if magic.startswith(_PARQUET_MAGIC):
+            table = pq.read_table(source, memory_map=True)
+        else:
+            table = _read_arrow_file(pa.memory_map(source, 'r'))
+    
+    raw_info = (table.schema.metadata or {}).get(SNAPSHOT_METADATA_KEY)
+    if raw_info is None:
+        raise ValueError("Datei enthält keinen Snapshot einer Analyse")
+    info = json.loads(raw_info)
+    if info.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Snapshot-Format {info.get('format_version')} wird nicht unterstützt "
+                         f"(erwartet {SNAPSHOT_FORMAT_VERSION})")
+    missing = [field for field in RESULT_FIELDS if field not in table.column_names]
+    if missing:
+        raise ValueError(f"Snapshot ohne Spalten {', '.join(missing)}")
+    return Snapshot(table, info)
+
+def _read_arrow_file(source):
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        raise ValueError("Datei ist weder ein Arrow- noch ein Parquet-Snapshot")
+
+def _string_column(table, name):
+    """Spalte als large_string (Kategorien dekodiert), damit beide Snapshots denselben Typ haben."""
+    return pc.cast(table.column(name), pa.large_string())
+
+def diff_snapshots(old, new, team_size, dev_monthly_salary):
+    """
+    Vergleicht zwei Snapshots Datei für Datei.
+    
+    Die Dateien werden über ihren Pfad verknüpft: eine Hash-Tabelle über die
+    Pfade des alten Snapshots, in der jeder Pfad des neuen nachgeschlagen
+    wird; alle weiteren Schritte arbeiten spaltenweise. Unveränderte Dateien
+    erscheinen nur in der Zusammenfassung.
+    
+    Die Kosten werden für beide Stände mit estimate_effort_and_cost geschätzt.
+    Da die Produktivität von der Projektgröße abhängt, ist die Kostendifferenz
+    pro Datei anteilig: Zeilendifferenz mal durchschnittliche Kosten pro
+    Code-Zeile des neuen Stands (des alten, falls der neue leer ist).
+    
+    Args:
+        old: Älterer Snapshot
+        new: Neuerer Snapshot
+        team_size: Anzahl der Entwickler im Team
+        dev_monthly_salary: Durchschnittliches Monatsgehalt eines Entwicklers in Euro
+    
+    Returns:
+        Tuple mit (DataFrame der hinzugekommenen, entfernten und geänderten Dateien mit den
+        Spalten 'file_path', 'language', 'status', 'code_lines_old', 'code_lines_new' sowie
+        '<Zählspalte>_delta' und 'cost_delta', nach Betrag der Code-Zeilen-Differenz sortiert;
+        Dict mit der Zusammenfassung)
+    """
+    import pandas as pd
+    
+    old_paths = _string_column(old.table, 'file_path')
+    new_paths = _string_column(new.table, 'file_path')
+    # Position jeder neuen Datei im alten Snapshot (null = hinzugekommen)
+    positions = pc.index_in(new_paths, value_set=old_paths)
+    matched = pc.is_valid(positions).to_numpy(zero_copy_only=False)
+    positions = pc.fill_null(positions, 0).to_numpy(zero_copy_only=False).astype(np.int64)
+    removed = np.ones(len(old), dtype=bool)
+    removed[positions[matched]] = False
+    
+    old_counts = {field: old.table.column(field).to_numpy() for field in DIFF_COUNT_FIELDS}
+    new_counts = {field: new.table.column(field).to_numpy() for field in DIFF_COUNT_FIELDS}
+    # Zählwerte des alten Stands in der Zeilenreihenfolge des neuen; 0 für hinzugekommene Dateien
+    if len(old):
+        previous = {field: np.where(matched, old_counts[field][positions], 0) for field in DIFF_COUNT_FIELDS}
+    else:
+        previous = {field: np.zeros(len(new), dtype=np.int64) for field in DIFF_COUNT_FIELDS}
+    
+    changed = matched & np.logical_or.reduce([previous[field] != new_counts[field] for field in DIFF_COUNT_FIELDS])
+    added = ~matched
+    new_rows = np.flatnonzero(added | changed)
+    old_rows = np.flatnonzero(removed)
+    
+    old_estimate = estimate_effort_and_cost(old.estimate_lines, team_size, dev_monthly_salary)
+    new_estimate = estimate_effort_and_cost(new.estimate_lines, team_size, dev_monthly_salary)
+    if new.estimate_lines:
+        cost_per_line = new_estimate[1] / new.estimate_lines
+    else:
+        cost_per_line = old_estimate[1] / old.estimate_lines if old.estimate_lines else 0.0
+    
+    file_paths = pa.chunked_array(new_paths.take(pa.array(new_rows)).chunks + old_paths.take(pa.array(old_rows)).chunks,
+                                  type=pa.large_string())
+    languages = pa.chunked_array(_string_column(new.table, 'language').take(pa.array(new_rows)).chunks
+                                 + _string_column(old.table, 'language').take(pa.array(old_rows)).chunks,
+                                 type=pa.large_string())
+    status = np.concatenate([np.where(added[new_rows], 'added', 'changed'),
+                             np.full(len(old_rows), 'removed')]).astype(object)
+    columns = {
+        'file_path': pd.arrays.ArrowStringArray(file_paths),
+        'language': pd.Categorical(pd.arrays.ArrowStringArray(languages).to_numpy()),
+        'status': pd.Categorical(status, categories=DIFF_STATUSES),
+        'code_lines_old': np.concatenate([previous['code_lines'][new_rows], old_counts['code_lines'][old_rows]]),
+        'code_lines_new': np.concatenate([new_counts['code_lines'][new_rows], np.zeros(len(old_rows), np.int64)]),
+    }
+    for field in DIFF_COUNT_FIELDS:
+        columns[f'{field}_delta'] = np.concatenate([new_counts[field][new_rows] - previous[field][new_rows],
+                                                    -old_counts[field][old_rows]])
+    columns['cost_delta'] = columns['code_lines_delta'] * cost_per_line
+    diff_df = pd.DataFrame(columns)
+    diff_df = diff_df.iloc[np.argsort(-np.abs(columns['code_lines_delta']), kind='stable')].reset_index(drop=True)
+    
+    by_language = diff_df.groupby('language', observed=True)['code_lines_delta'].sum()
+    summary = {
+        'files_added': int(added.sum()),
+        'files_removed': int(removed.sum()),
+        'files_changed': int(changed.sum()),
+        'files_unchanged': int(matched.sum() - changed.sum()),
+        'code_lines_old': old.stats['total_code_lines'],
+        'code_lines_new': new.stats['total_code_lines'],
+        'code_lines_delta': new.stats['total_code_lines'] - old.stats['total_code_lines'],
+        'effort_months_old': old_estimate[0],
+        'effort_months_new': new_estimate[0],
+        'cost_old': old_estimate[1],
+        'cost_new': new_estimate[1],
+        'cost_delta': new_estimate[1] - old_estimate[1],
+        'code_lines_delta_by_language': {language: int(lines) for language, lines
+                                         in by_language[by_language != 0].sort_values().items()},
+    }
+    return diff_df, summary
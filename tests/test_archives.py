@@ -0,0 +1,66 @@
+import io
+import gzip
+import tarfile
+import zipfile
+import pytest
+import cli
+from code_counter import count_lines_in_archive, iter_archive_counts
+
+SOURCE = b'# Kommentar\n\nx = 1\ny = 2\n'
+
+def _zip_bytes(files, compression=zipfile.ZIP_STORED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as zip_file:
+        for name, data in files.items():
+            zip_file.writestr(name, data)
+    return buffer.getvalue()
+
+def _tar_gz_bytes(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar_file:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+def test_zip_and_tar_give_same_counts():
+    files = {'src/main.py': SOURCE, 'src/util.py': SOURCE * 3}
+    zip_df, zip_stats = count_lines_in_archive(io.BytesIO(_zip_bytes(files, zipfile.ZIP_DEFLATED)))
+    tar_df, tar_stats = count_lines_in_archive(io.BytesIO(_tar_gz_bytes(files)))
+    assert zip_stats == tar_stats
+    assert zip_stats['total_code_lines'] == 2 + 6
+
+def test_member_count_limit():
+    archive = io.BytesIO(_zip_bytes({f'file{index}.py': SOURCE for index in range(3)}))
+    with pytest.raises(ValueError, match='mehr als 2 Einträge'):
+        list(iter_archive_counts(archive, max_members=2))
+
+def test_total_size_limit_counts_only_code_files():
+    files = {'a.py': SOURCE, 'b.py': SOURCE, 'daten.bin': bytes(1000)}
+    list(iter_archive_counts(io.BytesIO(_zip_bytes(files)), max_total_size=2 * len(SOURCE)))
+    with pytest.raises(ValueError, match='überschreiten'):
+        list(iter_archive_counts(io.BytesIO(_zip_bytes(files)), max_total_size=2 * len(SOURCE) - 1))
+
+def _corrupt_zip_payload():
+    data = bytearray(_zip_bytes({'main.py': SOURCE * 50}, zipfile.ZIP_DEFLATED))
+    # Komprimierte Daten hinter dem lokalen Header (30 Bytes + Dateiname) überschreiben
+    start = 30 + len('main.py')
+    data[start:start + 20] = b'\xff' * 20
+    return bytes(data)
+
+@pytest.mark.parametrize('data', [
+    b'kein Archiv, nur Text\n' * 10,
+    _corrupt_zip_payload(),
+    _tar_gz_bytes({'main.py': SOURCE * 200})[:-40],
+    gzip.compress(b'kein tar' * 100),
+], ids=['unsupported', 'corrupt-zip-payload', 'truncated-tar-gz', 'gzip-without-tar'])
+def test_corrupt_or_unsupported_archive_raises_value_error(data):
+    with pytest.raises(ValueError, match='beschädigt oder hat kein unterstütztes Format'):
+        list(iter_archive_counts(io.BytesIO(data)))
+
+def test_cli_reports_corrupt_archive(tmp_path, capsys):
+    archive_path = tmp_path / 'kaputt.zip'
+    archive_path.write_bytes(_corrupt_zip_payload())
+    assert cli.main([str(archive_path)]) == 1
+    assert 'beschädigt' in capsys.readouterr().err
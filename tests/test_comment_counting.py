@@ -0,0 +1,31 @@
+import pytest
+from code_counter import count_lines_in_bytes
+
+# (Dateiendung, Inhalt, erwartete Code-Zeilen)
+CASES = [
+    # Kommentarzeichen in Strings
+    ('.py', b'x = "# kein Kommentar"\n# Kommentar\n', 1),
+    ('.js', b'const a = "// kein";\nconst u = \'http://example.com\';\n', 2),
+    ('.c', b'char *s = "/* kein */";\nint x; // Kommentar am Zeilenende\n/* Block\n   Ende */\n', 2),
+    ('.sh', b'echo "#nicht"\n', 1),
+    # Docstrings gelten als Kommentar, zugewiesene mehrzeilige Strings als Code
+    ('.py', b'def f():\n    """\n    Doku\n    """\n    return 1\n', 2),
+    ('.py', b'def f():\n    """Einzeiliger Docstring."""\n    return 1\n', 2),
+    ('.py', b"s = '''\n# im String\n'''\n", 3),
+    # Template-Literale einschließlich verschachtelter Ausdrücke
+    ('.js', b'const t = `\n// im Template\n${a /* c */}\n`;\n', 4),
+    ('.js', b'const t = `${`innen // kein`}`;\n// Kommentar\n', 1),
+    # Shell: $# und ${#x} leiten keinen Kommentar ein
+    ('.sh', b'echo $#\n# Kommentar\necho ${#x}\n', 2),
+    ('.sh', b'n=${#array[@]} # Anzahl\n', 1),
+]
+
+@pytest.mark.parametrize('file_ext, data, code_lines', CASES)
+def test_code_lines(file_ext, data, code_lines):
+    assert count_lines_in_bytes(data, file_ext)[2] == code_lines
+
+def test_blank_lines_are_not_code():
+    total_lines, empty_lines, code_lines = count_lines_in_bytes(b'x = 1\n\n   \n# Kommentar\ny = 2\n', '.py')
+    # Wie bei split('\n') zählt auch die leere Zeile nach dem letzten Zeilenumbruch
+    assert (empty_lines, code_lines) == (3, 2)
+    assert total_lines == 6
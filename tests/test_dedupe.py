@@ -0,0 +1,48 @@
+import hashlib
+import os
+import types
+
+import code_counter
+from code_counter import count_lines_in_directory, find_duplicate_groups
+from scan_cache import ScanCache
+
+SOURCE = 'def main():\n    # Einstieg\n    return 1\n'
+
+# Ersatz für xxhash mit abweichenden Hash-Werten (xxhash ist hier nicht installiert)
+_FAKE_XXHASH = types.SimpleNamespace(xxh3_128_hexdigest=lambda data: hashlib.md5(data).hexdigest(),
+                                     xxh3_128=hashlib.md5)
+
+def test_find_duplicate_groups_counts_each_content_once():
+    results = [
+        {'file_path': 'a/x.py', 'extension': '.py', 'code_lines': 5, 'content_hash': 'h1'},
+        {'file_path': 'b/x.py', 'extension': '.py', 'code_lines': 5, 'content_hash': 'h1'},
+        {'file_path': 'c/X.PY', 'extension': '.PY', 'code_lines': 5, 'content_hash': 'h1'},
+        {'file_path': 'd/y.py', 'extension': '.py', 'code_lines': 7, 'content_hash': 'h2'},
+    ]
+    unique_code_lines, groups = find_duplicate_groups(results)
+    
+    # Gleicher Inhalt mit gleicher Endung (ohne Groß-/Kleinschreibung) ist eine Gruppe
+    assert unique_code_lines == 12
+    assert [(group['content_hash'], group['copies']) for group in groups] == [('h1', 3)]
+
+def test_duplicates_survive_cache_from_other_hash_algorithm(tmp_path, monkeypatch):
+    root = tmp_path / 'repo'
+    root.mkdir()
+    (root / 'a.py').write_text(SOURCE)
+    (root / 'b.py').write_text(SOURCE)
+    
+    with ScanCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        # Erster Scan mit xxhash füllt den Cache mit dessen Hash-Werten
+        monkeypatch.setattr(code_counter, 'xxhash', _FAKE_XXHASH)
+        _, stats = count_lines_in_directory(str(root), cache=cache, dedupe=True)
+        assert len(stats['duplicate_groups']) == 1
+        
+        # Ohne xxhash wird nur die geänderte Datei neu gezählt (BLAKE2b); die andere käme aus dem Cache
+        monkeypatch.setattr(code_counter, 'xxhash', None)
+        stat = os.stat(root / 'b.py')
+        os.utime(root / 'b.py', ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        _, stats = count_lines_in_directory(str(root), cache=cache, dedupe=True)
+    
+    assert stats['duplicate_files'] == 1
+    assert [sorted(os.path.basename(path) for path in group['files']) for group in stats['duplicate_groups']] == [
+        ['a.py', 'b.py']]
@@ -0,0 +1,24 @@
+import numpy as np
+import estimation_rules
+from code_counter import estimate_effort_and_cost
+from estimation import estimate_effort_and_cost_array
+from estimation_rules import estimate_effort_and_cost_scalar
+
+def _boundary_values(thresholds):
+    return sorted({value + offset for value in thresholds for offset in (-1, 0, 1)})
+
+def test_scalar_matches_array_bit_for_bit():
+    rng = np.random.default_rng(0)
+    code_lines = np.concatenate([rng.integers(0, 2_000_000, 5000), [0, 1],
+                                 _boundary_values(estimation_rules.PROJECT_SIZE_THRESHOLDS)])
+    team_sizes = np.concatenate([rng.integers(1, 40, len(code_lines) - 9),
+                                 np.resize(_boundary_values(estimation_rules.TEAM_SIZE_THRESHOLDS), 9)])
+    salaries = rng.uniform(1000, 20000, len(code_lines)).round(2)
+    
+    effort_months, total_cost = estimate_effort_and_cost_array(code_lines, team_sizes, salaries)
+    for index, (lines, team_size, salary) in enumerate(zip(code_lines.tolist(), team_sizes.tolist(),
+                                                            salaries.tolist())):
+        assert estimate_effort_and_cost_scalar(lines, team_size, salary) == (effort_months[index], total_cost[index])
+
+def test_code_counter_estimate_uses_shared_rules():
+    assert estimate_effort_and_cost(50000, 3, 8000) == estimate_effort_and_cost_scalar(50000, 3, 8000)
@@ -0,0 +1,23 @@
+import subprocess
+import pytest
+from code_counter import count_lines_in_directory, count_lines_in_git_revision
+
+@pytest.fixture
+def repository(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'main.py').write_text('# Einstieg\n\nprint("hallo")\n')
+    (tmp_path / 'util.js').write_text('// Hilfen\nexport const x = 1;\n')
+    for command in (['init', '-q'], ['add', '.'],
+                    ['-c', 'user.name=Test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'Start']):
+        subprocess.run(['git', '-C', str(tmp_path)] + command, check=True)
+    return tmp_path
+
+def test_git_revision_dataframe_matches_directory_scan(repository):
+    revision_df, revision_stats = count_lines_in_git_revision(str(repository))
+    directory_df, directory_stats = count_lines_in_directory(str(repository), use_gitignore=False)
+    
+    assert dict(revision_df.dtypes) == dict(directory_df.dtypes)
+    assert revision_df['language'].dtype == 'category'
+    assert (revision_df.sort_values('file_path').reset_index(drop=True)
+            .equals(directory_df.sort_values('file_path').reset_index(drop=True)))
+    assert revision_stats['total_code_lines'] == directory_stats['total_code_lines']
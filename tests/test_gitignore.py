@@ -0,0 +1,49 @@
+from directory_walker import IgnoreRules, walk_files
+
+def test_negation_reincludes_later_matches():
+    rules = IgnoreRules(['*.log', '!keep.log'])
+    assert rules.match('debug.log', False) is True
+    assert rules.match('keep.log', False) is False
+    assert rules.match('sub/keep.log', False) is False
+    assert rules.match('main.py', False) is None
+
+def test_last_matching_pattern_wins():
+    rules = IgnoreRules(['!keep.log', '*.log'])
+    assert rules.match('keep.log', False) is True
+
+def test_anchored_pattern_matches_only_at_its_level():
+    rules = IgnoreRules(['/build', 'docs/generated'])
+    assert rules.match('build', True) is True
+    assert rules.match('src/build', True) is None
+    assert rules.match('docs/generated', True) is True
+    assert rules.match('src/docs/generated', True) is None
+
+def test_unanchored_pattern_matches_on_every_level():
+    rules = IgnoreRules(['build'])
+    assert rules.match('build', True) is True
+    assert rules.match('src/build', True) is True
+
+def test_directory_pattern_does_not_match_files():
+    rules = IgnoreRules(['out/'])
+    assert rules.match('out', True) is True
+    assert rules.match('out', False) is None
+
+def test_comments_and_escaped_characters():
+    rules = IgnoreRules(['# Kommentar', r'\#hash.py', r'\!bang.py', ''])
+    assert rules.match('#hash.py', False) is True
+    assert rules.match('!bang.py', False) is True
+    assert rules.match('Kommentar', False) is None
+
+def _walked(root, **options):
+    return sorted(relative_path for _, relative_path, _, _ in walk_files(str(root), **options))
+
+def test_walk_applies_nested_ignore_files(tmp_path):
+    (tmp_path / '.gitignore').write_text('*.log\n/build/\n')
+    for relative_path in ('app.log', 'main.py', 'build/out.py', 'src/build/gen.py', 'src/keep.log', 'src/tmp.log'):
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('x = 1\n')
+    (tmp_path / 'src' / '.gitignore').write_text('!keep.log\n')
+    
+    assert _walked(tmp_path) == ['.gitignore', 'main.py', 'src/.gitignore', 'src/build/gen.py', 'src/keep.log']
+    assert 'build/out.py' in _walked(tmp_path, use_gitignore=False)
@@ -0,0 +1,49 @@
+import cli
+import code_counter
+from code_counter import _scan_directory_results
+from portfolio import count_lines_in_portfolio
+
+def _write_repository(root, file_count):
+    root.mkdir()
+    for index in range(file_count):
+        (root / f'module{index}.py').write_text('# Kommentar\n\n' + 'x = 1\n' * (index + 1))
+
+def test_portfolio_matches_directory_scans(tmp_path):
+    roots = []
+    for name, file_count in (('small', 2), ('large', 40), ('medium', 7)):
+        _write_repository(tmp_path / name, file_count)
+        roots.append(str(tmp_path / name))
+    roots.append(str(tmp_path / 'missing'))
+    
+    for workers in (1, 3):
+        reports, summary = count_lines_in_portfolio(roots, workers=workers)
+        assert [report['source'] for report in reports] == roots
+        for report in reports[:3]:
+            assert report['stats'] == _scan_directory_results(report['source'], workers=1)[1]
+        assert 'error' in reports[3]
+        assert summary['repositories'] == 3
+        assert summary['total_files'] == 2 + 40 + 7
+
+def test_portfolio_scans_repeated_roots_once(tmp_path):
+    _write_repository(tmp_path / 'repo', 3)
+    root = str(tmp_path / 'repo')
+    
+    reports, summary = count_lines_in_portfolio([root, root, str(tmp_path / '.' / 'repo')], workers=1)
+    assert len(reports) == 1
+    assert summary['repositories'] == 1
+    assert summary['total_code_lines'] == reports[0]['stats']['total_code_lines']
+
+def test_cli_portfolio_uses_all_cores_by_default(tmp_path, monkeypatch, capsys):
+    _write_repository(tmp_path / 'a', 1)
+    _write_repository(tmp_path / 'b', 1)
+    used_workers = []
+    scan = cli.iter_portfolio_counts
+    
+    def iter_portfolio_counts(roots, exclude_dirs, workers, *args):
+        used_workers.append(workers)
+        return scan(roots, exclude_dirs, 1, *args)
+    
+    monkeypatch.setattr(cli, 'iter_portfolio_counts', iter_portfolio_counts)
+    assert cli.main([str(tmp_path / 'a'), str(tmp_path / 'b')]) == 0
+    assert code_counter._normalize_workers(used_workers[0]) == code_counter._normalize_workers(0)
+    assert 'Repositorys:' in capsys.readouterr().out
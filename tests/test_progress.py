@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+import code_counter
+from code_counter import ScanCancelled, count_lines_in_directory
+
+def _write_tree(root, file_count=20):
+    for index in range(file_count):
+        directory = root / f'pkg{index % 4}'
+        directory.mkdir(exist_ok=True)
+        (directory / f'module{index}.py').write_text(f'# Modul {index}\nvalue = {index}\n\nprint(value)\n')
+
+@pytest.fixture
+def every_tick(monkeypatch):
+    # Jeden Fortschritt melden statt höchstens alle PROGRESS_INTERVAL Sekunden
+    monkeypatch.setattr(code_counter, 'PROGRESS_INTERVAL', 0)
+
+def test_progress_reports_phases_and_final_totals(tmp_path, every_tick):
+    _write_tree(tmp_path)
+    snapshots = []
+    
+    _, stats = count_lines_in_directory(str(tmp_path), progress=snapshots.append)
+    
+    phases = [snapshot['phase'] for snapshot in snapshots]
+    assert phases == sorted(phases, key=('walk', 'count', 'done').index)
+    assert phases.count('done') == 1
+    done = snapshots[-1]
+    assert done['phase'] == 'done'
+    assert done['files_done'] == done['files_total'] == 20
+    assert done['total_files'] == stats['total_files']
+    assert done['total_code_lines'] == stats['total_code_lines'] == 40
+    assert done['bytes_done'] == done['bytes_total'] == sum(path.stat().st_size for path in tmp_path.rglob('*.py'))
+    # Die Zwischenstände wachsen nur
+    files_done = [snapshot['files_done'] for snapshot in snapshots if snapshot['phase'] != 'walk']
+    assert files_done == sorted(files_done)
+
+def test_progress_respects_interval(tmp_path, monkeypatch):
+    _write_tree(tmp_path)
+    monkeypatch.setattr(code_counter, 'PROGRESS_INTERVAL', 3600)
+    snapshots = []
+    
+    count_lines_in_directory(str(tmp_path), progress=snapshots.append)
+    
+    # Erster Stand sofort, danach nur noch der Endstand
+    assert [snapshot['phase'] for snapshot in snapshots] == ['count', 'done']
+
+def test_cancel_during_counting_raises(tmp_path, every_tick):
+    _write_tree(tmp_path)
+    cancel = threading.Event()
+    snapshots = []
+    
+    def progress(snapshot):
+        snapshots.append(snapshot)
+        if snapshot['phase'] == 'count' and snapshot['files_done']:
+            cancel.set()
+    
+    with pytest.raises(ScanCancelled):
+        count_lines_in_directory(str(tmp_path), progress=progress, cancel=cancel)
+    assert snapshots[-1]['phase'] == 'count'
+    assert snapshots[-1]['files_done'] < 20
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_cancel_before_start_raises(tmp_path, workers):
+    _write_tree(tmp_path)
+    cancel = threading.Event()
+    cancel.set()
+    
+    with pytest.raises(ScanCancelled):
+        count_lines_in_directory(str(tmp_path), workers=workers, cancel=cancel)
@@ -0,0 +1,21 @@
+from scan_cache import ScanCache
+
+def _row(file_path):
+    return (file_path, 10, 1, 1, 3, 1, 2, 'Python', None, None)
+
+def test_lookup_keeps_other_directories_with_other_rules_version(tmp_path):
+    with ScanCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        cache.store([_row('/repos/a/main.py')], '1-stream')
+        cache.store([_row('/repos/b/main.py')], '1-skip')
+        
+        # Scan von b mit einer anderen Richtlinie darf den Cache von a nicht leeren
+        assert cache.lookup('/repos/b', [('/repos/b/main.py', 10, 1, 1)], '1-physical') == {}
+        assert cache.lookup('/repos/a', [('/repos/a/main.py', 10, 1, 1)], '1-stream') == {
+            '/repos/a/main.py': (3, 1, 2, 'Python', None, None)}
+
+def test_lookup_removes_entries_of_other_rules_version_below_directory(tmp_path):
+    with ScanCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        cache.store([_row('/repos/a/main.py'), _row('/repos/a/old.py')], '1-skip')
+        
+        cache.lookup('/repos/a', [('/repos/a/main.py', 10, 1, 1)], '1-stream')
+        assert len(cache) == 0
@@ -0,0 +1,97 @@
+import time
+import threading
+import pytest
+from scan_jobs import ScanScheduler, JobRejected
+
+def _wait_for(scheduler, job_ids, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not all(scheduler.get(job_id).finished for job_id in job_ids):
+        assert time.monotonic() < deadline, "Aufträge wurden nicht fertig"
+        time.sleep(0.01)
+
+def _blocking(release):
+    """Scan-Funktion, die erst nach release.set() endet."""
+    def scan(progress=None, cancel=None):
+        release.wait(5)
+        return 'fertig'
+    return scan
+
+def _recording(order, name):
+    def scan(progress=None, cancel=None):
+        order.append(name)
+        return name
+    return scan
+
+@pytest.fixture
+def blocked_scheduler():
+    """Scheduler mit einem Worker, der bis release.set() belegt ist."""
+    release = threading.Event()
+    scheduler = ScanScheduler(max_running=1, max_queued=8, max_queued_per_user=4)
+    blocker = scheduler.submit('blocker', 'x', _blocking(release))
+    while scheduler.get(blocker).state != 'running':
+        time.sleep(0.01)
+    yield scheduler, release
+    release.set()
+
+def test_identical_keys_are_coalesced(blocked_scheduler):
+    scheduler, release = blocked_scheduler
+    calls = []
+    first = scheduler.submit('scan', 'a', _recording(calls, 'scan'))
+    second = scheduler.submit('scan', 'b', _recording(calls, 'scan'))
+    assert first == second
+    assert scheduler.get(first).users == {'a', 'b'}
+    
+    release.set()
+    _wait_for(scheduler, [first])
+    assert calls == ['scan']
+    # Fertige Ergebnisse werden wiederverwendet
+    assert scheduler.submit('scan', 'c', _recording(calls, 'scan')) == first
+    assert calls == ['scan']
+
+def test_users_are_served_round_robin(blocked_scheduler):
+    scheduler, release = blocked_scheduler
+    order = []
+    job_ids = [scheduler.submit(name, user, _recording(order, name))
+               for name, user in (('a1', 'a'), ('a2', 'a'), ('a3', 'a'), ('b1', 'b'), ('b2', 'b'))]
+    assert scheduler.queue_position(job_ids[3]) == 1
+    assert scheduler.queue_position(job_ids[2]) == 4
+    
+    release.set()
+    _wait_for(scheduler, job_ids)
+    assert order == ['a1', 'b1', 'a2', 'b2', 'a3']
+
+def test_admission_control_per_user(blocked_scheduler):
+    scheduler, _ = blocked_scheduler
+    for index in range(4):
+        scheduler.submit(f'a{index}', 'a', _recording([], 'a'))
+    with pytest.raises(JobRejected):
+        scheduler.submit('a4', 'a', _recording([], 'a'))
+    scheduler.submit('b0', 'b', _recording([], 'b'))
+
+def test_cancel_waits_for_last_user(blocked_scheduler):
+    scheduler, _ = blocked_scheduler
+    job_id = scheduler.submit('scan', 'a', _recording([], 'scan'))
+    scheduler.submit('scan', 'b', _recording([], 'scan'))
+    
+    assert scheduler.cancel(job_id, 'a') is False
+    assert scheduler.get(job_id).state == 'queued'
+    assert scheduler.cancel(job_id, 'b') is True
+    assert scheduler.get(job_id).state == 'cancelled'
+    assert scheduler.stats()['queued'] == 0
+
+def test_resubmit_after_cancel_starts_new_job():
+    release = threading.Event()
+    scheduler = ScanScheduler(max_running=2)
+    job_id = scheduler.submit('scan', 'a', _blocking(release))
+    while scheduler.get(job_id).state != 'running':
+        time.sleep(0.01)
+    assert scheduler.cancel(job_id, 'a') is True
+    
+    # Der abgebrochene Scan läuft noch; derselbe Schlüssel startet einen neuen Auftrag
+    new_job_id = scheduler.submit('scan', 'a', _recording([], 'neu'))
+    assert new_job_id != job_id
+    release.set()
+    _wait_for(scheduler, [job_id, new_job_id])
+    assert scheduler.get(new_job_id).state == 'done'
+    assert scheduler.get(new_job_id).result == 'neu'
+    assert scheduler.stats()['running'] == 0
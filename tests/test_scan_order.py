@@ -0,0 +1,55 @@
+import code_counter
+from code_counter import OversizePolicy, _ScanCollector, _scan_directory_results
+
+# Übergroß im Sinne der Test-Richtlinie; klein genug für schnelle Tests
+OVERSIZE_LIMIT = 256
+
+def _write_tree(root, file_count=12):
+    """Legt abwechselnd kleine und übergroße Dateien in mehreren Verzeichnissen an."""
+    for index in range(file_count):
+        directory = root / f'pkg{index % 3}'
+        directory.mkdir(exist_ok=True)
+        lines = 200 if index % 2 else 3
+        (directory / f'module{index}.py').write_text(''.join(f'value_{line} = {line}\n' for line in range(lines)))
+
+def _result(index, oversize=None):
+    result = code_counter._make_result(f'file{index}.py', '.py', 'Python', 10 + index, 1, 9 + index)
+    if oversize is not None:
+        result['oversize'] = oversize
+    return result
+
+def test_collector_restores_scan_order_of_skipped_files():
+    items = [(index, _result(index, 'skipped' if index % 3 == 0 else None)) for index in range(12)]
+    
+    in_order = _ScanCollector()
+    for index, result in items:
+        in_order.add(index, result)
+    shuffled = _ScanCollector()
+    for index, result in items[::-2] + items[::2][::-1]:
+        shuffled.add(index, result)
+    
+    _, expected = in_order.finish()
+    _, stats = shuffled.finish()
+    assert [entry['file_path'] for entry in stats['oversized_files']] == [f'file{index}.py' for index in range(0, 12, 3)]
+    assert stats == expected
+
+def test_collector_restores_order_when_only_skipped_files_are_out_of_order():
+    collector = _ScanCollector()
+    collector.add(0, _result(0))
+    collector.add(2, _result(2, 'skipped'))
+    collector.add(1, _result(1, 'physical'))
+    collector.add(3, _result(3))
+    
+    _, stats = collector.finish()
+    assert [entry['file_path'] for entry in stats['oversized_files']] == ['file1.py', 'file2.py']
+
+def test_parallel_scan_matches_serial_with_skipped_oversize_files(tmp_path):
+    _write_tree(tmp_path)
+    policy = OversizePolicy('skip', max_file_size=OVERSIZE_LIMIT)
+    
+    serial_results, serial_stats = _scan_directory_results(str(tmp_path), [], 1, oversize_policy=policy)
+    parallel_results, parallel_stats = _scan_directory_results(str(tmp_path), [], 4, oversize_policy=policy)
+    
+    assert len(serial_stats['oversized_files']) == 6
+    assert parallel_stats == serial_stats
+    assert list(parallel_results) == list(serial_results)
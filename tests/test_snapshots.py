@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from code_counter import count_lines_in_directory, estimate_effort_and_cost
+from snapshots import diff_snapshots, load_snapshot, snapshot_bytes, write_snapshot
+
+TEAM_SIZE = 3
+SALARY = 8000
+
+def _snapshot(root, files, label):
+    root.mkdir()
+    for name, lines in files.items():
+        (root / name).write_text(''.join(f'value_{line} = {line}\n' for line in range(lines)))
+    results_df, stats = count_lines_in_directory(str(root))
+    return load_snapshot(snapshot_bytes(results_df, stats, str(root), label))
+
+@pytest.fixture
+def snapshots(tmp_path):
+    old = _snapshot(tmp_path / 'old', {'same.py': 10, 'grown.py': 5, 'shrunk.py': 20, 'gone.py': 7}, 'v1')
+    new = _snapshot(tmp_path / 'new', {'same.py': 10, 'grown.py': 30, 'shrunk.py': 2, 'fresh.py': 4}, 'v2')
+    return old, new
+
+def test_diff_reports_added_removed_and_changed_files(snapshots):
+    diff_df, summary = diff_snapshots(*snapshots, TEAM_SIZE, SALARY)
+    
+    rows = {row.file_path: (row.status, row.code_lines_old, row.code_lines_new, row.code_lines_delta)
+            for row in diff_df.itertuples()}
+    assert rows == {
+        'grown.py': ('changed', 5, 30, 25),
+        'shrunk.py': ('changed', 20, 2, -18),
+        'fresh.py': ('added', 0, 4, 4),
+        'gone.py': ('removed', 7, 0, -7),
+    }
+    # Nach Betrag der Code-Zeilen-Differenz sortiert
+    assert list(diff_df['file_path']) == ['grown.py', 'shrunk.py', 'gone.py', 'fresh.py']
+    assert (summary['files_added'], summary['files_removed'], summary['files_changed'],
+            summary['files_unchanged']) == (1, 1, 2, 1)
+    assert (summary['code_lines_old'], summary['code_lines_new'], summary['code_lines_delta']) == (42, 46, 4)
+    assert summary['code_lines_delta_by_language'] == {'Python': 4}
+
+def test_diff_cost_delta(snapshots):
+    diff_df, summary = diff_snapshots(*snapshots, TEAM_SIZE, SALARY)
+    
+    _, cost_old = estimate_effort_and_cost(42, TEAM_SIZE, SALARY)
+    _, cost_new = estimate_effort_and_cost(46, TEAM_SIZE, SALARY)
+    assert summary['cost_old'] == pytest.approx(cost_old)
+    assert summary['cost_new'] == pytest.approx(cost_new)
+    assert summary['cost_delta'] == pytest.approx(cost_new - cost_old)
+    # Pro Datei anteilig zu den Kosten pro Code-Zeile des neuen Stands
+    assert list(diff_df['cost_delta']) == pytest.approx(list(diff_df['code_lines_delta'] * cost_new / 46))
+
+def test_diff_of_identical_snapshots_is_empty(snapshots):
+    old, _ = snapshots
+    diff_df, summary = diff_snapshots(old, old, TEAM_SIZE, SALARY)
+    
+    assert diff_df.empty
+    assert summary['files_unchanged'] == 4
+    assert summary['cost_delta'] == 0
+
+@pytest.mark.parametrize('file_name', ['snapshot.arrow', 'snapshot.parquet'])
+def test_write_and_load_snapshot_file(tmp_path, file_name):
+    root = tmp_path / 'repo'
+    root.mkdir()
+    (root / 'main.py').write_text('# Kommentar\nprint(1)\n')
+    results_df, stats = count_lines_in_directory(str(root))
+    path = str(tmp_path / file_name)
+    
+    write_snapshot(path, results_df, stats, str(root), 'v1')
+    snapshot = load_snapshot(path)
+    
+    assert (len(snapshot), snapshot.label, snapshot.source) == (1, 'v1', str(root))
+    assert snapshot.stats['total_code_lines'] == 1
+    assert list(snapshot.to_dataframe()['code_lines']) == [1]
+
+def test_load_rejects_other_files():
+    with pytest.raises(ValueError):
+        load_snapshot(b'kein Snapshot')
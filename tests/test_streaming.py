@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+import code_counter
+from code_counter import OversizePolicy, count_lines_in_bytes, count_lines_in_file
+
+# Inhalte, bei denen Blockgrenzen in Kommentare, Strings und Leerzeilen fallen
+SOURCES = {
+    '.py': ('"""Modul-\n\nDoku"""\n\nimport os  # Kommentar\n\n'
+            'def main():\n    # nur Kommentar\n    text = """a\n# kein Kommentar\nb"""\n'
+            '    return text\r\n\r\n   \n# Ende'),
+    '.c': ('/* Kopf\n * über mehrere\n * Zeilen */\n#include <stdio.h>\n\n'
+           'int main(void) {\n    char *s = "/* kein Kommentar */";\n'
+           '    // Zeilenkommentar\n    return 0; /* hinten\n */\n}\n'),
+    '.js': ("const a = `mehr-\nzeiliger // String`;\n/*\n\n*/\n// x\nlet b = 'ä/*ö';\n\n"),
+}
+
+def _stream_counts(data, file_ext):
+    lexer = code_counter.get_lexer_for_extension(file_ext)
+    # Wie _count_file: der erste Block liegt bereits vor
+    head = data[:code_counter.BINARY_CHECK_SIZE]
+    return code_counter._count_lines_in_stream(io.BytesIO(data[len(head):]), head, lexer)
+
+@pytest.mark.parametrize('file_ext', sorted(SOURCES))
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 16, 1024])
+def test_chunked_counts_match_whole_file(monkeypatch, file_ext, chunk_size):
+    # Mehrfach aneinandergehängt, damit der Inhalt über BINARY_CHECK_SIZE hinausgeht
+    data = (SOURCES[file_ext] * 40).encode('utf-8')
+    monkeypatch.setattr(code_counter, 'STREAM_CHUNK_SIZE', chunk_size)
+    
+    assert _stream_counts(data, file_ext) == count_lines_in_bytes(data, file_ext)
+
+@pytest.mark.parametrize('data', [b'', b'\n', b'x', b'\n\n  \n', b'# a\n# b', 'ä\nö\n'.encode('utf-8')])
+def test_chunked_counts_match_whole_file_for_edge_cases(monkeypatch, data):
+    monkeypatch.setattr(code_counter, 'STREAM_CHUNK_SIZE', 1)
+    
+    assert _stream_counts(data, '.py') == count_lines_in_bytes(data, '.py')
+
+def test_stream_policy_counts_like_whole_file(tmp_path):
+    path = tmp_path / 'main.py'
+    path.write_bytes((SOURCES['.py'] * 200).encode('utf-8'))
+    
+    # Ab 16 Bytes blockweise zählen
+    streamed = count_lines_in_file(str(path), OversizePolicy('stream', max_file_size=16))
+    assert streamed == count_lines_in_file(str(path))
+    assert streamed == count_lines_in_bytes(path.read_bytes(), '.py')